@@ -1,6 +1,6 @@
 import streamlit as st
 import os
-import importlib.util
+from utils.system.pages import load_page
 
 
 st.set_page_config(page_title="FidSync Beta", layout="wide")
@@ -172,9 +172,7 @@ if selected_page:
     page_path = os.path.join(PAGES_DIR, selected_page)
     if os.path.exists(page_path):
         try:
-            spec = importlib.util.spec_from_file_location("page_module", page_path)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            module = load_page(page_path)
             module.run()
         except Exception as e:
             st.error(f"❌ Failed to load page: {e}")
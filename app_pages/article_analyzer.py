@@ -1,9 +1,6 @@
 import streamlit as st
-import pdfplumber
 import re
 import pandas as pd
-from newspaper import Article
-from fpdf import FPDF
 import tempfile
 import os
 
@@ -13,6 +10,8 @@ def summarize_article(text):
 
 # === PDF Export Function ===
 def export_summary_to_pdf(summary):
+    from fpdf import FPDF
+
     pdf = FPDF()
     pdf.add_page()
     pdf.set_auto_page_break(auto=True, margin=15)
@@ -41,6 +40,8 @@ def main():
         url = st.text_input("Enter Article URL")
         if url:
             try:
+                from newspaper import Article
+
                 article = Article(url)
                 article.download()
                 article.parse()
@@ -54,6 +55,8 @@ def main():
     elif input_mode == "Upload PDF":
         pdf_file = st.file_uploader("Upload PDF File", type=["pdf"])
         if pdf_file:
+            import pdfplumber
+
             with pdfplumber.open(pdf_file) as pdf:
                 article_text = "\n".join(p.extract_text() for p in pdf.pages if p.extract_text())
 
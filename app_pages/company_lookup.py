@@ -1,5 +1,4 @@
 import streamlit as st
-import yfinance as yf
 import pandas as pd
 from datetime import date, timedelta
 
@@ -34,6 +33,8 @@ def run():
 
     if st.session_state.searched and st.session_state.last_ticker:
         try:
+            import yfinance as yf
+
             ticker = st.session_state.last_ticker
             stock = yf.Ticker(ticker)
             info = stock.info
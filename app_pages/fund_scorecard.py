@@ -1,47 +1,77 @@
 import streamlit as st
 import pandas as pd
-import pdfplumber
 import io
-from rapidfuzz import fuzz, process
-from openpyxl import load_workbook
-from openpyxl.styles import PatternFill
-from openpyxl.utils.cell import coordinate_to_tuple
 import zipfile
+from utils.mpi.cache import load_report
+from utils.mpi.matching import best_matches
+from utils.mpi.steps import parse_toc
 
 # =============================
 # PDF Extraction — Clean Fund Name + Status
 # =============================
+SCORECARD_SECTIONS = ("scorecard_page", "scorecard_proposed_page")
+
+
+def scorecard_page_ranges(doc):
+    """[(start, end)] page ranges of the scorecard sections from the TOC; [] if it lists none."""
+    toc = parse_toc("".join(doc.text(p) for p in doc.pages(1, 4)))
+    starts = sorted(toc[key] for key in SCORECARD_SECTIONS if toc.get(key))
+    ranges = []
+    for start in starts:
+        # a section ends where the next TOC entry starts
+        end = min((p for p in toc.values() if p and p > start), default=doc.page_count + 1)
+        ranges.append((start, end))
+    return ranges
+
+
+def parse_scorecard_page(text):
+    """(fund_name, status) for each fund header on one scorecard page."""
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        if "Manager Tenure" in line and i > 0:
+            fund_name_candidate = lines[i - 1].strip()
+
+            status = None
+            if "Meets Watchlist Criteria" in fund_name_candidate:
+                fund_name = fund_name_candidate.replace("Fund Meets Watchlist Criteria.", "").strip()
+                status = "Pass"
+            elif "placed on watchlist" in fund_name_candidate:
+                fund_name = fund_name_candidate.split(" Fund has been placed")[0].strip()
+                status = "Review"
+            else:
+                fund_name = fund_name_candidate.strip()
+
+            if fund_name and status:
+                yield fund_name, status
+
+
+def iter_scorecard_funds(doc):
+    """
+    Yield (fund_name, status) page by page. Only the scorecard sections named
+    in the TOC are read; without a TOC every page is scanned, so a later
+    scorecard section (e.g. Proposed Funds) is not missed.
+    """
+    ranges = scorecard_page_ranges(doc)
+    pages = [p for start, end in ranges for p in doc.pages(start, end)] if ranges else doc.pages()
+    for pnum in pages:
+        text = doc.text(pnum)  # "" for image-only pages
+        if "Fund Scorecard" not in text or "Criteria Threshold" in text:
+            continue
+        yield from parse_scorecard_page(text)
+
+
 def extract_funds_from_pdf(pdf_file):
-    fund_data = []
-    with pdfplumber.open(pdf_file) as pdf:
-        for page in pdf.pages:
-            text = page.extract_text()
-            if "Fund Scorecard" not in text or "Criteria Threshold" in text:
-                continue
-
-            lines = text.split("\n")
-            for i, line in enumerate(lines):
-                if "Manager Tenure" in line and i > 0:
-                    fund_name_candidate = lines[i - 1].strip()
-
-                    status = None
-                    if "Meets Watchlist Criteria" in fund_name_candidate:
-                        fund_name = fund_name_candidate.replace("Fund Meets Watchlist Criteria.", "").strip()
-                        status = "Pass"
-                    elif "placed on watchlist" in fund_name_candidate:
-                        fund_name = fund_name_candidate.split(" Fund has been placed")[0].strip()
-                        status = "Review"
-                    else:
-                        fund_name = fund_name_candidate.strip()
-
-                    if fund_name and status:
-                        fund_data.append((fund_name, status))
-    return fund_data
+    with load_report(pdf_file) as doc:
+        return list(iter_scorecard_funds(doc))
 
 # =============================
 # Excel Matching + Coloring — Fill Only, No Text
 # =============================
-def update_excel(excel_file, sheet_name, fund_data, investment_options, status_cell, threshold):
+def update_excel(excel_file, sheet_name, fund_data, investment_options, status_cell, threshold, one_to_one=False):
+    from openpyxl import load_workbook
+    from openpyxl.styles import PatternFill
+    from openpyxl.utils.cell import coordinate_to_tuple
+
     wb = load_workbook(excel_file)
     ws = wb[sheet_name]
 
@@ -56,22 +86,22 @@ def update_excel(excel_file, sheet_name, fund_data, investment_options, status_c
     green = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
     red = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
 
-    results = []
-    for i, fund in enumerate(investment_options):
-        fund = fund.strip()
-        if not fund:
-            continue
+    # every option against every scorecard fund in one score matrix
+    rows = [(i, fund.strip()) for i, fund in enumerate(investment_options) if fund.strip()]
+    names = list(fund_dict)
+    matches = best_matches([fund for _, fund in rows], names, one_to_one=one_to_one)
 
-        match_result = process.extractOne(fund, fund_dict.keys(), scorer=fuzz.token_sort_ratio)
-        best_match = match_result[0] if match_result else None
-        score = match_result[1] if match_result and len(match_result) > 1 else 0
+    results = []
+    for (i, fund), (j, score) in zip(rows, matches):
+        best_match = names[j] if j is not None else None
+        matched = best_match is not None and score >= threshold
 
-        status = fund_dict.get(best_match, "") if score >= threshold else ""
+        status = fund_dict.get(best_match, "") if matched else ""
 
         cell = ws.cell(row=start_row + i, column=col_index)
         cell.value = None  # Clear formula or weird characters
 
-        if score >= threshold:
+        if matched:
             if status == "Pass":
                 cell.fill = green
             elif status == "Review":
@@ -133,6 +163,10 @@ def run():
     investment_options = [line.strip() for line in investment_input.split("\n") if line.strip()]
 
     match_threshold = st.slider("Minimum Match Score (fuzzy logic)", 0, 100, 20, step=5)
+    one_to_one = st.checkbox(
+        "Match each scorecard fund at most once",
+        help="Hands out the best-scoring pairs first; options left without a fund show no match.",
+    )
 
     if excel_file:
         xls = pd.ExcelFile(excel_file)
@@ -148,12 +182,22 @@ def run():
             return
 
         try:
-            fund_data = extract_funds_from_pdf(pdf_file)
+            # show the scorecard funds as they are read, a page's worth at a time
+            fund_data = []
+            table = st.empty()
+            with load_report(pdf_file) as doc:
+                for fund in iter_scorecard_funds(doc):
+                    fund_data.append(fund)
+                    if len(fund_data) % 10 == 0:
+                        table.dataframe(pd.DataFrame(fund_data, columns=["Fund", "Status"]))
+            table.empty()
             if not fund_data:
                 st.warning("No funds extracted from PDF.")
                 return
 
-            wb, match_results = update_excel(excel_file, sheet_name, fund_data, investment_options, status_cell, match_threshold)
+            wb, match_results = update_excel(
+                excel_file, sheet_name, fund_data, investment_options, status_cell, match_threshold, one_to_one
+            )
 
             st.subheader("Match Preview")
             df_results = pd.DataFrame(match_results)
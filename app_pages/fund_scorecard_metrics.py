@@ -1,11 +1,8 @@
 import streamlit as st
-import pdfplumber
 import pandas as pd
 import re
 from difflib import get_close_matches
 from io import BytesIO
-import xlsxwriter
-from xlsxwriter.utility import xl_col_to_name
 from datetime import datetime
 
 # --- Ticker Lookup (stacked + inline formats) ---
@@ -85,6 +82,9 @@ def run():
     pdf_file = st.file_uploader("Upload MPI PDF", type=["pdf"])
 
     if pdf_file:
+        import pdfplumber
+        from xlsxwriter.utility import xl_col_to_name
+
         rows = []
         with pdfplumber.open(pdf_file) as pdf:
             total_pages = len(pdf.pages)
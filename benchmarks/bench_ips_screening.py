@@ -0,0 +1,108 @@
+"""
+IPS screening benchmark: the per-fund dict loop scorecard_to_ips used vs the
+status-matrix engine (utils.mpi.ips), on a multi-plan rollup of 5,000 funds by
+default, mixing 14- and 15-metric scorecards and active / passive funds. Also
+times screen() alone, the part that reruns when only fund types or the IPS
+policy change (--policy: a YAML policy file, default the built-in IPS).
+
+    python benchmarks/bench_ips_screening.py [--funds 5000] [--repeat 3] [--policy FILE]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from utils.mpi.ips import (
+    ACTIVE_IPS_METRICS, DEFAULT_POLICY, IPS_LABELS, METRIC_ALIASES, PASSIVE_IPS_METRICS, load_policy, screen,
+    status_matrix,
+)
+from utils.mpi.steps import METRIC_LABELS, scorecard_to_ips
+
+
+def legacy_scorecard_to_ips(fund_blocks, fund_types, tickers):
+    # the loop scorecard_to_ips used
+    ips_results, raw_results = [], []
+    for fund in fund_blocks:
+        fund_name = fund["Fund Name"]
+        fund_type = fund_types.get(fund_name, "Passive" if "index" in fund_name.lower() else "Active")
+        status = {}
+        for m in fund["Metrics"]:
+            status.setdefault(METRIC_ALIASES.get(m["Metric"], m["Metric"]), m["Status"])
+        ips_metrics = PASSIVE_IPS_METRICS if fund_type == "Passive" else ACTIVE_IPS_METRICS
+        ips_status = [status.get(metric) if metric is not None else "Pass" for metric in ips_metrics]
+        review_fail = sum(1 for status in ips_status if status in ["Review", "Fail"])
+        watch_status = "FW" if review_fail >= 6 else "IW" if review_fail >= 5 else "NW"
+        def iconify(status): return "✔" if status == "Pass" else "✗" if status in ("Review", "Fail") else ""
+        head = {"Fund Name": fund_name, "Ticker": tickers.get(fund_name, ""), "Fund Type": fund_type}
+        ips_results.append({**head, **{IPS_LABELS[i]: iconify(ips_status[i]) for i in range(11)},
+                            "IPS Watch Status": watch_status})
+        raw_results.append({**head, **{IPS_LABELS[i]: ips_status[i] for i in range(11)},
+                            "IPS Watch Status": watch_status})
+    return pd.DataFrame(ips_results), pd.DataFrame(raw_results)
+
+
+def make_rollup(n, seed=0):
+    """Scorecard fund blocks, fund types and tickers for n funds."""
+    rng = random.Random(seed)
+    fund_14 = METRIC_LABELS[:14]
+    fund_15 = [m for m in METRIC_LABELS if "Tracking Error Rank" not in m]
+    blocks, types, tickers = [], {}, {}
+    for i in range(n):
+        name = f"Fund {i:05d}" + (" Index" if rng.random() < 0.3 else "")
+        labels = list(rng.choice([fund_14, fund_15]))
+        if rng.random() < 0.05:
+            labels.pop(rng.randrange(len(labels)))  # a metric the scorecard did not list
+        weights = rng.choice([(8, 1, 1), (3, 2, 2), (1, 2, 2)])
+        metrics = [{"Metric": m, "Status": rng.choices(["Pass", "Review", "Fail"], weights)[0], "Info": ""}
+                   for m in labels]
+        blocks.append({"Fund Name": name, "Metrics": metrics})
+        if rng.random() < 0.9:
+            types[name] = rng.choice(["Active", "Passive"])
+        tickers[name] = f"F{i:05d}"
+    return blocks, types, tickers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--funds", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--policy", help="YAML IPS policy for the screen-only timing")
+    args = parser.parse_args(argv)
+
+    blocks, types, tickers = make_rollup(args.funds)
+    print(f"{len(blocks)} funds")
+
+    timings, results = {}, {}
+    for label, fn in (("dict loop", legacy_scorecard_to_ips), ("status matrix", scorecard_to_ips)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[label] = fn(blocks, types, tickers)
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+        print(f"  {label:<14} {best * 1000:9.1f} ms")
+
+    # screening alone, on a status matrix that is already built (other fund types or IPS policy)
+    policy = load_policy(args.policy) if args.policy else DEFAULT_POLICY
+    matrix = status_matrix(blocks)
+    fund_types = [types.get(b["Fund Name"], "Active") for b in blocks]
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        screen(matrix, fund_types, policy)
+        best = min(best, time.perf_counter() - start)
+    print(f"  {'screen only':<14} {best * 1000:9.1f} ms  ({policy.name})")
+
+    same = all(a.equals(b) for a, b in zip(results["dict loop"], results["status matrix"]))
+    print(f"  speedup        {timings['dict loop'] / timings['status matrix']:9.1f}x  (identical tables: {same})")
+    print("  watch status   " + ", ".join(f"{k} {v}" for k, v in results["status matrix"][0]["IPS Watch Status"].value_counts().items()))
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+"""
+Investment metrics workbook benchmark: the openpyxl load / iterrows / delete_rows
+/ save populate_metrics_template used vs the XML-level template writer, for
+25, 100 and 500 funds by default.
+
+    python benchmarks/bench_metrics_excel.py [--funds 25 100 500] [--repeat 3]
+
+The openpyxl version cannot fill more rows than the template has (row 180): it
+writes into the merged footer cells and fails; that is reported as such.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from io import BytesIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # the template path is relative to the repo root
+
+import pandas as pd
+
+from utils.export.metrics_excel import (
+    FIRST_ROW, LAST_TEMPLATE_ROW, STATUS_FILL, TEMPLATE_PATH, populate_metrics_template, quarter_end,
+)
+
+CATEGORIES = ["Large Blend", "Large Growth", "Mid-Cap Value", "Foreign Large Blend", "Intermediate Core Bond", "Target-Date 2040"]
+
+
+def legacy_populate(df_icon, factsheets, prepared_for="", report_date="", template=TEMPLATE_PATH):
+    # the openpyxl implementation populate_metrics_template replaced
+    import openpyxl
+    from openpyxl.styles import PatternFill
+
+    category_map = {r["Matched Fund Name"]: r.get("Category", "") for r in factsheets}
+    expense_map = {r["Matched Fund Name"]: r.get("Expense Ratio", "") for r in factsheets}
+    quarter_str, actual_date = quarter_end(report_date)
+
+    wb = openpyxl.load_workbook(template)
+    ws = wb.active
+    ws["AB4"] = prepared_for
+    ws["AB5"] = quarter_str
+    ws["AB6"] = actual_date.strftime("%m/%d/%Y")
+    hdr2col = {str(cell.value).strip(): cell.column for cell in ws[4] if cell.value}
+    fills = {status: PatternFill("solid", fgColor=color) for status, color in STATUS_FILL.items()}
+
+    for i, row in df_icon.reset_index(drop=True).iterrows():
+        r = FIRST_ROW + i
+        name = row["Fund Name"]
+        ws.cell(row=r, column=hdr2col["Category"], value=category_map.get(name, ""))
+        ws.cell(row=r, column=hdr2col["Investment Option"], value=name)
+        ws.cell(row=r, column=hdr2col["Ticker"], value=row["Ticker"])
+        ws.cell(row=r, column=hdr2col["Expense Ratio"], value=expense_map.get(name, ""))
+        for idx in range(1, 12):
+            if str(idx) in hdr2col:
+                ws.cell(row=r, column=hdr2col[str(idx)], value=row[str(idx)])
+        cell = ws.cell(row=r, column=hdr2col["Current Quarter Status"], value=row["IPS Watch Status"])
+        if row["IPS Watch Status"] in fills:
+            cell.fill = fills[row["IPS Watch Status"]]
+
+    last = FIRST_ROW + len(df_icon) - 1
+    if last < LAST_TEMPLATE_ROW:
+        ws.delete_rows(last + 1, LAST_TEMPLATE_ROW - last)
+    bio = BytesIO()
+    wb.save(bio)
+    bio.seek(0)
+    return bio
+
+
+def make_funds(n, seed=0):
+    """An IPS icon table and factsheet records for n funds."""
+    rng = random.Random(seed)
+    rows, factsheets = [], []
+    for i in range(n):
+        name = f"Fund {i:03d} Instl"
+        rows.append({
+            "Fund Name": name,
+            "Ticker": f"F{i:03d}X",
+            **{str(k): rng.choice(["✔", "✗"]) for k in range(1, 12)},
+            "IPS Watch Status": rng.choice(list(STATUS_FILL)),
+        })
+        factsheets.append({"Matched Fund Name": name, "Category": rng.choice(CATEGORIES),
+                           "Expense Ratio": f"{rng.uniform(0.02, 1.2):.2f}%"})
+    return pd.DataFrame(rows), factsheets
+
+
+def data_cells(bio, n):
+    """Values and status colors of the fund rows, read back with openpyxl."""
+    import openpyxl
+
+    ws = openpyxl.load_workbook(bio).active
+    rows = ws.iter_rows(min_row=FIRST_ROW, max_row=FIRST_ROW + n - 1, max_col=21)
+    return [[c.value for c in row] + [row[-1].fill.fgColor.rgb[-6:]] for row in rows]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--funds", type=int, nargs="+", default=[25, 100, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    populate_metrics_template(*make_funds(1))  # parse the template once, as a running app has
+    same = True
+    for n in args.funds:
+        df, factsheets = make_funds(n)
+        timings, outputs = {}, {}
+        for label, fn in (("openpyxl", legacy_populate), ("xml writer", populate_metrics_template)):
+            best = float("inf")
+            try:
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    outputs[label] = fn(df, factsheets, "Client", "3rd QTR, 2025")
+                    best = min(best, time.perf_counter() - start)
+                timings[label] = f"{best * 1000:9.1f} ms"
+            except Exception as e:
+                timings[label] = f"failed ({type(e).__name__})"
+        line = f"  {n:>4} funds   openpyxl {timings['openpyxl']:<20} xml writer {timings['xml writer']}"
+        if len(outputs) == 2:
+            match = data_cells(outputs["openpyxl"], n) == data_cells(outputs["xml writer"], n)
+            same = same and match
+            line += f"   (identical fund rows: {match})"
+        print(line)
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
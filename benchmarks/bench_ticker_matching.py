@@ -0,0 +1,94 @@
+"""
+Fund → ticker matching benchmark: the original nested token_sort_ratio loop vs
+the cdist-based assign_tickers, on a 100-fund plan by default.
+
+    python benchmarks/bench_ticker_matching.py [--funds 100] [--noise 30] [--repeat 3]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rapidfuzz import fuzz
+
+from utils.mpi.matching import assign_tickers
+
+FAMILIES = ["American", "Vanguard", "Fidelity", "T. Rowe Price", "Dodge & Cox", "PIMCO", "MFS", "JPMorgan", "Invesco", "Northern"]
+STYLES = ["Large Cap Growth", "Large Cap Value", "Mid Cap Index", "Small Cap Blend", "International Equity",
+          "Emerging Markets", "Total Bond", "High Yield", "Target Date 2040", "Real Estate", "Balanced", "Short-Term Bond"]
+SHARES = ["Instl", "Admiral", "R6", "I", "Inv", "Y"]
+
+
+def legacy_assign(norm_expected_list, candidate_pairs, threshold=70):
+    # the loop extract_fund_tickers used before assign_tickers
+    assigned, used = {}, set()
+    for fund_name, norm_expected in norm_expected_list:
+        best = (None, None, 0)
+        for norm_raw, ticker, raw_name in candidate_pairs:
+            if ticker in used:
+                continue
+            score = fuzz.token_sort_ratio(norm_expected, norm_raw)
+            if score > best[2]:
+                best = (ticker, raw_name, score)
+        if best[2] >= threshold:
+            assigned[fund_name] = best[0]
+            used.add(best[0])
+        else:
+            assigned[fund_name] = ""
+    return assigned, used
+
+
+def make_plan(n_funds, noise, seed=0):
+    """Expected names plus candidate pairs shaped like a performance section."""
+    rng = random.Random(seed)
+    names, candidates, tickers = [], [], set()
+    while len(names) < n_funds:
+        name = f"{rng.choice(FAMILIES)} {rng.choice(STYLES)} {rng.choice(SHARES)}"
+        if name in names:
+            continue
+        ticker = "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(4)) + "X"
+        if ticker in tickers:
+            continue
+        names.append(name)
+        tickers.add(ticker)
+        candidates.append((name.lower(), ticker, name))
+        for _ in range(noise):
+            # benchmark rows, share-class siblings and header fragments
+            other = f"{rng.choice(FAMILIES)} {rng.choice(STYLES)} {rng.choice(['Index', 'TR USD', 'NR USD', rng.choice(SHARES)])}"
+            token = rng.choice(["USD", "QTD", "YTD", "MSCI", "ICE", "BBG", "TR", ticker])
+            candidates.append((other.lower(), token, other))
+    rng.shuffle(candidates)
+    return [(n, n.lower()) for n in names], candidates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--funds", type=int, default=100)
+    parser.add_argument("--noise", type=int, default=30, help="extra candidate pairs per fund")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    expected, candidates = make_plan(args.funds, args.noise)
+    print(f"{args.funds} funds x {len(candidates)} candidate pairs")
+
+    timings = {}
+    results = {}
+    for label, fn in (("legacy loop", legacy_assign), ("assign_tickers", assign_tickers)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results[label] = fn(expected, candidates)
+            best = min(best, time.perf_counter() - start)
+        timings[label] = best
+        print(f"  {label:<15} {best * 1000:9.1f} ms")
+
+    same = results["legacy loop"] == results["assign_tickers"]
+    print(f"  speedup         {timings['legacy loop'] / timings['assign_tickers']:9.1f}x  (identical assignments: {same})")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
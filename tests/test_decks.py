@@ -0,0 +1,13 @@
+from utils.mpi.decks import deck_file_names
+
+
+def test_deck_file_names_are_unique():
+    names = deck_file_names(["Growth Fund: A", "Growth Fund/ A", "growth fund_ a", "Value Fund", "Growth Fund_ A (2)"])
+    assert list(names.values()) == [
+        "Growth Fund_ A Writeup.pptx",
+        "Growth Fund_ A (2) Writeup.pptx",
+        "growth fund_ a (3) Writeup.pptx",
+        "Value Fund Writeup.pptx",
+        "Growth Fund_ A (2) (2) Writeup.pptx",
+    ]
+    assert len({n.lower() for n in names.values()}) == len(names)
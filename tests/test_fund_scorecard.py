@@ -0,0 +1,67 @@
+import importlib.util
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def page():
+    spec = importlib.util.spec_from_file_location("fund_scorecard_page", os.path.join(ROOT, "app_pages", "fund_scorecard.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeReport:
+    """The parts of MPIDocument iter_scorecard_funds reads, over canned page texts."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.page_count = len(texts)
+        self.read = []
+
+    def pages(self, start=1, end=None):
+        end = self.page_count + 1 if end is None else min(end, self.page_count + 1)
+        return range(max(start, 1), end)
+
+    def text(self, pnum):
+        self.read.append(pnum)
+        return self.texts[pnum - 1]
+
+
+def scorecard_page(title, funds):
+    lines = [title]
+    for name, passed in funds:
+        lines.append(f"{name} Fund Meets Watchlist Criteria." if passed
+                     else f"{name} Fund has been placed on watchlist for not meeting 5 out of 14 criteria.")
+        lines.append("Manager Tenure Pass 5.2 years")
+    return "\n".join(lines)
+
+
+def test_no_toc_report_reads_both_scorecard_sections(page):
+    doc = FakeReport([
+        "Sample Plan\nQuarterly Investment Review",  # cover, no table of contents
+        scorecard_page("Fund Scorecard", [("Alpha Growth", True), ("Beta Value", False)]),
+        scorecard_page("Fund Scorecard", [("Gamma Bond", True)]),
+        "Fund Performance\nAlpha Growth 1.2 3.4",
+        "Fund Factsheets\nAlpha Growth",
+        scorecard_page("Fund Scorecard: Proposed Funds", [("Delta Income", True)]),
+        "Fund Scorecard\nCriteria Threshold\nManager Tenure >= 3 years",  # criteria legend, skipped
+    ])
+    assert list(page.iter_scorecard_funds(doc)) == [
+        ("Alpha Growth", "Pass"), ("Beta Value", "Review"), ("Gamma Bond", "Pass"), ("Delta Income", "Pass"),
+    ]
+
+
+def test_toc_limits_the_scan_to_scorecard_sections(page):
+    doc = FakeReport([
+        "Table of Contents\nFund Performance 4\nFund Scorecard 2\nFund Factsheets 5",
+        "Fund Scorecard\nFund Scorecard",
+        scorecard_page("Fund Scorecard", [("Alpha Growth", True)]),
+        "Fund Performance",
+        scorecard_page("Fund Scorecard", [("Not Read", True)]),
+    ])
+    assert list(page.iter_scorecard_funds(doc)) == [("Alpha Growth", "Pass")]
+    assert 5 not in doc.read
@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+from utils.mpi.fund_types import TickerCache, resolve_fund_types
+from utils.mpi.steps import guess_fund_types
+
+DAY = 86400
+
+
+class FakeYahoo:
+    """Stand-in for fetch_yahoo: canned records, a call log and an on/off switch."""
+
+    def __init__(self, types):
+        self.types = dict(types)
+        self.calls = []
+        self.down = False
+
+    def __call__(self, ticker):
+        self.calls.append(ticker)
+        if self.down:
+            raise ConnectionError("provider unavailable")
+        return {"fund_type": self.types.get(ticker, ""), "long_name": f"{ticker} Fund",
+                "short_name": ticker, "summary": ""}
+
+
+@pytest.fixture
+def yahoo():
+    return FakeYahoo({"VFIAX": "Passive", "AGTHX": "Active"})
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "ticker_info.sqlite3")
+
+
+def test_fresh_entry_is_served_from_cache(cache_path, yahoo):
+    cache = TickerCache(cache_path, ttl_days=30, offline=False, fetch=yahoo)
+    assert cache.fund_type("vfiax") == "Passive"
+    assert cache.fund_type("VFIAX") == "Passive"
+    assert yahoo.calls == ["VFIAX"]
+
+
+def test_expired_entry_is_refetched(cache_path, yahoo):
+    cache = TickerCache(cache_path, ttl_days=1, offline=False, fetch=yahoo)
+    cache.put("AGTHX", {"fund_type": "Passive"}, fetched_at=time.time() - 2 * DAY)
+    assert cache.fund_type("AGTHX") == "Active"
+    assert yahoo.calls == ["AGTHX"]
+    assert cache.is_fresh(cache.get("AGTHX"))
+
+
+def test_offline_never_fetches(cache_path, yahoo):
+    cache = TickerCache(cache_path, ttl_days=1, offline=True, fetch=yahoo)
+    cache.put("AGTHX", {"fund_type": "Active"}, fetched_at=time.time() - 2 * DAY)
+    assert cache.fund_type("AGTHX") == "Active"  # stale, but used offline
+    assert cache.fund_type("VFIAX") == ""  # never cached
+    assert yahoo.calls == []
+
+
+def test_failed_fetch_falls_back_to_stale_entry(cache_path, yahoo):
+    cache = TickerCache(cache_path, ttl_days=1, offline=False, fetch=yahoo)
+    cache.put("AGTHX", {"fund_type": "Active"}, fetched_at=time.time() - 2 * DAY)
+    yahoo.down = True
+    assert cache.fund_type("AGTHX") == "Active"
+    assert cache.fund_type("VFIAX") == ""
+    assert yahoo.calls == ["AGTHX", "VFIAX"]
+    assert not cache.is_fresh(cache.get("AGTHX"))  # the stale entry is kept, not refreshed
+
+
+def test_entries_persist_across_instances(cache_path, yahoo):
+    first = TickerCache(cache_path, ttl_days=30, offline=False, fetch=yahoo)
+    assert first.warm(["VFIAX", "AGTHX", "vfiax"]) == (2, 0, 0)
+    first.close()
+
+    second = TickerCache(cache_path, ttl_days=30, offline=False, fetch=yahoo)
+    assert second.fund_type("VFIAX") == "Passive"
+    assert second.warm(["VFIAX", "AGTHX"]) == (0, 2, 0)
+    assert yahoo.calls == ["VFIAX", "AGTHX"]
+    second.close()
+
+
+class SlowLookup:
+    """Lookup stand-in: tickers starting with SLOW block until released; tracks concurrency."""
+
+    def __init__(self, answer="Active"):
+        self.answer = answer
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = self.peak = 0
+
+    def __call__(self, ticker):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if ticker.startswith("SLOW"):
+                self.release.wait(5)
+            elif ticker.startswith("BAD"):
+                raise ConnectionError(ticker)
+            else:
+                time.sleep(0.02)
+            return self.answer
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_slow_tickers_time_out_without_blocking_the_queue():
+    lookup = SlowLookup()
+    start = time.monotonic()
+    found = resolve_fund_types(["SLOW1", "SLOW2", "A", "B", "C", "BAD1"], lookup, workers=2, timeout=0.3, deadline=5)
+    elapsed = time.monotonic() - start
+    lookup.release.set()
+    assert found == {"A": "Active", "B": "Active", "C": "Active"}
+    assert elapsed < 1.0
+
+
+def test_deadline_bounds_the_total_wait():
+    lookup = SlowLookup()
+    start = time.monotonic()
+    found = resolve_fund_types(["SLOW1", "SLOW2", "SLOW3", "A"], lookup, workers=4, timeout=5, deadline=0.3)
+    elapsed = time.monotonic() - start
+    lookup.release.set()
+    assert found == {"A": "Active"}
+    assert elapsed < 1.0
+
+
+def test_concurrency_is_bounded_by_workers():
+    lookup = SlowLookup()
+    found = resolve_fund_types([f"T{i}" for i in range(12)] + ["T0", "", None], lookup, workers=3, timeout=2)
+    assert len(found) == 12
+    assert lookup.peak <= 3
+
+
+def test_timed_out_tickers_are_looked_up_again():
+    lookup = SlowLookup(answer="Passive")
+    known = {}
+    names = ["Fund A", "Fund B Index", "Fund C"]
+    tickers = {"Fund A": "AAAAX", "Fund B Index": "SLOWB", "Fund C": "CCCCX"}
+    first = guess_fund_types(names, tickers, lookup, timeout=0.2, known=known)
+    assert first == ["Passive", "Passive", "Passive"]  # Fund B from its name
+    assert known == {"AAAAX": "Passive", "CCCCX": "Passive"}
+
+    lookup.release.set()
+    calls = []
+    guess_fund_types(names, tickers, lambda t: calls.append(t) or "Active", known=known)
+    assert calls == ["SLOWB"]
+    assert known["SLOWB"] == "Active"
@@ -0,0 +1,103 @@
+from io import BytesIO
+
+import openpyxl
+import pandas as pd
+import pytest
+from pptx import Presentation
+
+from utils.export.metrics_excel import populate_metrics_template
+from utils.mpi.ips import compile_policy
+from utils.mpi.steps import scorecard_to_ips
+from utils.system.pages import WRITEUP_REC_PAGE, load_page
+
+THREE_CHECKS = {
+    "name": "Three checks",
+    "criteria": {
+        "Active": ["Manager Tenure", "Expense Ratio Rank", None],
+        "Passive": ["Manager Tenure", "R-Squared (3Yr)", None],
+    },
+    "watch": {"FW": 2, "IW": 1},
+}
+
+
+def screened():
+    blocks = [
+        {"Fund Name": "Alpha Growth Fund", "Metrics": [
+            {"Metric": "Manager Tenure", "Status": "Pass", "Info": ""},
+            {"Metric": "Expense Ratio Rank", "Status": "Fail", "Info": ""},
+        ]},
+        {"Fund Name": "Beta Index Fund", "Metrics": [
+            {"Metric": "Manager Tenure", "Status": "Review", "Info": ""},
+            {"Metric": "R-Squared (3Yr)", "Status": "Fail", "Info": ""},
+            {"Metric": "Expense Ratio Rank", "Status": "Pass", "Info": ""},
+        ]},
+    ]
+    tickers = {"Alpha Growth Fund": "ALPHX", "Beta Index Fund": "BETAX"}
+    return scorecard_to_ips(blocks, {}, tickers, compile_policy(THREE_CHECKS))
+
+
+def test_three_check_policy_screens():
+    icon, raw = screened()
+    checks = [f"IPS Investment Criteria {i}" for i in (1, 2, 3)]
+    assert list(icon.columns) == ["Fund Name", "Ticker", "Fund Type", *checks, "IPS Watch Status"]
+    assert raw[checks].values.tolist() == [["Pass", "Fail", "Pass"], ["Review", "Fail", "Pass"]]
+    assert icon["IPS Watch Status"].tolist() == ["IW", "FW"]
+
+
+def test_three_check_policy_fills_the_metrics_workbook():
+    icon, _ = screened()
+    factsheets = [{"Matched Fund Name": n, "Category": "Large Blend", "Expense Ratio": "0.50%"} for n in icon["Fund Name"]]
+    ws = openpyxl.load_workbook(populate_metrics_template(icon, factsheets, "Plan", "3rd QTR, 2025")).active
+    col = {str(ws.cell(4, c).value): c for c in range(1, ws.max_column + 1) if ws.cell(4, c).value is not None}
+    assert [ws.cell(5, col[str(i)]).value for i in (1, 2, 3)] == ["✔", "✗", "✔"]
+    assert ws.cell(5, col["4"]).value in (None, "")
+    assert ws.cell(6, col["Current Quarter Status"]).value == "FW"
+
+
+def test_three_check_policy_fills_the_writeup_slide():
+    icon, _ = screened()
+    state = {
+        "selected_fund": "Alpha Growth Fund",
+        "report_date": "3rd QTR, 2025",
+        "ips_icon_table": icon,
+        "fund_factsheets_data": [{"Matched Fund Name": "Alpha Growth Fund", "Category": "Large Blend"}],
+        "proposed_funds_confirmed_df": pd.DataFrame(columns=["Fund Scorecard Name", "Ticker"]),
+        **{k: pd.DataFrame() for k in ("ear_table1_data", "ear_table2_data", "ear_table3_data", "raj_table1_data",
+                                       "raj_table2_data", "qualfact_table1_data", "qualfact_table2_data")},
+    }
+    deck = load_page(WRITEUP_REC_PAGE).build_writeup_pptx(state)
+    table = next(s.table for s in Presentation(BytesIO(deck.getvalue())).slides[0].shapes if s.has_table)
+    cells = [c.text for c in table.rows[len(table.rows) - 1].cells]
+    assert cells[3:6] == ["✔", "✗", "✔"]
+    assert set(cells[6:-1]) == {""}
+    assert cells[-1] == "IW"
+
+
+@pytest.mark.parametrize("change, message", [
+    ({"watch": {"Watch": 4}}, "unknown watch status"),
+    ({"watch": {"FW": 2, "IW": 3}}, "FW needs at least as many checks as IW"),
+    ({"otherwise": "OK"}, "otherwise must be NW"),
+])
+def test_policy_watch_statuses_are_checked(change, message):
+    with pytest.raises(ValueError, match=message):
+        compile_policy({**THREE_CHECKS, **change})
+
+
+def test_watch_threshold_is_the_lowest_watch_count():
+    assert compile_policy(THREE_CHECKS).watch_threshold == 1
+    assert compile_policy({**THREE_CHECKS, "watch": {"FW": 2}}).watch_threshold == 2
+    assert compile_policy({**THREE_CHECKS, "watch": {}}).watch_threshold is None
+
+
+def test_on_watch_caption_follows_the_screening_policy():
+    import streamlit as st
+
+    from utils.mpi.pipeline import on_watch_caption
+
+    st.session_state.pop("ips_policy", None)
+    assert "failed five or more IPS criteria" in on_watch_caption()
+    st.session_state["ips_policy"] = compile_policy({**THREE_CHECKS, "watch": {"FW": 2}})
+    try:
+        assert "failed two or more IPS criteria" in on_watch_caption()
+    finally:
+        del st.session_state["ips_policy"]
@@ -0,0 +1,34 @@
+from rapidfuzz import fuzz, process
+
+from utils.mpi.matching import best_matches
+
+FUNDS = [
+    "Vanguard 500 Index Admiral", "VANGUARD 500 INDEX ADMIRAL", "Vanguard 500 Index Admiral.",
+    "American Funds Growth Fund of Amer R6", "Dodge & Cox Income I", "PIMCO Total Return Instl",
+]
+OPTIONS = [
+    "vanguard 500 index admiral", "Vanguard 500 Index Admiral", "Dodge and Cox Income I",
+    "American Funds Growth Fund of America R6", "pimco total return (instl)", "Unrelated Option",
+]
+
+
+def test_scores_and_picks_match_extract_one():
+    # same scorer, no processor: case and punctuation count, as they did with extractOne
+    expected = []
+    for option in OPTIONS:
+        _, score, j = process.extractOne(option, FUNDS, scorer=fuzz.token_sort_ratio)
+        expected.append((j, score))
+    assert best_matches(OPTIONS, FUNDS) == expected
+
+
+def test_case_and_punctuation_variants_are_not_ties():
+    (j, score), = best_matches(["vanguard 500 index admiral"], FUNDS)
+    assert j == 0 and score < 100  # case differs: not a perfect match without a processor
+    (j, score), = best_matches(["Vanguard 500 Index Admiral"], FUNDS)
+    assert (j, score) == (0, 100.0)  # first of the exact match and its upper-case / dotted copies
+
+
+def test_one_to_one_hands_each_fund_out_once():
+    matches = best_matches(["Vanguard 500 Index Admiral"] * 2 + ["Dodge & Cox Income I"], FUNDS[:1] + FUNDS[4:5],
+                           one_to_one=True)
+    assert matches == [(0, 100.0), (None, 0.0), (1, 100.0)]
@@ -0,0 +1,49 @@
+import os
+import sys
+
+import pytest
+
+from utils.system.pages import PageRegistry, page_module_name
+
+
+@pytest.fixture
+def pages():
+    registry = PageRegistry()
+    yield registry
+    registry.clear()
+
+
+def write_page(path, body):
+    path.write_text(body)
+    st = os.stat(path)
+    # a newer mtime, as an editor save would leave
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_second_render_skips_module_execution(pages, tmp_path):
+    page = tmp_path / "registry_probe_page.py"
+    page.write_text("VERSION = 1\n")
+
+    first = pages.load(str(page))
+    assert pages.load(str(page)) is first
+    assert pages.executions[page.name] == 1
+    assert sys.modules[page_module_name(str(page))] is first
+
+    write_page(page, "VERSION = 2\n")
+    assert pages.load(str(page)).VERSION == 2
+    assert pages.executions[page.name] == 2
+
+
+def test_failed_reload_keeps_the_last_good_module(pages, tmp_path):
+    page = tmp_path / "registry_broken_page.py"
+    page.write_text("VERSION = 1\n")
+    good = pages.load(str(page))
+
+    write_page(page, "raise RuntimeError('half-saved page')\n")
+    with pytest.raises(RuntimeError, match="half-saved page"):
+        pages.load(str(page))
+    assert sys.modules[page_module_name(str(page))] is good
+    assert pages.executions[page.name] == 1
+
+    write_page(page, "VERSION = 3\n")
+    assert pages.load(str(page)).VERSION == 3
@@ -0,0 +1,87 @@
+# utils/export/metrics_excel.py
+
+import datetime
+import re
+from io import BytesIO
+from pathlib import Path
+
+TEMPLATE_PATH = Path("assets") / "investment_metrics_template.xlsx"
+
+# Rows 5..LAST_TEMPLATE_ROW are pre-formatted in the template; unused ones are trimmed.
+FIRST_ROW = 5
+LAST_TEMPLATE_ROW = 180
+
+STATUS_FILL = {
+    "NW": "C8EFD0",
+    "IW": "FFE8B0",
+    "FW": "F8D7DA",
+}
+
+
+def quarter_end(report_date):
+    """("Q3", date(2025, 9, 30)) from a report date like "3rd QTR, 2025"; today if unparseable."""
+    m = re.match(r"([1-4])[a-z]{2}\s+QTR,\s*(20\d{2})", report_date or "")
+    if not m:
+        return "", datetime.date.today()
+    q, yr = int(m.group(1)), int(m.group(2))
+    mon, day = {1: (3, 31), 2: (6, 30), 3: (9, 30), 4: (12, 31)}[q]
+    return f"Q{q}", datetime.date(yr, mon, day)
+
+
+def populate_metrics_template(df_icon, factsheets, prepared_for="", report_date="", template=TEMPLATE_PATH):
+    """
+    Investment metrics workbook as BytesIO:
+      - Prepared For (AB4), Quarter (AB5), Actual Date (AB6)
+      - Category / Expense Ratio from the factsheet records
+      - Investment Option / Ticker, IPS criteria 1..N and Current Quarter Status
+        (colored) from the IPS icon table; criteria without a template column
+        are left out
+      - Resizes the pre-formatted rows 5..180 to the funds listed: unused rows
+        are removed and the footer totals follow the last fund
+    The icon table may use the compact "1".."N" criteria columns or the full
+    "IPS Investment Criteria N" names.
+    """
+    from utils.export.xlsx_template import load_template
+    from utils.mpi.ips import CRITERIA_PREFIX, criteria_labels
+
+    category_map = {r["Matched Fund Name"]: r.get("Category", "") for r in factsheets}
+    expense_map = {r["Matched Fund Name"]: r.get("Expense Ratio", "") for r in factsheets}
+    df_icon = df_icon.rename(columns={c: c[len(CRITERIA_PREFIX):] for c in criteria_labels(df_icon.columns)})
+
+    quarter_str, actual_date = quarter_end(report_date)
+
+    tpl = load_template(str(template))
+    values = {
+        (4, 28): prepared_for,  # AB4
+        (5, 28): quarter_str,
+        (6, 28): actual_date.strftime("%m/%d/%Y"),
+    }
+    fills, block = {}, None
+
+    if not df_icon.empty:
+        # header text → column index (row 4)
+        hdr2col = tpl.header(4)
+        names = df_icon["Fund Name"].tolist()
+        columns = {
+            "Category": [category_map.get(n, "") for n in names],
+            "Investment Option": names,
+            "Ticker": df_icon["Ticker"].tolist(),
+            "Expense Ratio": [expense_map.get(n, "") for n in names],
+        }
+        columns.update({c: df_icon[c].tolist() for c in df_icon.columns if isinstance(c, str) and c.isdigit()})
+        status = df_icon["IPS Watch Status"].tolist()
+        columns["Current Quarter Status"] = status
+
+        # keep row 6 even for a single fund: AB5 / AB6 feed the title formulas
+        last = max(FIRST_ROW + len(df_icon) - 1, FIRST_ROW + 1)
+        block = (FIRST_ROW, LAST_TEMPLATE_ROW, last)
+        for header, column in columns.items():
+            col = hdr2col.get(header)
+            if col is None:
+                continue
+            values.update(((FIRST_ROW + i, col), v) for i, v in enumerate(column))
+        col = hdr2col.get("Current Quarter Status")
+        if col is not None:
+            fills = {(FIRST_ROW + i, col): STATUS_FILL[s] for i, s in enumerate(status) if s in STATUS_FILL}
+
+    return BytesIO(tpl.fill(values, fills, block))
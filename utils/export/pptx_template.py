@@ -0,0 +1,75 @@
+# utils/export/pptx_template.py
+
+import copy
+import os
+import re
+import threading
+from io import BytesIO
+
+from pptx import Presentation
+
+# Bracketed placeholder text in the templates: "[Fund Name]", "[Bullet Point 1]", "[Category]" ...
+TOKEN = re.compile(r"\[[^\]]+\]")
+
+
+class TemplateDeck:
+    """
+    A PowerPoint template parsed once, with an index of where its placeholders
+    sit. Fill a deck from copy() and look shapes up through the index instead of
+    walking every shape and paragraph; all locations are positions in the
+    template, so resolve slides from a fresh copy before deleting any.
+    """
+
+    def __init__(self, data):
+        # Copies are made from a parse nobody reads: python-pptx caches proxies that hold
+        # sub-elements, and deepcopy would detach those from the copied XML tree.
+        self._prs = Presentation(BytesIO(data))
+        self.tokens = {}  # "[Bullet Point 1]" -> [(slide, shape, paragraph)]
+        self.texts = []   # (slide, shape, text frame text)
+        self.tables = {}  # slide -> [(shape, header row texts)]
+        for si, slide in enumerate(Presentation(BytesIO(data)).slides):
+            for hi, shape in enumerate(slide.shapes):
+                if shape.has_text_frame:
+                    self.texts.append((si, hi, shape.text_frame.text or ""))
+                    for pi, para in enumerate(shape.text_frame.paragraphs):
+                        for token in TOKEN.findall(para.text or ""):
+                            self.tokens.setdefault(token, []).append((si, hi, pi))
+                elif shape.has_table:
+                    header = tuple(c.text_frame.text.strip() for c in shape.table.rows[0].cells)
+                    self.tables.setdefault(si, []).append((hi, header))
+
+    def copy(self):
+        """A fresh Presentation to fill; the cached template is never written to."""
+        return copy.deepcopy(self._prs)
+
+    def locate(self, token, slide=None):
+        """[(slide, shape, paragraph)] holding `token`, optionally on one slide only."""
+        return [loc for loc in self.tokens.get(token, ()) if slide is None or loc[0] == slide]
+
+    def find_text(self, fragment, slide=None):
+        """(slide, shape) of the first text frame containing `fragment`, or None."""
+        return next(
+            ((si, hi) for si, hi, text in self.texts if fragment in text and slide in (None, si)),
+            None,
+        )
+
+    def table_shapes(self, slide):
+        """[(shape, header row texts)] for the tables on one slide, in shape order."""
+        return self.tables.get(slide, [])
+
+
+_templates = {}
+_lock = threading.Lock()
+
+
+def load_template(path):
+    """Cached TemplateDeck for `path`; parsed again only when the file changes."""
+    key = os.path.abspath(path)
+    mtime = os.stat(key).st_mtime_ns
+    with _lock:
+        entry = _templates.get(key)
+        if entry is None or entry[0] != mtime:
+            with open(key, "rb") as fh:
+                entry = (mtime, TemplateDeck(fh.read()))
+            _templates[key] = entry
+        return entry[1]
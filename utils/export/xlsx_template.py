@@ -0,0 +1,335 @@
+# utils/export/xlsx_template.py
+
+import copy
+import math
+import os
+import re
+import threading
+import zipfile
+from io import BytesIO
+
+from lxml import etree
+
+NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+CALC_CHAIN = "xl/calcChain.xml"
+
+
+def _q(tag):
+    return f"{{{NS}}}{tag}"
+
+
+CELL_REF = re.compile(r"(\$?)([A-Z]{1,3})(\$?)(\d+)")
+
+
+def col_letter(col):
+    letters = ""
+    while col:
+        col, rem = divmod(col - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def col_index(letters):
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def split_ref(ref):
+    """("B", 12) from "B12"."""
+    m = CELL_REF.fullmatch(ref)
+    return m.group(2), int(m.group(4))
+
+
+class RowBlock:
+    """
+    Row renumbering for resizing the block of rows first..end to first..last.
+    Rows below the block move with it; when shrinking, rows last+1..end go away.
+    A range ending on the block's last row follows it, so ranges over the block
+    (conditional formats, totals) cover exactly the rows kept.
+    """
+
+    def __init__(self, first, end, last):
+        self.first, self.end, self.last = first, end, last
+        self.delta = last - end
+
+    def row(self, r):
+        """New number of row r, or None if it is removed."""
+        if r <= min(self.end, self.last):
+            return r
+        if r > self.end:
+            return r + self.delta
+        return None
+
+    def span(self, r1, r2):
+        """New (start, end) rows of a range, or None if nothing of it is left."""
+        s = self.row(r1)
+        if s is None:  # starts in the removed rows: from the first row after them
+            s = self.last + 1
+        e = self.last if r2 == self.end else self.row(r2)
+        if e is None:  # ends in the removed rows: at the last row kept
+            e = self.last
+        return (s, e) if s <= e else None
+
+    def ref(self, ref):
+        """An A1 reference or range moved with the block; "#REF!" if it was removed."""
+        parts = ref.split(":")
+        cells = [CELL_REF.fullmatch(p) for p in parts]
+        if not all(cells):
+            return ref  # whole columns or rows, names: nothing row-relative to move
+        if len(cells) == 1:
+            new = self.row(int(cells[0].group(4)))
+            return "#REF!" if new is None else _with_row(cells[0], new)
+        span = self.span(int(cells[0].group(4)), int(cells[1].group(4)))
+        if span is None:
+            return "#REF!"
+        return f"{_with_row(cells[0], span[0])}:{_with_row(cells[1], span[1])}"
+
+    def formula(self, text, sheet_name):
+        """Formula text with every reference into this sheet moved with the block."""
+        from openpyxl.formula import Tokenizer
+
+        tok = Tokenizer("=" + text)
+        out = []
+        for item in tok.items:
+            if item.type == "OPERAND" and item.subtype == "RANGE":
+                sheet, bang, ref = item.value.rpartition("!")
+                if not bang or sheet.strip("'") == sheet_name:
+                    item.value = sheet + bang + self.ref(ref)
+            out.append(item.value)
+        return "".join(out)
+
+
+def _with_row(match, row):
+    return f"{match.group(1)}{match.group(2)}{match.group(3)}{row}"
+
+
+class XlsxTemplate:
+    """
+    An .xlsx template parsed once per process. fill() writes values into a copy
+    of its first sheet at the XML level and returns a new workbook: every other
+    part (other sheets, styles, conditional formats, print setup) is kept as
+    is, which is what openpyxl's load/save round trip cost most of the time for.
+    """
+
+    def __init__(self, data):
+        with zipfile.ZipFile(BytesIO(data)) as zf:
+            self.parts = {name: zf.read(name) for name in zf.namelist()}
+        workbook = etree.fromstring(self.parts["xl/workbook.xml"])
+        rels = etree.fromstring(self.parts["xl/_rels/workbook.xml.rels"])
+        targets = {r.get("Id"): r.get("Target") for r in rels}
+        first = workbook.find(f"{_q('sheets')}/{_q('sheet')}")
+        self.sheet_name = first.get("name")
+        target = targets[first.get(f"{{{REL_NS}}}id")].lstrip("/")
+        self.sheet_part = target if target.startswith("xl/") else "xl/" + target
+        self._sheet = etree.fromstring(self.parts[self.sheet_part])
+        self._styles = etree.fromstring(self.parts["xl/styles.xml"])
+        self._strings = []
+        if "xl/sharedStrings.xml" in self.parts:
+            for si in etree.fromstring(self.parts["xl/sharedStrings.xml"]):
+                self._strings.append("".join(t.text or "" for t in si.iter(_q("t"))))
+
+    def header(self, row):
+        """{cell text: column index} for the non-empty cells of one row."""
+        out = {}
+        for c in self._sheet.iter(_q("c")):
+            letters, r = split_ref(c.get("r"))
+            if r != row:
+                continue
+            text = self._text(c)
+            if text:
+                out[text.strip()] = col_index(letters)
+        return out
+
+    def _text(self, c):
+        if c.find(_q("f")) is not None:
+            return "=" + (c.findtext(_q("f")) or "")
+        v = c.findtext(_q("v"))
+        if c.get("t") == "s" and v is not None:
+            return self._strings[int(v)]
+        if c.get("t") == "inlineStr":
+            return "".join(t.text or "" for t in c.iter(_q("t")))
+        return v or ""
+
+    def fill(self, values, fills=None, block=None):
+        """
+        Workbook bytes with the template's first sheet updated:
+          values  {(row, col): value}; None / NaN / "" clear the cell, styles stay
+          fills   {(row, col): "RRGGBB"} solid fill on top of the cell's style
+          block   (first, end, last): resize rows first..end to first..last first
+                  (see RowBlock); values and fills use the resized numbering
+        """
+        sheet = copy.deepcopy(self._sheet)
+        styles = copy.deepcopy(self._styles) if fills else None
+        sheet_data = sheet.find(_q("sheetData"))
+        if block:
+            self._resize(sheet, sheet_data, RowBlock(*block))
+
+        rows = {int(r.get("r")): r for r in sheet_data}
+        cells = {}
+        for r, row in rows.items():
+            for c in row:
+                cells[r, col_index(split_ref(c.get("r"))[0])] = c
+        fill_xfs = {}
+        for (r, col), value in sorted(values.items()):
+            _set_value(_cell(sheet_data, rows, cells, r, col), value)
+        for (r, col), rgb in (fills or {}).items():
+            c = _cell(sheet_data, rows, cells, r, col)
+            key = (c.get("s", "0"), rgb)
+            if key not in fill_xfs:
+                fill_xfs[key] = _add_fill_style(styles, int(key[0]), rgb)
+            c.set("s", str(fill_xfs[key]))
+
+        parts = dict(self.parts)
+        parts[self.sheet_part] = _xml(sheet)
+        if styles is not None:
+            parts["xl/styles.xml"] = _xml(styles)
+        if block:
+            _drop_calc_chain(parts)
+        out = BytesIO()
+        with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name, data in parts.items():
+                zf.writestr(name, data)
+        return out.getvalue()
+
+    def _resize(self, sheet, sheet_data, block):
+        rows = list(sheet_data)
+        if block.delta > 0:
+            # more rows than the template has: repeat the block's last row, emptied
+            end_row = next(r for r in rows if int(r.get("r")) == block.end)
+            pos = sheet_data.index(end_row) + 1
+            for k in range(1, block.delta + 1):
+                new = copy.deepcopy(end_row)
+                for c in new:
+                    for child in list(c):
+                        c.remove(child)
+                    c.attrib.pop("t", None)
+                new.set("r", str(block.end + k))
+                sheet_data.insert(pos + k - 1, new)
+                for c in new:
+                    c.set("r", f"{split_ref(c.get('r'))[0]}{block.end + k}")
+        for row in rows:
+            r = int(row.get("r"))
+            new_r = block.row(r)
+            if new_r is None:
+                sheet_data.remove(row)
+                continue
+            if new_r != r:
+                row.set("r", str(new_r))
+                for c in row:
+                    c.set("r", f"{split_ref(c.get('r'))[0]}{new_r}")
+        for f in sheet.iter(_q("f")):
+            if f.text:
+                f.text = block.formula(f.text, self.sheet_name)
+            if f.get("ref"):
+                f.set("ref", block.ref(f.get("ref")))
+        for el in sheet.iter(_q("dimension"), _q("mergeCell")):
+            el.set("ref", block.ref(el.get("ref")))
+        merges = sheet.find(_q("mergeCells"))
+        if merges is not None:
+            for m in [m for m in merges if "#REF!" in m.get("ref")]:
+                merges.remove(m)
+            merges.set("count", str(len(merges)))
+        for cf in sheet.iter(_q("conditionalFormatting")):
+            refs = [block.ref(ref) for ref in cf.get("sqref").split()]
+            cf.set("sqref", " ".join(ref for ref in refs if ref != "#REF!"))
+
+
+def _xml(root):
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _cell(sheet_data, rows, cells, r, col):
+    """The <c> element for (r, col), created in row / column order if missing."""
+    c = cells.get((r, col))
+    if c is not None:
+        return c
+    row = rows.get(r)
+    if row is None:
+        row = etree.Element(_q("row"), r=str(r))
+        later = [el for el in sheet_data if int(el.get("r")) > r]
+        if later:
+            later[0].addprevious(row)
+        else:
+            sheet_data.append(row)
+        rows[r] = row
+    new = etree.Element(_q("c"), r=f"{col_letter(col)}{r}")
+    later = [c for c in row if col_index(split_ref(c.get("r"))[0]) > col]
+    if later:
+        later[0].addprevious(new)
+    else:
+        row.append(new)
+    cells[r, col] = new
+    return new
+
+
+def _set_value(c, value):
+    for child in list(c):
+        c.remove(child)
+    c.attrib.pop("t", None)
+    if value is None or value == "" or (isinstance(value, float) and math.isnan(value)):
+        return
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        etree.SubElement(c, _q("v")).text = repr(value) if isinstance(value, float) else str(value)
+        return
+    c.set("t", "inlineStr")
+    t = etree.SubElement(etree.SubElement(c, _q("is")), _q("t"))
+    t.text = str(value)
+    if t.text != t.text.strip():
+        t.set("{http://www.w3.org/XML/1998/namespace}space", "preserve")
+
+
+def _add_fill_style(styles, base_xf, rgb):
+    """Index of a new cell format: base_xf with a solid rgb fill."""
+    fills = styles.find(_q("fills"))
+    fill = etree.SubElement(fills, _q("fill"))
+    pattern = etree.SubElement(fill, _q("patternFill"), patternType="solid")
+    etree.SubElement(pattern, _q("fgColor"), rgb="FF" + rgb)
+    etree.SubElement(pattern, _q("bgColor"), indexed="64")
+    fills.set("count", str(len(fills)))
+
+    xfs = styles.find(_q("cellXfs"))
+    xf = copy.deepcopy(xfs[base_xf])
+    xf.set("fillId", str(len(fills) - 1))
+    xf.set("applyFill", "1")
+    xfs.append(xf)
+    xfs.set("count", str(len(xfs)))
+    return len(xfs) - 1
+
+
+def _drop_calc_chain(parts):
+    # moved formulas invalidate the calculation chain; Excel rebuilds it and recalculates
+    if parts.pop(CALC_CHAIN, None) is None:
+        return
+    rels = etree.fromstring(parts["xl/_rels/workbook.xml.rels"])
+    for rel in [r for r in rels if r.get("Target", "").endswith("calcChain.xml")]:
+        rels.remove(rel)
+    parts["xl/_rels/workbook.xml.rels"] = _xml(rels)
+    types = etree.fromstring(parts["[Content_Types].xml"])
+    for ov in [o for o in types if o.get("PartName") == "/" + CALC_CHAIN]:
+        types.remove(ov)
+    parts["[Content_Types].xml"] = _xml(types)
+    workbook = etree.fromstring(parts["xl/workbook.xml"])
+    calc = workbook.find(_q("calcPr"))
+    if calc is not None:
+        calc.set("fullCalcOnLoad", "1")
+    parts["xl/workbook.xml"] = _xml(workbook)
+
+
+_templates = {}
+_lock = threading.Lock()
+
+
+def load_template(path):
+    """Cached XlsxTemplate for `path`; parsed again only when the file changes."""
+    key = os.path.abspath(path)
+    mtime = os.stat(key).st_mtime_ns
+    with _lock:
+        entry = _templates.get(key)
+        if entry is None or entry[0] != mtime:
+            with open(key, "rb") as fh:
+                entry = (mtime, XlsxTemplate(fh.read()))
+            _templates[key] = entry
+        return entry[1]
@@ -0,0 +1,95 @@
+import importlib.util
+import os
+from io import BytesIO
+
+# PyMuPDF is imported when a document is opened; checking for it here is cheap
+HAVE_PYMUPDF = importlib.util.find_spec("fitz") is not None
+
+
+#───PDF Backends──────────────────────────────────────────────────────────────────
+# A backend turns page numbers (1-based) into plain text. Character-level geometry
+# (word boxes, font names) always comes from pdfplumber; see MPIDocument.words().
+
+# pdfplumber's default line clustering tolerance for extract_text()
+Y_TOLERANCE = 3
+
+
+class PdfplumberBackend:
+    name = "pdfplumber"
+
+    def __init__(self, source):
+        import pdfplumber
+
+        self.pdf = pdfplumber.open(BytesIO(source) if isinstance(source, bytes) else source)
+        self.page_count = len(self.pdf.pages)
+
+    def text(self, pnum):
+        page = self.pdf.pages[pnum - 1]
+        text = page.extract_text() or ""
+        page.close()
+        return text
+
+    def close(self):
+        self.pdf.close()
+
+
+class PyMuPDFBackend:
+    """
+    Fast path for plain text. MuPDF's own line grouping differs from pdfplumber's,
+    so lines are rebuilt from word boxes the way pdfplumber's extract_text() does:
+    cluster words by top within Y_TOLERANCE, order each line left to right and
+    join with single spaces. That keeps every downstream regex unchanged.
+    """
+    name = "pymupdf"
+
+    def __init__(self, source):
+        import fitz  # PyMuPDF
+
+        if isinstance(source, bytes):
+            self.doc = fitz.open(stream=source, filetype="pdf")
+        else:
+            self.doc = fitz.open(source)
+        self.page_count = len(self.doc)
+
+    def text(self, pnum):
+        words = self.doc[pnum - 1].get_text("words")
+        return "\n".join(" ".join(w[4] for w in line) for line in cluster_lines(words))
+
+    def close(self):
+        self.doc.close()
+
+
+def cluster_lines(words):
+    """Group (x0, top, x1, bottom, text, ...) tuples into lines, top to bottom."""
+    tops = sorted({w[1] for w in words})
+    cluster_of, cid, last = {}, -1, None
+    for top in tops:
+        if last is None or top > last + Y_TOLERANCE:
+            cid += 1
+        cluster_of[top] = cid
+        last = top
+    lines = {}
+    for w in words:
+        lines.setdefault(cluster_of[w[1]], []).append(w)
+    return [sorted(lines[k], key=lambda w: w[0]) for k in sorted(lines)]
+
+
+BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+}
+
+
+def default_backend():
+    """FIDSYNC_PDF_BACKEND if set, else PyMuPDF when it is installed."""
+    name = os.environ.get("FIDSYNC_PDF_BACKEND", "").strip().lower()
+    if name in BACKENDS and (name != PyMuPDFBackend.name or HAVE_PYMUPDF):
+        return name
+    return PyMuPDFBackend.name if HAVE_PYMUPDF else PdfplumberBackend.name
+
+
+def open_backend(source, name=None):
+    name = name or default_backend()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown PDF backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name](source)
@@ -0,0 +1,225 @@
+"""
+Headless batch run of the Writeup & Rec pipeline over a directory of MPI reports:
+
+    python -m utils.mpi.batch in_dir out_dir [--workers N] [--no-decks]
+
+Run it from the repository root (the page and its templates are read from
+there). Each report is processed in its own worker process and written to
+out_dir/<client>/<report name>/:
+
+    ips_screening.csv, ips_screening_raw.csv   IPS icon and raw status tables
+    investment_metrics.xlsx                    populated investment_metrics_template.xlsx
+    decks/<fund> Writeup.pptx                  one writeup deck per fund
+
+out_dir/summary.csv lists every report with its status, step timings and any
+error; full tracebacks go to out_dir/errors.log.
+"""
+import argparse
+import csv
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+import traceback
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import streamlit as st
+
+from utils.mpi.parallel import default_workers
+
+SUMMARY_FIELDS = [
+    "report", "client", "status", "funds", "decks", "deck_failures",
+    "seconds", "step_seconds", "output", "error",
+]
+
+
+#───Helpers──────────────────────────────────────────────────────────────────
+
+def find_reports(in_dir):
+    return sorted(
+        os.path.join(in_dir, name) for name in os.listdir(in_dir)
+        if name.lower().endswith(".pdf") and os.path.isfile(os.path.join(in_dir, name))
+    )
+
+
+def safe_name(text, fallback="report"):
+    """File-system safe folder / file name."""
+    name = re.sub(r"[^\w\-. &()]+", "_", (text or "").strip()).strip(" ._")
+    return name[:120] or fallback
+
+
+def report_dir(out_dir, prepared_for, report_path):
+    # a client can have several reports (plans, quarters); keep each in its own folder
+    stem = safe_name(os.path.splitext(os.path.basename(report_path))[0])
+    return os.path.join(out_dir, safe_name(prepared_for, "Unknown Client"), stem)
+
+
+#───Pipeline──────────────────────────────────────────────────────────────────
+
+def run_pipeline(page, doc, timings):
+    """Steps 1–14 of page.run() in the same order, without the UI around them."""
+    def step(name, fn, *args):
+        t = time.perf_counter()
+        out = fn(*args)
+        timings[name] = round(time.perf_counter() - t, 3)
+        return out
+
+    step("page1", page.process_page1, doc.text(1))
+    step("toc", page.process_toc, "".join(doc.text(p) for p in doc.pages(1, 4)))
+
+    # one worker per report already; parse this report in-process
+    fs_page = st.session_state.get("factsheets_page")
+    step("prefetch", lambda: doc.prefetch(word_pages=doc.pages(fs_page) if fs_page else (), workers=1))
+    step("sections", page.process_sections, doc)
+
+    sp = st.session_state.get("scorecard_page")
+    tot = st.session_state.get("total_options")
+    pp = st.session_state.get("performance_page")
+    if not (sp and tot is not None and pp):
+        raise ValueError("Missing scorecard, performance page, or total options")
+    step("scorecard_ips", page.step3_5_6_scorecard_and_ips, doc, sp, pp, st.session_state.get("factsheets_page"), tot)
+
+    names = [b.get("Fund Name") for b in st.session_state.get("fund_blocks", [])]
+    step("factsheets", page.step6_process_factsheets, doc, names)
+    step("fund_facts", page.step12_process_fund_facts, doc)
+    step("returns", page.step7_extract_returns, doc)
+    step("calendar_year", page.step8_calendar_returns, doc)
+    step("mpt_3yr", page.step9_risk_analysis_3yr, doc)
+    step("mpt_5yr", page.step10_risk_analysis_5yr, doc)
+    step("mpt_summary", page.step11_create_summary)
+    step("risk_adjusted", page.step13_process_risk_adjusted_returns, doc)
+    step("peer_rank", page.step14_extract_peer_risk_adjusted_return_rank, doc)
+    step("bullet_context", page.derive_bullet_context)
+    step("proposed", page.extract_proposed_scorecard_blocks, doc)
+
+
+def export_decks(page, doc, dest):
+    """One writeup deck per fund; returns (decks written, {fund: error})."""
+    from utils.mpi.decks import deck_file_names, deck_states, render_decks
+
+    os.makedirs(dest, exist_ok=True)
+    states, failures = deck_states(page, doc)
+    names = deck_file_names(states)
+    written = 0
+    # reports already run one per worker process; the decks render in this one
+    for fund, data, error in render_decks(states, workers=1, page=page):
+        if error:
+            failures[fund] = error
+            continue
+        with open(os.path.join(dest, names[fund]), "wb") as fh:
+            fh.write(data)
+        written += 1
+    return written, failures
+
+
+def process_report(path, out_dir, decks=True):
+    """Worker: run one report end to end and return its summary row."""
+    # bare-mode Streamlit warns on every widget call; keep worker output to errors
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore", FutureWarning)
+    from utils.export.metrics_excel import populate_metrics_template
+    from utils.mpi.document import MPIDocument
+    from utils.system.pages import WRITEUP_REC_PAGE, load_page
+
+    row = {"report": os.path.basename(path), "status": "failed"}
+    timings = {}
+    start = time.perf_counter()
+    try:
+        page = load_page(WRITEUP_REC_PAGE)
+        # the page keeps its state in one (bare-mode) session per process
+        for key in list(st.session_state.keys()):
+            del st.session_state[key]
+
+        with MPIDocument.open(path) as doc:
+            run_pipeline(page, doc, timings)
+            dest = report_dir(out_dir, st.session_state.get("prepared_for"), path)
+            os.makedirs(dest, exist_ok=True)
+            row["client"] = st.session_state.get("prepared_for") or ""
+            row["output"] = dest
+
+            df_icon = st.session_state.get("ips_icon_table")
+            df_raw = st.session_state.get("ips_raw_table")
+            df_icon.to_csv(os.path.join(dest, "ips_screening.csv"), index=False)
+            df_raw.to_csv(os.path.join(dest, "ips_screening_raw.csv"), index=False)
+            row["funds"] = len(df_icon)
+
+            t = time.perf_counter()
+            xlsx = populate_metrics_template(
+                df_icon,
+                st.session_state.get("fund_factsheets_data", []),
+                prepared_for=st.session_state.get("prepared_for") or "",
+                report_date=st.session_state.get("report_date") or "",
+            )
+            with open(os.path.join(dest, "investment_metrics.xlsx"), "wb") as fh:
+                fh.write(xlsx.getvalue())
+            timings["excel"] = round(time.perf_counter() - t, 3)
+
+            if decks:
+                t = time.perf_counter()
+                written, failures = export_decks(page, doc, os.path.join(dest, "decks"))
+                timings["decks"] = round(time.perf_counter() - t, 3)
+                row["decks"] = written
+                row["deck_failures"] = len(failures)
+                if failures:
+                    row["error"] = "; ".join(f"{fund}: {err}" for fund, err in failures.items())
+        row["status"] = "ok" if not row.get("deck_failures") else "partial"
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+        row["traceback"] = traceback.format_exc()
+    row["seconds"] = round(time.perf_counter() - start, 3)
+    row["step_seconds"] = ";".join(f"{k}={v}" for k, v in timings.items())
+    return row
+
+
+#───CLI──────────────────────────────────────────────────────────────────
+
+def run_batch(in_dir, out_dir, workers=None, decks=True, log=print):
+    reports = find_reports(in_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    workers = max(1, min(workers or default_workers(), len(reports) or 1))
+    rows = []
+    if reports:
+        # spawn: workers must not inherit a forked Streamlit or PDF handle state
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = {pool.submit(process_report, path, out_dir, decks): path for path in reports}
+            for done, fut in enumerate(as_completed(futures), 1):
+                path = futures[fut]
+                try:
+                    row = fut.result()
+                except Exception as e:  # worker died (e.g. out of memory)
+                    row = {"report": os.path.basename(path), "status": "failed", "error": f"{type(e).__name__}: {e}"}
+                rows.append(row)
+                if row.get("traceback"):
+                    with open(os.path.join(out_dir, "errors.log"), "a", encoding="utf-8") as fh:
+                        fh.write(f"── {row['report']}\n{row['traceback']}\n")
+                log(f"[{done}/{len(reports)}] {row['report']}: {row['status']} ({row.get('seconds', '-')}s)"
+                    + (f" - {row['error']}" if row.get("error") else ""))
+
+    rows.sort(key=lambda r: r["report"])
+    with open(os.path.join(out_dir, "summary.csv"), "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Process a directory of MPI PDFs without the Streamlit UI.")
+    parser.add_argument("in_dir", help="directory of MPI PDF reports")
+    parser.add_argument("out_dir", help="output directory (one folder per client)")
+    parser.add_argument("--workers", type=int, default=None, help="reports processed in parallel (default: all cores)")
+    parser.add_argument("--no-decks", action="store_true", help="skip the per-fund PowerPoint decks")
+    args = parser.parse_args(argv)
+
+    rows = run_batch(args.in_dir, args.out_dir, args.workers, decks=not args.no_decks)
+    failed = sum(r["status"] == "failed" for r in rows)
+    print(f"{len(rows)} report(s), {failed} failed. Summary: {os.path.join(args.out_dir, 'summary.csv')}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
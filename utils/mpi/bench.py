@@ -0,0 +1,181 @@
+"""
+Benchmarks for the MPI extraction pipeline on synthetic reports
+(utils.mpi.synthetic), so performance claims can be measured and compared:
+
+    python -m utils.mpi.bench run [--funds 25 100 400] [--repeat 3] [--out bench.json]
+    python -m utils.mpi.bench compare baseline.json bench.json [--threshold 0.25]
+
+Run it from the repository root (the writeup template is read from there).
+`run` times every Writeup & Rec step in page order on a freshly parsed report
+(see batch.run_pipeline), the scorecard and ticker extractors on their own, the
+writeup deck export, and the whole sequence end to end; each is the median of
+--repeat runs. Fund-type lookups stay offline so no run waits on the network.
+`compare` exits non-zero when any step got slower than the baseline by more
+than --threshold (and by more than --min-seconds, so millisecond noise on tiny
+steps is ignored).
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+import streamlit as st
+
+from utils.mpi.synthetic import MAX_FUNDS, MIN_FUNDS, write_corpus
+
+DEFAULT_SIZES = (25, 100, 400)
+DEFAULT_CORPUS = os.path.join(tempfile.gettempdir(), "fidsync_bench")
+
+
+#───Helpers──────────────────────────────────────────────────────────────────
+
+def corpus_paths(corpus_dir, sizes, seed=0):
+    """{fund count: report path}, generating any report not in corpus_dir yet."""
+    paths = {n: os.path.join(corpus_dir, f"report_{n}.pdf") for n in sizes}
+    missing = [n for n, path in paths.items() if not os.path.exists(path)]
+    if missing:
+        write_corpus(corpus_dir, sizes=missing, seed=seed)
+    return paths
+
+
+def _timed(timings, name, fn, *args, **kwargs):
+    t = time.perf_counter()
+    out = fn(*args, **kwargs)
+    timings[name] = time.perf_counter() - t
+    return out
+
+
+def run_once(page, path):
+    """One pass over one report; returns {step: seconds}."""
+    from utils.mpi.batch import run_pipeline
+    from utils.mpi.document import MPIDocument
+    from utils.mpi.steps import extract_fund_tickers, extract_scorecard_blocks
+
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    timings = {}
+    start = time.perf_counter()
+    with MPIDocument.open(path) as doc:
+        run_pipeline(page, doc, timings)
+        funds = [r["Matched Fund Name"] for r in st.session_state.get("fund_factsheets_data", [])]
+        if funds:
+            st.session_state["selected_fund"] = funds[0]
+            page.step15_display_selected_fund(funds[0])
+            page.step16_bullet_points(doc)
+            page.step16_5_locate_proposed_factsheets_with_overview(doc, context_lines=3, min_score=60)
+            _timed(timings, "export_ppt", page.step17_export_to_ppt)
+        timings["end_to_end"] = time.perf_counter() - start
+
+        # the pages are laid out by now: these time the parsing alone
+        sp = st.session_state.get("scorecard_page")
+        pp = st.session_state.get("performance_page")
+        fs = st.session_state.get("factsheets_page")
+        blocks = _timed(timings, "extract_scorecard_blocks", extract_scorecard_blocks, doc, sp)
+        names = [b["Fund Name"] for b in blocks]
+        _timed(timings, "extract_fund_tickers", extract_fund_tickers, doc, pp, names, fs)
+    return timings
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, repeat=3, corpus_dir=DEFAULT_CORPUS, log=print):
+    """{"meta": ..., "results": {fund count: {step: {median, min, runs}}}}."""
+    from utils.system.pages import WRITEUP_REC_PAGE, load_page
+
+    page = load_page(WRITEUP_REC_PAGE)
+    paths = corpus_paths(corpus_dir, sizes)
+    saved = st.download_button
+    st.download_button = lambda *a, **k: False
+    results = {}
+    try:
+        for n, path in paths.items():
+            runs = [run_once(page, path) for _ in range(repeat)]
+            results[str(n)] = {
+                step: {
+                    "median": round(statistics.median(r[step] for r in runs), 4),
+                    "min": round(min(r[step] for r in runs), 4),
+                    "runs": [round(r[step], 4) for r in runs],
+                }
+                for step in runs[0]
+            }
+            log(f"{n} funds: {results[str(n)]['end_to_end']['median']:.2f}s end to end")
+    finally:
+        st.download_button = saved
+    return {
+        "meta": {
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.25, min_seconds=0.01):
+    """[(funds, step, base, cur, ratio, regressed)] for every step timed in both runs."""
+    rows = []
+    for n, steps in current["results"].items():
+        for step, cur in steps.items():
+            base = baseline["results"].get(n, {}).get(step)
+            if base is None:
+                continue
+            b, c = base["median"], cur["median"]
+            ratio = c / b if b else float("inf") if c else 1.0
+            regressed = c > b * (1 + threshold) and c - b > min_seconds
+            rows.append((n, step, b, c, ratio, regressed))
+    return rows
+
+
+#───CLI──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the MPI extraction pipeline.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="time every step on synthetic reports")
+    run.add_argument("--funds", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                     help=f"report sizes in funds ({MIN_FUNDS} to {MAX_FUNDS})")
+    run.add_argument("--repeat", type=int, default=3, help="runs per report; the median is kept")
+    run.add_argument("--corpus", default=DEFAULT_CORPUS, help="where generated reports are kept")
+    run.add_argument("--out", default="bench.json", help="results file")
+    cmp = sub.add_parser("compare", help="fail when a step regressed against a baseline")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown (0.25 = 25%%)")
+    cmp.add_argument("--min-seconds", type=float, default=0.01, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        for n in args.funds:
+            if not MIN_FUNDS <= n <= MAX_FUNDS:
+                parser.error(f"fund count {n} outside {MIN_FUNDS}..{MAX_FUNDS}")
+        # bare-mode Streamlit warns on every widget call
+        logging.disable(logging.WARNING)
+        warnings.simplefilter("ignore", FutureWarning)
+        os.environ["FIDSYNC_OFFLINE"] = "1"
+        results = run_benchmarks(args.funds, args.repeat, args.corpus)
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        print(f"Results: {args.out}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    with open(args.current, encoding="utf-8") as fh:
+        current = json.load(fh)
+    rows = compare_results(baseline, current, args.threshold, args.min_seconds)
+    for n, step, b, c, ratio, regressed in rows:
+        flag = "  REGRESSED" if regressed else ""
+        print(f"{n:>4} funds  {step:<26} {b:9.4f}s -> {c:9.4f}s  ({ratio:5.2f}x){flag}")
+    failed = sum(r[-1] for r in rows)
+    print(f"{len(rows)} step(s) compared, {failed} regressed (threshold {args.threshold:.0%})")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
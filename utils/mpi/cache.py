@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+
+from utils.mpi.document import MPIDocument, content_digest, read_bytes
+
+
+#───Parsed Report Cache──────────────────────────────────────────────────────────────────
+
+class ReportCache:
+    """
+    LRU cache of parsed MPI reports keyed by the SHA-256 of the uploaded bytes.
+    Streamlit reruns the page script on every widget click; with the document (and
+    everything memoized on it) cached here, a rerun on the same upload skips the
+    re-parse entirely. Bounded by entry count and by an approximate byte budget.
+    """
+
+    def __init__(self, max_entries=8, max_bytes=512 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, digest):
+        return digest in self._entries
+
+    def load(self, source):
+        data = read_bytes(source)
+        digest = content_digest(data)
+        with self._lock:
+            doc = self._entries.get(digest)
+            if doc is not None:
+                self.hits += 1
+                self._entries.move_to_end(digest)
+                return doc
+            self.misses += 1
+            doc = MPIDocument(data, digest=digest)
+            self._entries[digest] = doc
+            self._evict()
+            return doc
+
+    def total_bytes(self):
+        return sum(doc.nbytes for doc in self._entries.values())
+
+    def _evict(self):
+        # never evict the entry that was just used
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_entries or self.total_bytes() > self.max_bytes
+        ):
+            _, doc = self._entries.popitem(last=False)
+            doc.close()
+
+    def clear(self):
+        with self._lock:
+            for doc in self._entries.values():
+                doc.close()
+            self._entries.clear()
+
+
+report_cache = ReportCache()
+
+
+def load_report(source):
+    """Parsed MPIDocument for an upload, shared across reruns of the same file."""
+    return report_cache.load(source)
@@ -0,0 +1,187 @@
+"""
+Writeup decks for every fund of a report in one pass, instead of a
+select / rerun / export cycle per fund:
+
+    states, failures = deck_states(page, doc)      # per-fund tables, in page order
+    data, failures = export_zip(states, combined=False, progress=...)
+
+deck_states reuses the tables Steps 1-14 already extracted: per fund it only
+runs the page's Step 15 / 16 functions, and Step 16.5 (the proposed-fund
+overviews, the same for every fund) once. Each fund's inputs are snapshotted
+so the decks can be rendered from them across a process pool. A fund that
+fails is reported with its error and left out; the other decks still ship.
+"""
+import logging
+import multiprocessing
+import warnings
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from copy import deepcopy
+from io import BytesIO
+
+import streamlit as st
+
+from utils.mpi.parallel import default_workers
+
+# Session keys build_writeup_pptx reads.
+DECK_KEYS = (
+    "selected_fund", "report_date", "fund_factsheets_data", "ips_icon_table",
+    "proposed_funds_confirmed_df", "step16_5_proposed_overview_lookup", "bullet_points",
+    "ear_table1_data", "ear_table2_data", "ear_table3_data",
+    "raj_table1_data", "raj_table2_data", "qualfact_table1_data", "qualfact_table2_data",
+)
+# Written per fund by Steps 15 / 16; cleared first so a fund never inherits the previous fund's tables.
+FUND_KEYS = (
+    "bullet_points", "ear_table1_data", "ear_table2_data", "ear_table3_data",
+    "raj_table1_data", "raj_table2_data", "qualfact_table1_data", "qualfact_table2_data",
+)
+
+# Starting a worker (page imports + template parse) costs about as much as a few decks.
+MIN_DECKS_PER_WORKER = 4
+
+
+#───Per-Fund Inputs──────────────────────────────────────────────────────────────────
+
+def deck_states(page, doc, funds=None, on_fund=None):
+    """
+    ({fund: snapshot of DECK_KEYS}, {fund: error}) for the given funds (default:
+    every factsheet fund). The single-fund selection in the session is restored
+    afterwards. on_fund(done, total, fund) is called after each fund.
+    """
+    if funds is None:
+        funds = [r["Matched Fund Name"] for r in st.session_state.get("fund_factsheets_data", [])]
+    keep = DECK_KEYS + ("step16_3_selected_overview_lookup",)
+    saved = {k: st.session_state[k] for k in keep if k in st.session_state}
+    states, failures = {}, {}
+    try:
+        # the proposed-fund overviews do not depend on the selected fund
+        page.step16_5_locate_proposed_factsheets_with_overview(doc, context_lines=3, min_score=60)
+        for done, fund in enumerate(funds, 1):
+            for key in FUND_KEYS:
+                st.session_state.pop(key, None)
+            try:
+                st.session_state["selected_fund"] = fund
+                page.step15_display_selected_fund(fund)
+                page.step16_bullet_points(doc)
+                states[fund] = {k: st.session_state.get(k) for k in DECK_KEYS}
+            except Exception as e:
+                failures[fund] = f"{type(e).__name__}: {e}"
+            if on_fund:
+                on_fund(done, len(funds), fund)
+    finally:
+        for key in keep:
+            st.session_state.pop(key, None)
+        st.session_state.update(saved)
+    return states, failures
+
+
+#───Rendering──────────────────────────────────────────────────────────────────
+
+def render_deck(state, page=None):
+    """pptx bytes for one fund's snapshot; also the worker entry point."""
+    if page is None:
+        # worker process: the page module is executed once per process
+        logging.disable(logging.WARNING)
+        warnings.simplefilter("ignore", FutureWarning)
+        from utils.system.pages import WRITEUP_REC_PAGE, load_page
+
+        page = load_page(WRITEUP_REC_PAGE)
+    out = page.build_writeup_pptx(state)
+    if out is None:
+        raise ValueError("deck not generated (missing IPS or template data)")
+    return out.getvalue()
+
+
+def render_decks(states, workers=None, page=None):
+    """Yield (fund, pptx bytes or None, error or None) as each deck finishes."""
+    workers = workers or default_workers()
+    workers = min(workers, len(states) // MIN_DECKS_PER_WORKER or 1)
+    if workers <= 1:
+        for fund, state in states.items():
+            try:
+                yield fund, render_deck(state, page), None
+            except Exception as e:
+                yield fund, None, f"{type(e).__name__}: {e}"
+        return
+
+    # spawn, not fork: Streamlit serves sessions from threads
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        futures = {pool.submit(render_deck, state): fund for fund, state in states.items()}
+        for fut in as_completed(futures):
+            try:
+                yield futures[fut], fut.result(), None
+            except Exception as e:  # includes a worker that died
+                yield futures[fut], None, f"{type(e).__name__}: {e}"
+
+
+def combine_decks(decks):
+    """
+    One deck with the slides of every deck in order. The writeup slides only
+    reference their layout (no pictures or charts), so copying each slide's
+    shape tree onto a new slide with the same layout is enough.
+    """
+    from pptx import Presentation
+
+    prs = Presentation(BytesIO(decks[0]))
+    layouts = {layout.name: layout for layout in prs.slide_layouts}
+    for data in decks[1:]:
+        for slide in Presentation(BytesIO(data)).slides:
+            new = prs.slides.add_slide(layouts.get(slide.slide_layout.name, prs.slide_layouts[0]))
+            tree = new.shapes._spTree
+            for shape in list(new.shapes):
+                tree.remove(shape._element)
+            for shape in slide.shapes:
+                tree.append(deepcopy(shape._element))
+    out = BytesIO()
+    prs.save(out)
+    return out.getvalue()
+
+
+def deck_file_names(funds):
+    """
+    {fund: "<fund> Writeup.pptx"} with names that are unique even where fund
+    names sanitize (or case-fold) to the same file name: later ones get " (2)", " (3)" ...
+    """
+    from utils.mpi.batch import safe_name
+
+    names, taken = {}, set()
+    for fund in funds:
+        stem = safe_name(fund, "fund")
+        name, n = f"{stem} Writeup.pptx", 1
+        while name.lower() in taken:
+            n += 1
+            name = f"{stem} ({n}) Writeup.pptx"
+        taken.add(name.lower())
+        names[fund] = name
+    return names
+
+
+def export_zip(states, combined=False, workers=None, page=None, progress=None):
+    """
+    (zip bytes, {fund: error}): one "<fund> Writeup.pptx" per fund, or a single
+    "All Funds Writeup.pptx" when combined, plus failures.txt if any deck failed.
+    progress(done, total, fund) is called as each deck finishes.
+    """
+    decks, failures = {}, {}
+    for done, (fund, data, error) in enumerate(render_decks(states, workers, page), 1):
+        if error:
+            failures[fund] = error
+        else:
+            decks[fund] = data
+        if progress:
+            progress(done, len(states), fund)
+
+    ordered = [fund for fund in states if fund in decks]
+    buf = BytesIO()
+    # decks are zip archives already; storing them skips a second compression pass
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_STORED) as zf:
+        if combined and ordered:
+            zf.writestr("All Funds Writeup.pptx", combine_decks([decks[f] for f in ordered]))
+        else:
+            names = deck_file_names(states)
+            for fund in ordered:
+                zf.writestr(names[fund], decks[fund])
+        if failures:
+            zf.writestr("failures.txt", "".join(f"{fund}: {err}\n" for fund, err in failures.items()))
+    return buf.getvalue(), failures
@@ -0,0 +1,162 @@
+import hashlib
+import threading
+from io import BytesIO
+from pathlib import Path
+
+from utils.mpi.backends import default_backend, open_backend
+from utils.mpi.parallel import extract_pages
+
+
+#───Helpers──────────────────────────────────────────────────────────────────
+
+def read_bytes(source):
+    """Raw PDF bytes from an upload, file object, path or bytes."""
+    if isinstance(source, (bytes, bytearray)):
+        return bytes(source)
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "read"):
+        source.seek(0)
+        return source.read()
+    return Path(source).read_bytes()
+
+
+def content_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+#───MPI Document Model──────────────────────────────────────────────────────────────────
+
+class MPIDocument:
+    """
+    Parse-once view of an MPI report. Every page is laid out at most once; the
+    text, split lines and words are kept so each pipeline step can read them
+    without touching the PDF again. Page numbers are 1-based, like the TOC.
+
+    Page text comes from the configured backend (PyMuPDF by default, see
+    utils.mpi.backends); word boxes need pdfplumber's character geometry. Both
+    handles are opened lazily from the raw bytes and released by close(); parsed
+    pages and memoized results survive, so a cached document can be reused
+    across Streamlit reruns.
+
+    `page_extractions` counts page layouts (text or word boxes) actually run, so
+    instrumentation can tell a step that parsed pages from one served from memory.
+    """
+
+    def __init__(self, data, digest=None, backend=None):
+        self.data = data
+        self.digest = digest or content_digest(data)
+        self.backend_name = backend or default_backend()
+        self.results = {}
+        self.page_extractions = 0
+        self._pdf = None
+        self._backend = None
+        self._lock = threading.RLock()
+        self._text = {}
+        self._lines = {}
+        self._words = {}
+        with self._lock:
+            self.page_count = self.backend.page_count
+
+    @classmethod
+    def open(cls, source, backend=None):
+        return cls(read_bytes(source), backend=backend)
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = open_backend(self.data, self.backend_name)
+        return self._backend
+
+    @property
+    def pdf(self):
+        if self._pdf is None:
+            import pdfplumber
+
+            self._pdf = pdfplumber.open(BytesIO(self.data))
+        return self._pdf
+
+    def close(self):
+        """Release the PDF handles; they are reopened if an unparsed page is needed."""
+        with self._lock:
+            if self._pdf is not None:
+                self._pdf.close()
+                self._pdf = None
+            if self._backend is not None:
+                self._backend.close()
+                self._backend = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def nbytes(self):
+        """Rough in-memory footprint, used by the report cache size cap."""
+        text = sum(len(t) for t in self._text.values())
+        words = sum(len(w) for w in self._words.values()) * 200
+        return len(self.data) + 2 * text + words
+
+    def memo(self, key, fn):
+        """Cache a derived result (fund blocks, tickers, tables) on the document."""
+        if key not in self.results:
+            self.results[key] = fn()
+        return self.results[key]
+
+    def prefetch(self, pnums=None, word_pages=(), workers=None):
+        """Lay out pages not parsed yet across a process pool; see utils.mpi.parallel."""
+        pnums = self.pages() if pnums is None else pnums
+        word_pages = {p for p in word_pages if (p, False) not in self._words}
+        todo = [p for p in pnums if p not in self._text] + sorted(word_pages)
+        if not todo:
+            return
+        with self._lock:
+            self.page_extractions += len(todo)
+        for pnum, (text, page_words) in extract_pages(self.data, todo, workers, word_pages, self.backend_name).items():
+            self._text.setdefault(pnum, text)
+            if page_words is not None:
+                self._words.setdefault((pnum, False), page_words)
+
+    def pages(self, start=1, end=None):
+        """Page numbers in [start, end), clamped to the document."""
+        end = self.page_count + 1 if end is None else min(end, self.page_count + 1)
+        return range(max(start, 1), end)
+
+    def text(self, pnum):
+        if pnum not in self._text:
+            with self._lock:
+                if pnum not in self._text:
+                    self.page_extractions += 1
+                    self._text[pnum] = self.backend.text(pnum)
+        return self._text[pnum]
+
+    def lines(self, pnum):
+        if pnum not in self._lines:
+            self._lines[pnum] = self.text(pnum).splitlines()
+        return self._lines[pnum]
+
+    def clean_lines(self, pnum):
+        return [ln.strip() for ln in self.lines(pnum) if ln.strip()]
+
+    def words(self, pnum, fontname=False):
+        # always pdfplumber: callers filter on character geometry (top < 100, fontname);
+        # use_text_flow keeps reading order, which the factsheet header parsing relies on
+        key = (pnum, fontname)
+        if key not in self._words:
+            with self._lock:
+                if key not in self._words:
+                    extra = ["fontname"] if fontname else None
+                    self.page_extractions += 1
+                    self._words[key] = self.pdf.pages[pnum - 1].extract_words(
+                        use_text_flow=True, extra_attrs=extra
+                    )
+        return self._words[key]
+
+    def section_lines(self, start, end=None, clean=True):
+        """All lines on pages [start, end); stripped and non-empty unless clean=False."""
+        out = []
+        for pnum in self.pages(start, end):
+            out.extend(self.clean_lines(pnum) if clean else self.lines(pnum))
+        return out
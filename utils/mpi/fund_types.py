@@ -0,0 +1,301 @@
+"""
+Active / Passive fund-type guesses from Yahoo Finance, cached on disk.
+
+Every lookup used to be a blocking yf.Ticker(ticker).info round-trip on every
+rerun. Lookups now go through a SQLite cache of ticker → classification plus the
+summary fields it was made from, refreshed after a TTL:
+
+    FIDSYNC_TICKER_CACHE      cache file (default ~/.cache/fidsync/ticker_info.sqlite3)
+    FIDSYNC_TICKER_TTL_DAYS   days before an entry is refetched (default 30)
+    FIDSYNC_OFFLINE=1         never touch the network; stale entries are still used
+    FIDSYNC_TICKER_WORKERS    lookups run at once by resolve_fund_types (default 8)
+    FIDSYNC_TICKER_TIMEOUT    seconds before a single lookup is given up on (default 10)
+    FIDSYNC_TICKER_DEADLINE   seconds before resolve_fund_types stops waiting at all (default 30)
+
+Pre-populate it for a plan (e.g. before a quarter's batch run):
+
+    python -m utils.mpi.fund_types warm VFIAX FXAIX ... [--file tickers.txt] [--refresh]
+    python -m utils.mpi.fund_types show VFIAX
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "fidsync", "ticker_info.sqlite3")
+DEFAULT_TTL_DAYS = 30
+
+FIELDS = ("fund_type", "long_name", "short_name", "summary")
+
+
+#───Classification──────────────────────────────────────────────────────────────────
+
+def classify_info(info):
+    """'Passive', 'Active' or '' from a yfinance info dict (name and business summary)."""
+    name = (info.get("longName") or info.get("shortName") or "").lower()
+    summary = (info.get("longBusinessSummary") or "").lower()
+    if "index" in name or "index" in summary:
+        return "Passive"
+    if "track" in summary and "index" in summary:
+        return "Passive"
+    if "actively managed" in summary or "actively-managed" in summary:
+        return "Active"
+    if "outperform" in summary or "manager selects" in summary:
+        return "Active"
+    return ""
+
+
+def fetch_yahoo(ticker):
+    """Summary fields for a ticker from Yahoo Finance (network)."""
+    import yfinance as yf
+
+    info = yf.Ticker(ticker).info or {}
+    return {
+        "fund_type": classify_info(info),
+        "long_name": info.get("longName") or "",
+        "short_name": info.get("shortName") or "",
+        "summary": info.get("longBusinessSummary") or "",
+    }
+
+
+#───Ticker Cache──────────────────────────────────────────────────────────────────
+
+def _env_flag(name):
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _env_ttl_days():
+    env = os.environ.get("FIDSYNC_TICKER_TTL_DAYS", "").strip()
+    try:
+        return float(env) if env else DEFAULT_TTL_DAYS
+    except ValueError:
+        return DEFAULT_TTL_DAYS
+
+
+class TickerCache:
+    """
+    SQLite-backed ticker → summary-field cache. `fetch(ticker)` returns the
+    FIELDS dict for one ticker (fetch_yahoo by default; pass a stand-in in tests
+    or offline tools). Safe to share between threads.
+    """
+
+    def __init__(self, path=None, ttl_days=None, offline=None, fetch=None):
+        self.path = path or os.environ.get("FIDSYNC_TICKER_CACHE") or DEFAULT_PATH
+        self.ttl = (ttl_days if ttl_days is not None else _env_ttl_days()) * 86400
+        self.offline = _env_flag("FIDSYNC_OFFLINE") if offline is None else offline
+        self.fetch = fetch or fetch_yahoo
+        self._lock = threading.Lock()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS ticker_info ("
+            " ticker TEXT PRIMARY KEY, fund_type TEXT, long_name TEXT, short_name TEXT,"
+            " summary TEXT, fetched_at REAL)"
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, ticker):
+        """Cached record for a ticker (with fetched_at), fresh or not; None if never fetched."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fund_type, long_name, short_name, summary, fetched_at FROM ticker_info WHERE ticker = ?",
+                (ticker.upper(),),
+            ).fetchone()
+        return dict(zip(FIELDS + ("fetched_at",), row)) if row else None
+
+    def put(self, ticker, record, fetched_at=None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO ticker_info VALUES (?, ?, ?, ?, ?, ?)",
+                (ticker.upper(), *(record.get(f, "") for f in FIELDS), fetched_at or time.time()),
+            )
+            self._conn.commit()
+
+    def is_fresh(self, record):
+        return record is not None and time.time() - record["fetched_at"] < self.ttl
+
+    def record(self, ticker, refresh=False):
+        """
+        Summary record for a ticker: from the cache while fresh, else fetched and
+        stored. Offline, or when the fetch fails, a stale entry is returned as is;
+        None when there is nothing to return.
+        """
+        ticker = (ticker or "").strip().upper()
+        if not ticker:
+            return None
+        cached = self.get(ticker)
+        if self.offline or (not refresh and self.is_fresh(cached)):
+            return cached
+        try:
+            fetched = self.fetch(ticker)
+        except Exception:
+            return cached
+        self.put(ticker, fetched)
+        return fetched
+
+    def fund_type(self, ticker):
+        rec = self.record(ticker)
+        return (rec or {}).get("fund_type") or ""
+
+    def warm(self, tickers, refresh=False):
+        """Fetch every ticker not fresh in the cache; returns (fetched, cached, failed) counts."""
+        fetched = cached = failed = 0
+        for ticker in dict.fromkeys(t.strip().upper() for t in tickers if t and t.strip()):
+            if not refresh and self.is_fresh(self.get(ticker)):
+                cached += 1
+                continue
+            try:
+                self.put(ticker, self.fetch(ticker))
+                fetched += 1
+            except Exception:
+                failed += 1
+        return fetched, cached, failed
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def default_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = TickerCache()
+        return _default_cache
+
+
+def infer_fund_type_guess(ticker):
+    """Infer 'Active' or 'Passive' based on Yahoo Finance info (name and summary)."""
+    try:
+        if not ticker:
+            return ""
+        return default_cache().fund_type(ticker)
+    except Exception:
+        return ""
+
+
+def is_fresh_ticker(ticker):
+    """True when the default cache holds an entry for the ticker within its TTL."""
+    try:
+        cache = default_cache()
+        return cache.is_fresh(cache.get((ticker or "").strip().upper()))
+    except Exception:
+        return False
+
+
+#───Batched Resolver──────────────────────────────────────────────────────────────────
+
+def _env_float(name, default):
+    try:
+        return float(os.environ.get(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+def resolve_fund_types(tickers, lookup=infer_fund_type_guess, workers=None, timeout=None, deadline=None):
+    """
+    {ticker: lookup(ticker)} for every distinct ticker, at most `workers`
+    (FIDSYNC_TICKER_WORKERS, default 8) lookups at a time. A call still running
+    after `timeout` seconds (FIDSYNC_TICKER_TIMEOUT, default 10) is abandoned and
+    gives its slot to the next ticker, so slow calls never hold up the queue;
+    after `deadline` seconds overall (FIDSYNC_TICKER_DEADLINE, default 30) the
+    rest is given up on. Abandoned, unstarted and failed tickers are left out.
+    An abandoned call finishes in the background; with the disk cache its
+    answer is there for the next report.
+    """
+    todo = deque(dict.fromkeys(t for t in tickers if t))
+    workers = max(1, workers or int(_env_float("FIDSYNC_TICKER_WORKERS", 8)))
+    timeout = timeout if timeout is not None else _env_float("FIDSYNC_TICKER_TIMEOUT", 10)
+    deadline = deadline if deadline is not None else _env_float("FIDSYNC_TICKER_DEADLINE", 30)
+    if not todo:
+        return {}
+
+    done = threading.Condition()
+    finished = {}
+
+    def call(ticker):
+        try:
+            outcome = (True, lookup(ticker))
+        except Exception:
+            outcome = (False, None)
+        with done:
+            finished[ticker] = outcome
+            done.notify_all()
+
+    results, running = {}, {}  # running: ticker → start time
+    end = time.monotonic() + deadline
+    with done:
+        while True:
+            now = time.monotonic()
+            for ticker, started in list(running.items()):
+                if ticker in finished:
+                    del running[ticker]
+                    ok, value = finished[ticker]
+                    if ok:
+                        results[ticker] = value
+                elif now - started >= timeout:
+                    del running[ticker]  # abandoned: its thread runs on, its slot is free
+            if now >= end:
+                break
+            while todo and len(running) < workers:
+                ticker = todo.popleft()
+                running[ticker] = now
+                # daemon threads: an abandoned call never holds up interpreter exit
+                threading.Thread(target=call, args=(ticker,), daemon=True).start()
+            if not running:
+                break
+            wake = min(min(running.values()) + timeout, end)
+            done.wait(max(0.0, wake - now))
+    return results
+
+
+#───CLI──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ticker fund-type cache.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    warm = sub.add_parser("warm", help="pre-populate the cache from a ticker list")
+    warm.add_argument("tickers", nargs="*", help="tickers to fetch")
+    warm.add_argument("--file", help="text file with one ticker per line (or comma separated)")
+    warm.add_argument("--refresh", action="store_true", help="refetch tickers that are still fresh")
+    show = sub.add_parser("show", help="print cached entries")
+    show.add_argument("tickers", nargs="+")
+    for p in (warm, show):
+        p.add_argument("--cache", help="cache file (default: FIDSYNC_TICKER_CACHE or ~/.cache/fidsync)")
+        p.add_argument("--ttl-days", type=float, default=None, help="entry lifetime in days")
+    args = parser.parse_args(argv)
+
+    cache = TickerCache(args.cache, args.ttl_days, offline=args.command == "show")
+    try:
+        if args.command == "warm":
+            tickers = list(args.tickers)
+            if args.file:
+                with open(args.file, encoding="utf-8") as fh:
+                    tickers += [t for line in fh for t in line.replace(",", " ").split()]
+            fetched, cached, failed = cache.warm(tickers, refresh=args.refresh)
+            print(f"{fetched} fetched, {cached} already cached, {failed} failed ({cache.path})")
+            return 1 if failed else 0
+        for ticker in args.tickers:
+            rec = cache.get(ticker)
+            if rec is None:
+                print(f"{ticker.upper()}: not cached")
+                continue
+            age = (time.time() - rec["fetched_at"]) / 86400
+            state = "fresh" if cache.is_fresh(rec) else "stale"
+            print(f"{ticker.upper()}: {rec['fund_type'] or '?'} - {rec['long_name'] or rec['short_name']} "
+                  f"({age:.1f} days old, {state})")
+        return 0
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
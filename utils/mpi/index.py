@@ -0,0 +1,70 @@
+import re
+
+
+#───Ticker Token Index──────────────────────────────────────────────────────────────────
+# Fund lookups in the performance, calendar-year and MPT sections used to rescan
+# every line once per fund. The index maps each ticker-like token to the lines it
+# sits on, so a lookup is a dict hit plus, at most, a check of a few lines.
+
+# A whole word of 2–5 capitals: exactly where re.search(rf"\b{tk}\b", line) can hit.
+TOKEN_RX = re.compile(r"\b[A-Z]{2,5}\b")
+
+
+def page_tokens(doc, pnum):
+    """{token: [line numbers]} for one page; shared by every section index."""
+    def build():
+        out = {}
+        for li, ln in enumerate(doc.lines(pnum)):
+            for tok in dict.fromkeys(TOKEN_RX.findall(ln)):
+                out.setdefault(tok, []).append(li)
+        return out
+    return doc.memo(("page_tokens", pnum), build)
+
+
+class TokenIndex:
+    """
+    Ticker-like tokens → positions over pages [start, end). `lines` is the same
+    flat list doc.section_lines(start, end, clean) returns, and `where[i]` is the
+    (page, line on page) line i came from.
+    """
+
+    def __init__(self, doc, start, end=None, clean=True):
+        self.lines = []
+        self.where = []
+        self.positions = {}
+        for pnum in doc.pages(start, end):
+            flat_of = {}
+            for li, ln in enumerate(doc.lines(pnum)):
+                if clean and not ln.strip():
+                    continue
+                flat_of[li] = len(self.lines)
+                self.lines.append(ln.strip() if clean else ln)
+                self.where.append((pnum, li))
+            for tok, lis in page_tokens(doc, pnum).items():
+                self.positions.setdefault(tok, []).extend(flat_of[li] for li in lis)
+
+    def find(self, ticker, split=False):
+        """
+        Index of the first line holding ticker as a whole word, or as one of the
+        line's whitespace-separated tokens when split=True; None if absent.
+        """
+        if TOKEN_RX.fullmatch(ticker):
+            for i in self.positions.get(ticker, ()):
+                if not split or ticker in self.lines[i].split():
+                    return i
+            return None
+        # not a token the index holds (empty, lowercase, digits): scan as before
+        if split:
+            return next((i for i, ln in enumerate(self.lines) if ticker in ln.split()), None)
+        rx = re.compile(rf"\b{re.escape(ticker)}\b")
+        return next((i for i, ln in enumerate(self.lines) if rx.search(ln)), None)
+
+    def locate(self, ticker, split=False):
+        """(page, line on page) of find(), or None."""
+        i = self.find(ticker, split)
+        return None if i is None else self.where[i]
+
+
+def token_index(doc, start, end=None, clean=True):
+    """TokenIndex for a section, built once per document."""
+    return doc.memo(("token_index", start, end, clean), lambda: TokenIndex(doc, start, end, clean))
@@ -0,0 +1,167 @@
+"""
+Per-step instrumentation for the MPI pages. A RunProfile wraps one page run;
+while it is active, every step entered through measure() or decorated with
+@instrumented records:
+
+    seconds            wall time
+    cpu_seconds        process CPU time (all threads; prefetch worker processes are not included)
+    page_extractions   pages laid out from the PDF (see MPIDocument.page_extractions)
+    peak_mb            peak traced allocation above the step's starting point
+
+Memory is traced with tracemalloc only when FIDSYNC_TRACE_MEMORY=1: it makes a
+full report run about five times slower, so peak_mb is None by default. Outside a
+RunProfile the decorators and measure() cost nothing. Each run ends with one
+JSON line on the FidSync logger (RunProfile.log) so runs can be compared
+across quarters.
+"""
+import contextvars
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+logger = logging.getLogger("FidSync")
+
+_active = contextvars.ContextVar("mpi_run_profile", default=None)
+
+MB = 1024 * 1024
+
+
+def _env_trace_memory():
+    return os.environ.get("FIDSYNC_TRACE_MEMORY", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+#───Run Profile──────────────────────────────────────────────────────────────────
+
+class _Frame:
+    def __init__(self, name, depth, doc):
+        self.name = name
+        self.depth = depth
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        self.pages = getattr(doc, "page_extractions", 0)
+        self.base = self.high = 0
+
+
+class RunProfile:
+    """
+    Step measurements for one page run over one document. Use as a context
+    manager; `steps` lists one record per step in the order they finished,
+    with `depth` > 0 for a step measured inside another one.
+    """
+
+    def __init__(self, doc=None, page=None, trace_memory=None):
+        self.doc = doc
+        self.page = page
+        self.trace_memory = _env_trace_memory() if trace_memory is None else trace_memory
+        self.steps = []
+        self.totals = {}
+        self._stack = []
+        self._own_tracing = False
+        self._token = None
+
+    def __enter__(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracing = True
+        self._token = _active.set(self)
+        self._push("run")
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.totals = self._pop(ok=exc_type is None)
+        _active.reset(self._token)
+        if self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
+
+    def _push(self, name):
+        frame = _Frame(name, len(self._stack) - 1, self.doc)
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                self._stack[-1].high = max(self._stack[-1].high, peak)
+            # the peak counter is global: fold it into the parent before restarting it for this step
+            tracemalloc.reset_peak()
+            frame.base = frame.high = current
+        self._stack.append(frame)
+        return frame
+
+    def _pop(self, ok=True):
+        frame = self._stack.pop()
+        peak_mb = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            frame.high = max(frame.high, tracemalloc.get_traced_memory()[1])
+            peak_mb = round((frame.high - frame.base) / MB, 2)
+            if self._stack:
+                self._stack[-1].high = max(self._stack[-1].high, frame.high)
+        return {
+            "step": frame.name,
+            "depth": frame.depth,
+            "seconds": round(time.perf_counter() - frame.wall, 4),
+            "cpu_seconds": round(time.process_time() - frame.cpu, 4),
+            "page_extractions": getattr(self.doc, "page_extractions", 0) - frame.pages,
+            "peak_mb": peak_mb,
+            "status": "ok" if ok else "failed",
+        }
+
+    @contextmanager
+    def step(self, name):
+        self._push(name)
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.steps.append(self._pop(ok))
+
+    def slowest(self, n=3):
+        return sorted((s for s in self.steps if s["depth"] == 0), key=lambda s: -s["seconds"])[:n]
+
+    def summary(self, **extra):
+        """JSON-ready record of the whole run: totals, every step and any extra fields."""
+        doc = self.doc
+        return {
+            "event": "mpi_run",
+            "page": self.page,
+            "report": getattr(doc, "digest", None),
+            "report_pages": getattr(doc, "page_count", None),
+            **{k: v for k, v in self.totals.items() if k not in ("step", "depth")},
+            "steps": self.steps,
+            **extra,
+        }
+
+    def log(self, **extra):
+        logger.info(json.dumps(self.summary(**extra), default=str))
+
+
+#───Step Hooks──────────────────────────────────────────────────────────────────
+
+@contextmanager
+def measure(name):
+    """Record the enclosed block as a step of the active RunProfile, if any."""
+    profile = _active.get()
+    if profile is None:
+        yield
+        return
+    with profile.step(name):
+        yield
+
+
+def instrumented(name=None):
+    """Decorator: record every call of the function as a step of the active RunProfile."""
+    def wrap(fn):
+        label = name or fn.__name__
+
+        @wraps(fn)
+        def call(*args, **kwargs):
+            profile = _active.get()
+            if profile is None:
+                return fn(*args, **kwargs)
+            with profile.step(label):
+                return fn(*args, **kwargs)
+        return call
+    return wrap
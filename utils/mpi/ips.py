@@ -0,0 +1,235 @@
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+#───IPS Screening──────────────────────────────────────────────────────────────────
+# Scorecard statuses are held as a funds × metrics matrix of small status codes.
+# An IPS policy (which metric backs each check per fund type, and the watch
+# thresholds) is compiled once into column-index arrays: screening is a column
+# gather per fund type, the watch status follows from row sums of Review / Fail.
+# The matrix does not depend on the policy, so re-screening a report under
+# another client's IPS only repeats the gather.
+
+SCORECARD_METRICS = [
+    "Manager Tenure", "Excess Performance (3Yr)", "Excess Performance (5Yr)",
+    "Peer Return Rank (3Yr)", "Peer Return Rank (5Yr)", "Expense Ratio Rank",
+    "Sharpe Ratio Rank (3Yr)", "Sharpe Ratio Rank (5Yr)", "R-Squared (3Yr)",
+    "R-Squared (5Yr)", "Sortino Ratio Rank (3Yr)", "Sortino Ratio Rank (5Yr)",
+    "Tracking Error Rank (3Yr)", "Tracking Error Rank (5Yr)",
+    "Style Drift Score (3Yr)",
+]
+# 15-metric scorecards drop "Rank" from tracking error
+METRIC_ALIASES = {
+    "Tracking Error (3Yr)": "Tracking Error Rank (3Yr)",
+    "Tracking Error (5Yr)": "Tracking Error Rank (5Yr)",
+}
+
+# scorecard metric behind each of the 11 IPS checks; the last check always passes
+ACTIVE_IPS_METRICS = [
+    "Manager Tenure", "Excess Performance (3Yr)", "Peer Return Rank (3Yr)", "Sharpe Ratio Rank (3Yr)",
+    "Sortino Ratio Rank (3Yr)", "Excess Performance (5Yr)", "Peer Return Rank (5Yr)", "Sharpe Ratio Rank (5Yr)",
+    "Sortino Ratio Rank (5Yr)", "Expense Ratio Rank", None,
+]
+PASSIVE_IPS_METRICS = [
+    "Manager Tenure", "R-Squared (3Yr)", "Peer Return Rank (3Yr)", "Sharpe Ratio Rank (3Yr)",
+    "Tracking Error Rank (3Yr)", "R-Squared (5Yr)", "Peer Return Rank (5Yr)", "Sharpe Ratio Rank (5Yr)",
+    "Tracking Error Rank (5Yr)", "Expense Ratio Rank", None,
+]
+
+CRITERIA_PREFIX = "IPS Investment Criteria "
+IPS_LABELS = [f"{CRITERIA_PREFIX}{i+1}" for i in range(11)]
+
+# matrix columns: the scorecard metrics, then a constant "Pass" column
+ALWAYS_PASS = len(SCORECARD_METRICS)
+METRIC_COLUMN = {m: i for i, m in enumerate(SCORECARD_METRICS)}
+METRIC_COLUMN.update({alias: METRIC_COLUMN[m] for alias, m in METRIC_ALIASES.items()})
+
+# status codes; 0 is a metric the scorecard did not list
+MISSING, PASS, REVIEW, FAIL = range(4)
+STATUS_CODES = {"Pass": PASS, "Review": REVIEW, "Fail": FAIL}
+STATUS_NAMES = np.array([None, "Pass", "Review", "Fail"], dtype=object)
+STATUS_ICONS = np.array(["", "✔", "✗", "✗"], dtype=object)
+
+# watch statuses the app's tables, counts and slides know: formal / informal watch, no watch
+WATCH_STATUSES = ("FW", "IW")
+NO_WATCH = "NW"
+
+# The built-in IPS, in the shape of a policy file (see parse_policy).
+DEFAULT_POLICY_SPEC = {
+    "name": "Default IPS",
+    "criteria": {"Active": ACTIVE_IPS_METRICS, "Passive": PASSIVE_IPS_METRICS},
+    "default_type": "Active",
+    "watch": {"FW": 6, "IW": 5},
+    "otherwise": "NW",
+}
+
+
+#───Policies──────────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True, eq=False)
+class IPSPolicy:
+    """A compiled IPS policy; build with compile_policy / parse_policy / load_policy."""
+    name: str
+    digest: str
+    labels: list
+    columns: dict        # fund type -> matrix column per check
+    default_type: str    # fund types the policy does not list are screened as this one
+    watch: tuple         # (status, minimum Review / Fail checks), strictest first
+    otherwise: str
+
+    @property
+    def watch_threshold(self):
+        """Fewest Review / Fail checks that put a fund on watch; None if nothing does."""
+        return min((n for _, n in self.watch), default=None)
+
+
+_policies = {}
+_policies_lock = threading.Lock()
+
+
+def policy_digest(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def compile_policy(spec):
+    """
+    IPSPolicy from a policy mapping (DEFAULT_POLICY_SPEC shows the shape).
+    Compiled policies are cached by a hash of the mapping. Raises ValueError
+    for unknown metrics, fund types with different numbers of checks, a
+    missing default type, or watch statuses other than FW / IW (NW otherwise).
+    """
+    digest = policy_digest(spec)
+    with _policies_lock:
+        if digest in _policies:
+            return _policies[digest]
+
+    criteria = spec.get("criteria") or {}
+    if not criteria:
+        raise ValueError("IPS policy lists no criteria")
+    columns = {}
+    for fund_type, metrics in criteria.items():
+        unknown = [m for m in metrics if m is not None and m not in METRIC_COLUMN]
+        if unknown:
+            raise ValueError(f"IPS policy: unknown scorecard metric(s) for {fund_type}: {', '.join(map(str, unknown))}")
+        columns[str(fund_type)] = np.array([ALWAYS_PASS if m is None else METRIC_COLUMN[m] for m in metrics], dtype=np.intp)
+    counts = {len(cols) for cols in columns.values()}
+    if len(counts) != 1:
+        raise ValueError("IPS policy: every fund type needs the same number of criteria")
+    default_type = str(spec.get("default_type") or next(iter(columns)))
+    if default_type not in columns:
+        raise ValueError(f"IPS policy: default type {default_type!r} has no criteria")
+    watch = dict((str(status), int(n)) for status, n in (spec.get("watch") or {}).items())
+    unknown = [status for status in watch if status not in WATCH_STATUSES]
+    if unknown:
+        raise ValueError(f"IPS policy: unknown watch status(es) {', '.join(unknown)}; use {' / '.join(WATCH_STATUSES)}")
+    if watch.get("FW", 0) < watch.get("IW", 0):
+        raise ValueError("IPS policy: FW needs at least as many checks as IW")
+    otherwise = str(spec.get("otherwise", NO_WATCH))
+    if otherwise != NO_WATCH:
+        raise ValueError(f"IPS policy: otherwise must be {NO_WATCH}")
+    # strictest first; FW wins a tie with IW
+    watch = tuple(sorted(watch.items(), key=lambda w: (-w[1], w[0] != "FW")))
+
+    policy = IPSPolicy(
+        name=str(spec.get("name") or "IPS policy"),
+        digest=digest,
+        labels=[f"{CRITERIA_PREFIX}{i+1}" for i in range(counts.pop())],
+        columns=columns,
+        default_type=default_type,
+        watch=watch,
+        otherwise=otherwise,
+    )
+    with _policies_lock:
+        return _policies.setdefault(digest, policy)
+
+
+def parse_policy(text):
+    """
+    IPSPolicy from YAML text (str or bytes). Same keys as DEFAULT_POLICY_SPEC;
+    a null criterion always passes.
+    """
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("IPS policy files need PyYAML: pip install -r requirements.txt") from None
+    spec = yaml.safe_load(text)
+    if not isinstance(spec, dict):
+        raise ValueError("IPS policy must be a YAML mapping")
+    return compile_policy(spec)
+
+
+def load_policy(path):
+    with open(path, "rb") as fh:
+        return parse_policy(fh.read())
+
+
+DEFAULT_POLICY = compile_policy(DEFAULT_POLICY_SPEC)
+
+
+def criteria_labels(columns):
+    """The IPS check columns ("IPS Investment Criteria N") among `columns`, in check order."""
+    n = len(CRITERIA_PREFIX)
+    found = [c for c in columns if isinstance(c, str) and c.startswith(CRITERIA_PREFIX) and c[n:].isdigit()]
+    return sorted(found, key=lambda c: int(c[n:]))
+
+
+def fit_checks(values, slots):
+    """Check values padded with "" or cut to the `slots` criteria cells of a fixed-width template."""
+    return (list(values) + [""] * slots)[:slots]
+
+
+#───Screening──────────────────────────────────────────────────────────────────
+
+def status_matrix(fund_blocks):
+    """Funds × SCORECARD_METRICS status codes (plus the ALWAYS_PASS column); a metric's first listing wins."""
+    rows, cols, codes = [], [], []
+    for i, fund in enumerate(fund_blocks):
+        for m in fund["Metrics"]:
+            col = METRIC_COLUMN.get(m["Metric"])
+            if col is not None:
+                rows.append(i)
+                cols.append(col)
+                codes.append(STATUS_CODES.get(m["Status"], MISSING))
+    matrix = np.zeros((len(fund_blocks), len(SCORECARD_METRICS) + 1), dtype=np.int8)
+    matrix[:, ALWAYS_PASS] = PASS
+    if rows:
+        cells = np.array(rows) * matrix.shape[1] + np.array(cols)
+        _, first = np.unique(cells, return_index=True)
+        matrix.flat[cells[first]] = np.array(codes, dtype=np.int8)[first]
+    return matrix
+
+
+def screen(matrix, fund_types, policy=None):
+    """(funds × checks status codes, watch status per fund) for a status matrix under a policy."""
+    policy = policy or DEFAULT_POLICY
+    types = np.asarray(fund_types, dtype=object)
+    checks = matrix[:, policy.columns[policy.default_type]]
+    for fund_type, cols in policy.columns.items():
+        rows = types == fund_type
+        if fund_type != policy.default_type and rows.any():
+            checks[rows] = matrix[rows][:, cols]
+    flagged = (checks >= REVIEW).sum(axis=1)
+    watch = np.full(len(checks), policy.otherwise, dtype=object)
+    for status, n in reversed(policy.watch):  # stricter statuses overwrite
+        watch[flagged >= n] = status
+    return checks, watch
+
+
+def ips_tables(matrix, fund_names, fund_types, tickers, policy=None):
+    """IPS icon and raw status tables (DataFrames) for the funds of a status matrix."""
+    policy = policy or DEFAULT_POLICY
+    if not len(fund_names):
+        return pd.DataFrame(), pd.DataFrame()
+    checks, watch = screen(matrix, fund_types, policy)
+    head = {"Fund Name": list(fund_names), "Ticker": list(tickers), "Fund Type": list(fund_types)}
+    icon, raw = dict(head), dict(head)
+    for i, label in enumerate(policy.labels):
+        icon[label] = STATUS_ICONS[checks[:, i]]
+        raw[label] = STATUS_NAMES[checks[:, i]]
+    icon["IPS Watch Status"] = raw["IPS Watch Status"] = watch
+    return pd.DataFrame(icon), pd.DataFrame(raw)
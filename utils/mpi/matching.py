@@ -0,0 +1,86 @@
+import numpy as np
+from rapidfuzz import fuzz, process
+
+
+#───Fund → Ticker Matching──────────────────────────────────────────────────────────────────
+
+def assign_tickers(norm_expected_list, candidate_pairs, threshold=70, scorer=fuzz.token_sort_ratio):
+    """
+    One ticker per fund from (normalized raw name, ticker, raw name) candidates.
+
+    Scores every fund against every candidate in one rapidfuzz cdist call, then
+    assigns greedily in fund order exactly like the original nested loop: each
+    fund takes its highest-scoring candidate whose ticker is still unused (the
+    first one on ties) if it reaches the threshold, and that ticker is then
+    taken. Returns ({fund name: ticker or ""}, set of used tickers).
+    """
+    assigned, used = {}, set()
+    if not norm_expected_list:
+        return assigned, used
+    # repeated (name, ticker) pairs score identically and never beat their first copy
+    pairs = list(dict.fromkeys((norm_raw, ticker) for norm_raw, ticker, _ in candidate_pairs))
+    if not pairs:
+        return {name: "" for name, _ in norm_expected_list}, used
+
+    scores = process.cdist(
+        [norm for _, norm in norm_expected_list],
+        [norm_raw for norm_raw, _ in pairs],
+        scorer=scorer,
+        dtype=np.float64,
+        workers=-1,
+    )
+    tickers = np.array([ticker for _, ticker in pairs])
+    available = np.ones(len(pairs), dtype=bool)
+
+    for row, (fund_name, _) in zip(scores, norm_expected_list):
+        masked = np.where(available, row, -1.0)
+        best = int(masked.argmax())
+        if masked[best] > 0 and masked[best] >= threshold:
+            ticker = str(tickers[best])
+            assigned[fund_name] = ticker
+            used.add(ticker)
+            available &= tickers != ticker
+        else:
+            assigned[fund_name] = ""
+    return assigned, used
+
+
+#───Name Matching──────────────────────────────────────────────────────────────────
+
+def best_matches(queries, choices, one_to_one=False, scorer=fuzz.token_sort_ratio, processor=None):
+    """
+    [(choice index or None, score)] for each query name.
+
+    All pairs are scored in one cdist call across every core, with the same
+    scorer and (no) processor as process.extractOne(query, choices,
+    scorer=scorer), so scores are the ones extractOne gives. By default each
+    query takes its highest-scoring choice (the first on ties), as extractOne
+    does. With one_to_one each choice is used at most
+    once: pairs are handed out best score first, and queries left over get
+    (None, 0.0).
+    """
+    if not queries:
+        return []
+    if not choices:
+        return [(None, 0.0)] * len(queries)
+    scores = process.cdist(
+        queries, choices, scorer=scorer, processor=processor, dtype=np.float64, workers=-1,
+    )
+    if not one_to_one:
+        best = scores.argmax(axis=1)
+        return [(int(j), float(scores[i, j])) for i, j in enumerate(best)]
+
+    out = [(None, 0.0)] * len(queries)
+    row_free = np.ones(len(queries), dtype=bool)
+    col_free = np.ones(len(choices), dtype=bool)
+    remaining = min(len(queries), len(choices))
+    # stable: equal scores go to the earlier query, then the earlier choice
+    for flat in np.argsort(-scores, axis=None, kind="stable"):
+        i, j = divmod(int(flat), len(choices))
+        if row_free[i] and col_free[j]:
+            out[i] = (j, float(scores[i, j]))
+            row_free[i] = col_free[j] = False
+            remaining -= 1
+            if not remaining:
+                break
+    return out
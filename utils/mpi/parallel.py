@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from utils.mpi.backends import PdfplumberBackend, default_backend, open_backend
+
+
+#───Parallel Page Extraction──────────────────────────────────────────────────────────────────
+
+# Below this many pdfplumber pages the cost of starting worker processes outweighs the win.
+MIN_PAGES_PER_WORKER = 8
+
+
+def default_workers():
+    """Worker count from FIDSYNC_PDF_WORKERS, else every available core."""
+    env = os.environ.get("FIDSYNC_PDF_WORKERS", "").strip()
+    if env.isdigit() and int(env) > 0:
+        return int(env)
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def chunk_pages(pnums, n):
+    """Split page numbers into n contiguous, near-equal runs."""
+    pnums = list(pnums)
+    n = max(1, min(n, len(pnums)))
+    size, extra = divmod(len(pnums), n)
+    chunks, i = [], 0
+    for k in range(n):
+        step = size + (1 if k < extra else 0)
+        chunks.append(pnums[i:i + step])
+        i += step
+    return [c for c in chunks if c]
+
+
+def _extract_chunk(source, pnums, word_pages, backend):
+    # runs in a worker: open the shared file once and lay out only this run of pages
+    out = []
+    import pdfplumber
+
+    text_src = open_backend(source, backend)
+    pdf = pdfplumber.open(BytesIO(source) if isinstance(source, bytes) else source) if word_pages else None
+    try:
+        for pnum in pnums:
+            page_words = None
+            if pnum in word_pages:
+                page = pdf.pages[pnum - 1]
+                page_words = page.extract_words(use_text_flow=True)
+                page.close()
+            out.append((pnum, text_src.text(pnum), page_words))
+    finally:
+        text_src.close()
+        if pdf is not None:
+            pdf.close()
+    return out
+
+
+def extract_pages(data, pnums, workers=None, word_pages=(), backend=None):
+    """
+    Text for the given 1-based pages, plus use_text_flow word boxes for those in
+    word_pages, as {pnum: (text, words)} in page order. The slow pdfplumber work
+    is split across a process pool that reads the PDF from a shared temp file;
+    PyMuPDF text is cheap enough to read in-process, and small jobs stay there.
+    """
+    backend = backend or default_backend()
+    word_pages = frozenset(word_pages)
+    pnums = sorted(set(pnums) | word_pages)
+    if not pnums:
+        return {}
+    pooled = pnums if backend == PdfplumberBackend.name else sorted(word_pages)
+    workers = workers or default_workers()
+    workers = min(workers, len(pooled) // MIN_PAGES_PER_WORKER or 1)
+
+    if workers <= 1:
+        results = _extract_chunk(data, pnums, word_pages, backend)
+        return {pnum: (text, w) for pnum, text, w in results}
+
+    pooled_set = set(pooled)
+    inline = [p for p in pnums if p not in pooled_set]
+    results = _extract_chunk(data, inline, frozenset(), backend) if inline else []
+    fd, path = tempfile.mkstemp(suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        # spawn, not fork: Streamlit serves sessions from threads
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [
+                pool.submit(_extract_chunk, path, chunk, word_pages, backend)
+                for chunk in chunk_pages(pooled, workers)
+            ]
+            results += [row for fut in futures for row in fut.result()]
+    finally:
+        os.unlink(path)
+    return {pnum: (text, w) for pnum, text, w in sorted(results, key=lambda r: r[0])}
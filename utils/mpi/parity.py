@@ -0,0 +1,100 @@
+"""
+Backend parity check. Extracts every page and the scorecard, ticker and
+performance tables with both PDF backends and reports any difference:
+
+    python -m utils.mpi.parity report.pdf [more.pdf ...]
+
+Exits non-zero when the backends disagree, so it can gate a backend switch.
+"""
+import argparse
+import difflib
+import sys
+
+from utils.mpi.backends import PdfplumberBackend, PyMuPDFBackend
+from utils.mpi.document import MPIDocument, read_bytes
+from utils.mpi.steps import extract_fund_tickers, extract_performance_table, extract_scorecard_blocks, parse_toc
+
+#───Helpers──────────────────────────────────────────────────────────────────
+
+def diff_pages(ref, alt, context=2):
+    """{pnum: unified diff lines} for pages whose text differs."""
+    out = {}
+    for pnum in ref.pages():
+        a, b = ref.lines(pnum), alt.lines(pnum)
+        if a != b:
+            out[pnum] = list(difflib.unified_diff(
+                a, b, f"{ref.backend_name} p{pnum}", f"{alt.backend_name} p{pnum}", n=context, lineterm=""
+            ))
+    return out
+
+
+def extract_tables(doc):
+    """Scorecard blocks, tickers and performance rows, located through the TOC."""
+    toc = parse_toc("".join(doc.text(p) for p in doc.pages(1, 4)))
+    sp, pp, fs = toc["scorecard_page"], toc["performance_page"], toc["factsheets_page"]
+    tables = {}
+    if sp:
+        tables["scorecard_blocks"] = extract_scorecard_blocks(doc, sp)
+    names = [b["Fund Name"] for b in tables.get("scorecard_blocks", [])]
+    if pp and names:
+        tables["fund_tickers"] = extract_fund_tickers(doc, pp, names, fs)
+        tables["performance_table"] = extract_performance_table(doc, pp, names, fs)
+    return tables
+
+
+def diff_tables(ref_tables, alt_tables):
+    """{table name: first differing row} for tables that do not match."""
+    out = {}
+    for name in sorted(set(ref_tables) | set(alt_tables)):
+        a, b = ref_tables.get(name), alt_tables.get(name)
+        if a == b:
+            continue
+        rows_a = list(a.items()) if isinstance(a, dict) else list(a or [])
+        rows_b = list(b.items()) if isinstance(b, dict) else list(b or [])
+        first = next((i for i, (x, y) in enumerate(zip(rows_a, rows_b)) if x != y), min(len(rows_a), len(rows_b)))
+        out[name] = {
+            "rows": (len(rows_a), len(rows_b)),
+            "index": first,
+            PdfplumberBackend.name: rows_a[first] if first < len(rows_a) else None,
+            PyMuPDFBackend.name: rows_b[first] if first < len(rows_b) else None,
+        }
+    return out
+
+
+def check_report(source):
+    """Compare both backends on one report; returns (page diffs, table diffs)."""
+    data = read_bytes(source)
+    ref = MPIDocument(data, backend=PdfplumberBackend.name)
+    alt = MPIDocument(data, backend=PyMuPDFBackend.name)
+    try:
+        return diff_pages(ref, alt), diff_tables(extract_tables(ref), extract_tables(alt))
+    finally:
+        ref.close()
+        alt.close()
+
+
+#───CLI──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diff pdfplumber and PyMuPDF extraction on MPI reports.")
+    parser.add_argument("reports", nargs="+", help="MPI PDF files")
+    parser.add_argument("--show", type=int, default=3, help="page diffs to print per report")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for path in args.reports:
+        page_diffs, table_diffs = check_report(path)
+        status = "OK" if not page_diffs and not table_diffs else "MISMATCH"
+        print(f"{path}: {status} ({len(page_diffs)} page(s) differ, {len(table_diffs)} table(s) differ)")
+        for pnum in sorted(page_diffs)[:args.show]:
+            print("\n".join(page_diffs[pnum]))
+        for name, info in table_diffs.items():
+            print(f"  {name}: rows {info['rows']}, first difference at {info['index']}")
+            print(f"    {PdfplumberBackend.name}: {info[PdfplumberBackend.name]}")
+            print(f"    {PyMuPDFBackend.name}: {info[PyMuPDFBackend.name]}")
+        failed += status != "OK"
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,674 @@
+import re
+
+import pandas as pd
+import streamlit as st
+
+from utils.mpi.fund_types import infer_fund_type_guess, is_fresh_ticker
+from utils.mpi.instrument import instrumented
+from utils.mpi.ips import DEFAULT_POLICY, WATCH_STATUSES, parse_policy, status_matrix
+from utils.mpi.sections import SECTION_TITLES, build_section_index, check_against_toc, first_page
+from utils.mpi.steps import (
+    RETURN_FIELDS, calendar_year_returns, extract_returns, fund_facts, guess_fund_types, match_factsheets,
+    mpt_3yr, mpt_5yr, mpt_summary, parse_page1, parse_toc, peer_ranks, performance_rows, proposed_funds,
+    read_scorecard, report_step_graph, risk_adjusted_returns, scorecard_to_ips,
+)
+
+
+#───Page Steps──────────────────────────────────────────────────────────────────
+# The Streamlit side of the MPI pipeline, shared by every page that reads a report
+# (Writeup & Rec, Writeup, IPS Screening, Fund Scorecard Test). Each step picks its
+# inputs out of st.session_state, calls the session-free function in steps.py,
+# stores the result under the same session key for the later steps and renders it.
+# Pages import these rather than keeping their own copies.
+
+#───Page 1──────────────────────────────────────────────────────────────────
+
+@instrumented("Page 1 details")
+def process_page1(text):
+    info = parse_page1(text)
+    st.session_state['report_date'] = info.report_date
+    st.session_state['total_options'] = info.total_options
+    st.session_state['prepared_for'] = info.prepared_for
+    st.session_state['prepared_by'] = info.prepared_by
+
+
+#───Info Card──────────────────────────────────────────────────────────────────
+
+def show_report_summary():
+    report_date    = st.session_state.get('report_date', 'N/A')
+    total_options  = st.session_state.get('total_options', 'N/A')
+    prepared_for   = st.session_state.get('prepared_for', 'N/A')
+    prepared_by    = st.session_state.get('prepared_by', 'N/A')
+    st.markdown(f"""
+        <div style="
+            background: linear-gradient(120deg, #e6f0fb 80%, #c8e0f6 100%);
+            color: #244369;
+            border-radius: 1.5rem;
+            box-shadow: 0 4px 24px rgba(44,85,130,0.11), 0 2px 8px rgba(36,67,105,0.09);
+            padding: 1.2rem 2.3rem 1.2rem 2.3rem;
+            margin-bottom: 2rem;
+            font-size: 1.08rem;
+            border: 1.2px solid #b5d0eb;">
+            <div style="color:#244369;">
+                <b>Report Date:</b> {report_date} <br>
+                <b>Total Options:</b> {total_options} <br>
+                <b>Prepared For:</b> {prepared_for} <br>
+                <b>Prepared By:</b> {prepared_by}
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+
+#───Table of Contents Extraction──────────────────────────────────────────────────────────────────
+
+@instrumented("Table of contents")
+def process_toc(text):
+    st.session_state.update(parse_toc(text))
+
+
+#───Section Index──────────────────────────────────────────────────────────────────
+
+@instrumented("Section index")
+def process_sections(doc):
+    # one pass over page headers; steps jump straight to their pages instead of scanning
+    index = doc.memo("section_index", lambda: build_section_index(doc))
+    st.session_state["section_index"] = index
+    for key, toc_page, pages in check_against_toc(index, st.session_state):
+        if toc_page is None:
+            st.session_state[key] = pages[0]
+        else:
+            st.warning(
+                f"⚠️ TOC lists '{SECTION_TITLES[key]}' on page {toc_page}, "
+                f"but its pages start at {pages[0]}."
+            )
+
+
+#───Step Graph──────────────────────────────────────────────────────────────────
+
+@instrumented("Extraction graph (steps 6-14)")
+def run_report_steps(doc):
+    """
+    Steps 6–14 and the proposed-funds scan, run concurrently once the scorecard,
+    tickers and performance rows are in session state. The graph (its timings
+    and last inputs) is per session, so a rerun with unchanged inputs skips
+    every step while other sessions on the same cached document do not interfere;
+    only the pure extraction results are shared, through doc.memo.
+    Returns {step name: result}; a step that failed is left out and its page
+    step recomputes it (and reports the error) as before.
+    """
+    graph = st.session_state.get("report_step_graph")
+    if graph is None:
+        graph = st.session_state["report_step_graph"] = report_step_graph()
+    results = graph.run({
+        "doc": doc,
+        "toc": {key: st.session_state.get(key) for key in SECTION_TITLES},
+        "section_index": st.session_state.get("section_index", {}),
+        "tickers": st.session_state.get("tickers", {}),
+        "perf_data": st.session_state.get("fund_performance_data", []),
+    })
+    st.session_state["step_timings"] = graph.timings
+    return results
+
+
+#───IPS Investment Screening──────────────────────────────────────────────────────────────────
+
+def watch_status_color(val):
+    if val == "FW":
+        return "background-color:#f8d7da; color:#c30000; font-weight:600;"
+    if val == "IW":
+        return "background-color:#fff3cd; color:#B87333; font-weight:600;"
+    if val == "NW":
+        return "background-color:#d6f5df; color:#217a3e; font-weight:600;"
+    return ""
+
+def ips_policy_input():
+    """The IPS policy to screen with: an uploaded YAML policy, else the built-in one; None if it is invalid."""
+    upload = st.file_uploader(
+        "Client IPS policy (YAML, optional)", type=["yaml", "yml"], key="ips_policy_file",
+        help="Criteria per fund type and watch thresholds; without one the standard IPS is used.",
+    )
+    if upload is None:
+        return DEFAULT_POLICY
+    try:
+        policy = parse_policy(upload.getvalue())
+    except Exception as e:
+        st.error(f"Could not read the IPS policy: {e}")
+        return None
+    st.caption(f"Screening with **{policy.name}**.")
+    return policy
+
+@instrumented("Scorecard + IPS screening")
+def step3_5_6_scorecard_and_ips(doc, scorecard_page, performance_page, factsheets_page, total_options,
+                                show_watch_summary=False):
+    # extraction results are memoized on the cached document, so reruns skip them
+    scorecard = read_scorecard(doc, scorecard_page, performance_page, factsheets_page)
+    fund_blocks, tickers = scorecard.fund_blocks, scorecard.tickers
+    fund_names = scorecard.fund_names
+    if not fund_blocks:
+        st.error("Could not extract fund scorecard blocks. Check the PDF and page number.")
+        return
+
+    # only answers from fresh cache entries are shared on the document; tickers that
+    # timed out, came back empty or only had a stale entry are looked up again next run
+    inferred_guesses = guess_fund_types(
+        fund_names, tickers, infer_fund_type_guess,
+        known=doc.memo("fund_type_lookups", dict), keep=is_fresh_ticker,
+    )
+
+    df_types_base = pd.DataFrame({
+        "Fund Name":       fund_names,
+        "Ticker":          [tickers.get(n, "") for n in fund_names],
+        "Inferred Type":   inferred_guesses,
+        "Fund Type":       inferred_guesses,
+    })
+
+    if "show_edit_fund_type" not in st.session_state:
+        st.session_state["show_edit_fund_type"] = False
+    toggle_label = "Hide Fund Type Editor" if st.session_state["show_edit_fund_type"] else "Edit Fund Type"
+    if st.button(toggle_label, key="toggle_edit_fund_type"):
+        st.session_state["show_edit_fund_type"] = not st.session_state["show_edit_fund_type"]
+
+    if st.session_state["show_edit_fund_type"]:
+        st.markdown("### Fund Type Overrides")
+        st.caption("Edit any fund type here; once you modify at least one, your edits take precedence over inferred types.")
+        edited_types = st.data_editor(
+            df_types_base,
+            column_config={
+                "Fund Type": st.column_config.SelectboxColumn("Fund Type", options=["Active", "Passive"]),
+            },
+            disabled=["Fund Name", "Ticker", "Inferred Type"],
+            hide_index=True,
+            key="data_editor_fundtype_ips",
+            use_container_width=True,
+        )
+        manual_override = any(
+            row["Fund Type"] != row["Inferred Type"]
+            for _, row in edited_types.iterrows()
+        )
+        if manual_override:
+            fund_types = {row["Fund Name"]: row["Fund Type"] for _, row in edited_types.iterrows()}
+        else:
+            fund_types = {row["Fund Name"]: row["Inferred Type"] for _, row in edited_types.iterrows()}
+    else:
+        fund_types = {name: inferred_guesses[i] for i, name in enumerate(fund_names)}
+
+    policy = ips_policy_input()
+    if policy is None:
+        return
+    # the status matrix does not depend on the policy: switching policies only re-screens
+    matrix = doc.memo(("ips_status_matrix", scorecard_page), lambda: status_matrix(fund_blocks))
+    df_icon, df_raw = scorecard_to_ips(fund_blocks, fund_types, tickers, policy, matrix)
+
+    st.subheader("IPS Screening Results")
+    st.markdown(
+        '<div style="display:flex; gap:1rem; margin-bottom:0.5rem;">'
+        '<div style="padding:4px 10px; background:#d6f5df; border-radius:4px; font-weight:600;">NW: No Watch</div>'
+        '<div style="padding:4px 10px; background:#fff3cd; border-radius:4px; font-weight:600;">IW: Informal Watch</div>'
+        '<div style="padding:4px 10px; background:#f8d7da; border-radius:4px; font-weight:600;">FW: Formal Watch</div>'
+        '</div>', unsafe_allow_html=True
+    )
+
+    if df_icon.empty:
+        st.info("No IPS screening data available.")
+    else:
+        n_checks = len(policy.labels)
+        display_columns = {f"IPS Investment Criteria {i+1}": str(i+1) for i in range(n_checks)}
+        display_df = df_icon.rename(columns=display_columns)
+
+        def iconify(s):
+            if s == "Pass":
+                return "✔"
+            if s in ("Review", "Fail"):
+                return "✗"
+            return ""
+
+        compact_df = display_df.copy()
+        for i in range(1, n_checks + 1):
+            orig = f"IPS Investment Criteria {i}"
+            if orig in compact_df.columns:
+                compact_df[str(i)] = compact_df[orig].apply(iconify)
+                compact_df.drop(columns=[orig], inplace=True)
+        cols_order = ["Fund Name", "Ticker", "Fund Type"] + [str(i) for i in range(1, n_checks + 1)] + ["IPS Watch Status"]
+        compact_df = compact_df[[c for c in cols_order if c in compact_df.columns]]
+
+        def watch_style(val):
+            if val == "NW":
+                return "background-color:#d6f5df; color:#217a3e; font-weight:600;"
+            if val == "IW":
+                return "background-color:#fff3cd; color:#B87333; font-weight:600;"
+            if val == "FW":
+                return "background-color:#f8d7da; color:#c30000; font-weight:600;"
+            return ""
+
+        styled = compact_df.style.applymap(watch_style, subset=["IPS Watch Status"])
+        st.dataframe(styled, use_container_width=True, hide_index=True)
+
+        if show_watch_summary:
+            counts = df_icon["IPS Watch Status"].value_counts().to_dict()
+            st.markdown("---")
+            st.markdown("### Watch Summary")
+            b1, b2, b3 = st.columns(3, gap="small")
+            with b1:
+                st.metric("No Watch", counts.get("NW", 0))
+            with b2:
+                st.metric("Informal Watch", counts.get("IW", 0))
+            with b3:
+                st.metric("Formal Watch", counts.get("FW", 0))
+
+    st.session_state["fund_blocks"] = fund_blocks
+    st.session_state["fund_types"] = fund_types
+    st.session_state["fund_tickers"] = tickers
+    st.session_state["ips_icon_table"] = df_icon
+    st.session_state["ips_raw_table"] = df_raw
+    st.session_state["ips_policy"] = policy
+
+    st.session_state["fund_performance_data"] = performance_rows(
+        doc, performance_page, factsheets_page, fund_names, tickers
+    )
+    st.session_state["tickers"] = tickers
+
+
+#───Proposed Funds Extraction──────────────────────────────────────────────────────────────────
+
+@instrumented("Proposed funds")
+def extract_proposed_scorecard_blocks(doc, *, fuzzy_threshold=78, min_token_overlap=2, max_pages_per_section=4, result=None):
+    df = result if result is not None else proposed_funds(
+        doc,
+        st.session_state.get("section_index", {}),
+        st.session_state,
+        st.session_state.get("fund_performance_data", []) or [],
+        fuzzy_threshold=fuzzy_threshold,
+        min_token_overlap=min_token_overlap,
+        max_pages_per_section=max_pages_per_section,
+    )
+    st.session_state["proposed_funds_confirmed_df"] = df
+    return df
+
+
+#───Step 6: Factsheets Pages──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 6: Factsheets")
+def step6_process_factsheets(doc, fund_names, suppress_output=True, result=None):
+    # If you ever want UI, set suppress_output=False when calling
+
+    factsheet_start = st.session_state.get("factsheets_page")
+    total_declared = st.session_state.get("total_options")
+    performance_data = [
+        {"Fund Scorecard Name": name, "Ticker": ticker}
+        for name, ticker in st.session_state.get("tickers", {}).items()
+    ]
+
+    if not factsheet_start:
+        if not suppress_output:
+            st.error("❌ 'Fund Factsheets' page number not found in TOC.")
+        return
+
+    matched_factsheets = result if result is not None else match_factsheets(doc, factsheet_start, performance_data)
+    df_facts = pd.DataFrame(matched_factsheets)
+    st.session_state['fund_factsheets_data'] = matched_factsheets
+
+    # Hide UI output unless suppress_output is False
+    if not suppress_output:
+        display_df = df_facts[[
+            "Matched Fund Name", "Matched Ticker", "Benchmark", "Category",
+            "Net Assets", "Manager Name", "Avg. Market Cap", "Expense Ratio", "Matched"
+        ]].rename(columns={"Matched Fund Name": "Fund Name", "Matched Ticker": "Ticker"})
+
+        st.dataframe(display_df, use_container_width=True)
+
+        matched_count = sum(1 for r in matched_factsheets if r["Matched"] == "✅")
+        st.write(f"Matched {matched_count} of {len(matched_factsheets)} factsheet pages.")
+        if matched_count == total_declared:
+            st.success(f"All {matched_count} funds matched the declared Total Options from Page 1.")
+        else:
+            st.error(f"Mismatch: Page 1 declared {total_declared}, but only matched {matched_count}.")
+
+
+#───Step 7: QTD / 1Yr / 3Yr / 5Yr / 10Yr / Net Expense Ratio & Bench QTD──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 7: Returns")
+def step7_extract_returns(doc, result=None):
+    # 1) Where to scan
+    perf_page = st.session_state.get("performance_page")
+    end_page  = st.session_state.get("calendar_year_page") or (doc.page_count + 1)
+    perf_data = st.session_state.get("fund_performance_data", [])
+    if perf_page is None or not perf_data:
+        st.error("❌ Run Step 5 first to populate performance data.")
+        return
+
+    if result is None:
+        result = extract_returns(doc, perf_page, end_page, perf_data)
+    for msg in result.warnings:
+        st.warning(msg)
+
+    # Save & display
+    perf_data = result.rows
+    st.session_state["fund_performance_data"] = perf_data
+    df = pd.DataFrame(perf_data)
+
+    matched = len(perf_data) - len(result.warnings)
+    expected_count = len(perf_data)
+    if matched < expected_count:
+        st.error(f"❌ Only matched {matched} of {expected_count} funds with return data. Check your PDF or extraction logic.")
+
+    st.dataframe(
+        df[["Fund Scorecard Name", "Ticker"] + RETURN_FIELDS],
+        use_container_width=True
+    )
+
+
+#───Step 8: Calendar Year Returns (funds + benchmarks)──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 8: Calendar year returns")
+def step8_calendar_returns(doc, result=None):
+    # 1) Section bounds
+    cy_page = st.session_state.get("calendar_year_page")
+    if cy_page is None:
+        st.error("❌ 'Fund Performance: Calendar Year' not found in TOC.")
+        return
+
+    next_page = st.session_state.get("r3yr_page")  # may be None
+    # Fallback to end-of-PDF when missing, and ensure we scan at least one page
+    end_page = next_page if isinstance(next_page, int) else (doc.page_count + 1)
+    end_page = max(end_page, cy_page + 1)
+    end_page = min(end_page, doc.page_count + 1)
+
+    if result is None:
+        result = calendar_year_returns(
+            doc, cy_page, end_page,
+            st.session_state.get("tickers", {}) or {},
+            st.session_state.get("fund_factsheets_data", []) or [],
+        )
+    if result.years is None:
+        st.error("❌ Couldn’t find header row with 'Ticker' + year.")
+        return
+    years = result.years
+    for msg in result.warnings:
+        st.warning(msg)
+
+    df_fund = pd.DataFrame(result.funds)
+    if not df_fund.empty:
+        st.markdown("**Fund Calendar-Year Returns**")
+        st.dataframe(df_fund[["Name", "Ticker"] + years], use_container_width=True)
+        st.session_state["step8_returns"] = result.funds
+
+    df_bench = pd.DataFrame(result.benchmarks)
+    if not df_bench.empty:
+        st.markdown("**Benchmark Calendar-Year Returns**")
+        st.dataframe(df_bench[["Name", "Ticker"] + years], use_container_width=True)
+        st.session_state["benchmark_calendar_year_returns"] = result.benchmarks
+    else:
+        st.warning("No benchmark returns extracted.")
+
+
+#───Step 9: 3‑Yr Risk Analysis – Match & Extract MPT Stats (hidden matching)──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 9: MPT (3Yr)")
+def step9_risk_analysis_3yr(doc, result=None):
+    # 1) Get your fund→ticker map
+    fund_map = st.session_state.get("tickers", {})
+    if not fund_map:
+        st.error("❌ No ticker mapping found. Run Step 5 first.")
+        return
+
+    # 2) Locate the “Risk Analysis: MPT Statistics (3Yr)” page
+    start_page = st.session_state.get("r3yr_page")
+    if not start_page:
+        st.error("❌ ‘Risk Analysis: MPT Statistics (3Yr)’ page not found; run Step 2 first.")
+        return
+
+    # 3) Match tickers and extract the stats (no display)
+    st.session_state["step9_mpt_stats"] = result if result is not None else mpt_3yr(doc, start_page, fund_map)
+
+
+#───Step 10: Risk Analysis (5Yr) – Match & Extract MPT Statistics──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 10: MPT (5Yr)")
+def step10_risk_analysis_5yr(doc, result=None):
+    # 1) Your fund→ticker map from Step 5
+    fund_map = st.session_state.get("tickers", {})
+    if not fund_map:
+        st.error("❌ No ticker mapping found. Run Step 5 first.")
+        return
+
+    # 2) Locate the “Risk Analysis: MPT Statistics (5Yr)” section
+    section_page = first_page(st.session_state.get("section_index", {}), "r5yr_page")
+    if section_page is None:
+        st.error("❌ Could not find ‘Risk Analysis: MPT Statistics (5Yr)’ section.")
+        return
+
+    # 3) Match tickers and extract the stats
+    if result is None:
+        result = mpt_5yr(doc, section_page, fund_map)
+    for msg in result.warnings:
+        st.warning(msg)
+
+    # 4) Save only the consolidated table
+    st.session_state["step10_mpt_stats"] = result.rows
+
+
+#───Step 11: Combined MPT Statistics Summary──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 11: MPT summary")
+def step11_create_summary(pdf=None):
+    # 1) Load your 3‑Yr and 5‑Yr stats from session state
+    mpt3 = st.session_state.get("step9_mpt_stats", [])
+    mpt5 = st.session_state.get("step10_mpt_stats", [])
+    if not mpt3 or not mpt5:
+        st.error("❌ Missing MPT stats. Run Steps 9 & 10 first.")
+        return
+
+    # 2) Merge and display
+    df = mpt_summary(mpt3, mpt5)
+    st.session_state["step11_summary"] = df.to_dict("records")
+    st.dataframe(df)
+
+
+#───Step 12: Extract “FUND FACTS” & Its Table Details in One Go──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 12: Fund facts")
+def step12_process_fund_facts(doc, result=None):
+    fs_start   = st.session_state.get("factsheets_page")
+    factsheets = st.session_state.get("fund_factsheets_data", [])
+    if not fs_start or not factsheets:
+        st.error("❌ Run Step 6 first to populate your factsheet pages.")
+        return
+
+    records = result if result is not None else fund_facts(doc, fs_start, factsheets)
+    if not records:
+        st.warning("No Fund Facts tables found.")
+        return
+
+    # save & show
+    st.session_state["step12_fund_facts_table"] = records
+
+
+#───Step 13: Extract Risk‑Adjusted Returns Metrics──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 13: Risk-adjusted returns")
+def step13_process_risk_adjusted_returns(doc, result=None):
+    fs_start   = st.session_state.get("factsheets_page")
+    factsheets = st.session_state.get("fund_factsheets_data", [])
+    if not fs_start or not factsheets:
+        st.error("❌ Run Step 6 first to populate your factsheet pages.")
+        return
+
+    records = result if result is not None else risk_adjusted_returns(doc, fs_start, factsheets)
+    if not records:
+        st.warning("No 'RISK‑ADJUSTED RETURNS' tables found.")
+        return
+
+    # save & show
+    st.session_state["step13_risk_adjusted_table"] = records
+    df = pd.DataFrame(records)
+    st.dataframe(df, use_container_width=True)
+
+
+#───Step 14: Peer Risk-Adjusted Return Rank──────────────────────────────────────────────────────────────────
+
+@instrumented("Step 14: Peer ranks")
+def step14_extract_peer_risk_adjusted_return_rank(doc, result=None):
+    st.write("Peer Rank")
+
+    factsheets = st.session_state.get("fund_factsheets_data", [])
+    if not factsheets:
+        st.error("❌ Run Step 6 first to populate your factsheet pages.")
+        return
+
+    if result is None:
+        result = peer_ranks(doc, factsheets)
+    for msg in result.warnings:
+        st.warning(msg)
+    records = result.rows
+    if not records:
+        st.warning("❌ No Peer Risk-Adjusted Return Rank data extracted.")
+        return
+
+    df = pd.DataFrame(records)
+    st.session_state["step14_peer_rank_table"] = records
+    st.dataframe(df, use_container_width=True)
+
+
+#───Step 14.5: IPS Fail Table──────────────────────────────────────────────────────────────────
+
+COUNT_WORDS = dict(enumerate(["zero", "one", "two", "three", "four", "five", "six", "seven", "eight", "nine", "ten"]))
+
+
+def on_watch_caption():
+    """Funds-on-watch caption, with the watch threshold of the policy the funds were screened under."""
+    threshold = st.session_state.get("ips_policy", DEFAULT_POLICY).watch_threshold
+    return f"The following funds failed {COUNT_WORDS.get(threshold, threshold)} or more IPS criteria and are currently on watch."
+
+@instrumented("Step 14.5: IPS fail table")
+def step14_5_ips_fail_table():
+    df = st.session_state.get("ips_icon_table")
+    if df is None or df.empty:
+        return
+
+    fail_df = df[df["IPS Watch Status"].isin(WATCH_STATUSES)][["Fund Name", "IPS Watch Status"]]
+    if fail_df.empty:
+        return
+
+    table_html = fail_df.rename(columns={
+        "Fund Name": "Fund",
+        "IPS Watch Status": "Watch Status"
+    }).to_html(index=False, border=0, justify="center", classes="ips-fail-table")
+
+    st.markdown(f"""
+    <div style='
+        background: linear-gradient(120deg, #e6f0fb 85%, #c8e0f6 100%);
+        color: #23395d;
+        border-radius: 1.3rem;
+        box-shadow: 0 2px 14px rgba(44,85,130,0.08), 0 1px 4px rgba(36,67,105,0.07);
+        padding: 1.6rem 2.0rem 1.6rem 2.0rem;
+        max-width: 650px;
+        margin: 1.4rem auto 1.2rem auto;
+        border: 1.5px solid #b5d0eb;'>
+        <div style='font-weight:700; color:#23395d; font-size:1.15rem; margin-bottom:0.5rem; letter-spacing:-0.5px;'>
+            Funds on Watch
+        </div>
+        <div style='font-size:1rem; margin-bottom:1rem; color:#23395d;'>
+            {on_watch_caption()}
+        </div>
+        {table_html}
+    </div>
+    """, unsafe_allow_html=True)
+
+    st.markdown("""
+    <style>
+    .ips-fail-table {
+        width: 100%;
+        border-collapse: collapse;
+        margin-top: 0.7em;
+        font-family: 'Inter', 'Segoe UI', Arial, sans-serif;
+    }
+    .ips-fail-table th, .ips-fail-table td {
+        border: none;
+        padding: 0.48em 1.1em;
+        text-align: left;
+        font-size: 1.07em;
+    }
+    .ips-fail-table th {
+        background: #244369;
+        color: #fff;
+        font-weight: 700;
+        letter-spacing: 0.01em;
+    }
+    .ips-fail-table td {
+        color: #244369;
+    }
+    .ips-fail-table tr:nth-child(even) {background: #e6f0fb;}
+    .ips-fail-table tr:nth-child(odd)  {background: #f8fafc;}
+    </style>
+    """, unsafe_allow_html=True)
+
+#───Bullet Context──────────────────────────────────────────────────────────────────
+
+@instrumented("Bullet context")
+def derive_bullet_context():
+    """Quarter and QTD-vs-benchmark fields the bullet point templates fill in."""
+    report_date = st.session_state.get("report_date", "")
+    m = re.match(r"(\d)(?:st|nd|rd|th)\s+QTR,\s*(\d{4})", report_date or "")
+    quarter = m.group(1) if m else ""
+    year = m.group(2) if m else ""
+
+    for itm in st.session_state.get("fund_performance_data", []):
+        try:
+            qtd = float(itm.get("QTD") or 0)
+        except:
+            qtd = 0.0
+        try:
+            bench_qtd = float(itm.get("Bench QTD") or 0)
+        except:
+            bench_qtd = 0.0
+        itm["Perf Direction"] = "overperformed" if qtd >= bench_qtd else "underperformed"
+        itm["Quarter"] = quarter
+        itm["Year"] = year
+        diff_bps = round((qtd - bench_qtd) * 100, 1)
+        itm["QTD_bps_diff"] = str(diff_bps)
+        fund_pct = f"{qtd:.2f}%"
+        bench_pct = f"{bench_qtd:.2f}%"
+        itm["QTD_pct_diff"] = f"{(qtd - bench_qtd):.2f}%"
+        itm["QTD_vs"] = f"{fund_pct} vs. {bench_pct}"
+
+    if "bullet_point_templates" not in st.session_state:
+        st.session_state["bullet_point_templates"] = [
+            "[Fund Scorecard Name] [Perf Direction] its benchmark in Q[Quarter], "
+            "[Year] by [QTD_bps_diff] bps ([QTD_vs])."
+        ]
+
+
+#───Performance Panel──────────────────────────────────────────────────────────────────
+
+def show_performance_panel(profile):
+    """Collapsible per-step timing / CPU / page / memory table for a finished RunProfile."""
+    totals = profile.totals
+    with st.expander("Performance", expanded=False):
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Wall time", f"{totals.get('seconds', 0):.2f}s")
+        c2.metric("CPU time", f"{totals.get('cpu_seconds', 0):.2f}s")
+        c3.metric("Pages extracted", totals.get("page_extractions", 0))
+        peak = totals.get("peak_mb")
+        c4.metric("Peak memory", f"{peak:.1f} MB" if peak is not None else "off",
+                  help="Traced only with FIDSYNC_TRACE_MEMORY=1 (slows the run down)")
+
+        rows = [{
+            "Step": " " * s["depth"] + s["step"],
+            "Seconds": s["seconds"],
+            "CPU Seconds": s["cpu_seconds"],
+            "Pages": s["page_extractions"],
+            "Peak MB": s["peak_mb"],
+            "Status": s["status"],
+        } for s in profile.steps]
+        if rows:
+            st.dataframe(pd.DataFrame(rows), use_container_width=True, hide_index=True)
+            slow = ", ".join(f"{s['step']} ({s['seconds']:.2f}s)" for s in profile.slowest())
+            st.caption(f"Slowest: {slow}")
+
+        graph = st.session_state.get("step_timings") or {}
+        if graph:
+            st.markdown("**Extraction graph steps** (run concurrently; \"skipped\" = inputs unchanged since the last run)")
+            st.dataframe(pd.DataFrame([
+                {"Step": name, "Seconds": t.get("seconds"), "Status": t.get("status")}
+                for name, t in graph.items()
+            ]), use_container_width=True, hide_index=True)
@@ -0,0 +1,131 @@
+"""
+Cross-page regression check. Runs each report page headless on the same MPI
+reports and compares the extraction results they leave in session state:
+
+    python -m utils.mpi.regression report.pdf [more.pdf ...] [--pages write_up.py ...]
+
+Every page now reads the report through utils.mpi.pipeline, so they must agree
+on every table they have in common; the first page listed is the reference.
+Exits non-zero when any page disagrees. Fund-type lookups run offline against
+the ticker cache, so the check needs no network.
+"""
+import argparse
+import io
+import logging
+import os
+import sys
+import warnings
+
+import streamlit as st
+
+from utils.system.pages import PAGES_DIR, load_page
+
+# Report header, TOC and scorecard / IPS: every page produces these.
+SCORECARD_KEYS = (
+    "report_date", "total_options", "prepared_for", "prepared_by",
+    "performance_page", "calendar_year_page", "r3yr_page", "r5yr_page", "scorecard_page",
+    "scorecard_proposed_page", "factsheets_page", "factsheets_proposed_page", "section_index",
+    "fund_blocks", "fund_tickers", "tickers", "fund_types", "ips_icon_table", "ips_raw_table",
+)
+# Steps 6-14, on the pages that run the full pipeline.
+REPORT_KEYS = SCORECARD_KEYS + (
+    "fund_factsheets_data", "fund_performance_data", "step8_returns", "benchmark_calendar_year_returns",
+    "step9_mpt_stats", "step10_mpt_stats", "step11_summary", "step12_fund_facts_table",
+    "step13_risk_adjusted_table", "step14_peer_rank_table",
+)
+PROPOSED_KEYS = ("proposed_funds_confirmed_df",)
+PAGES = {
+    "writeup_&_rec.py": REPORT_KEYS + PROPOSED_KEYS,
+    "write_up.py": REPORT_KEYS,
+    "fund_scorecard_test.py": REPORT_KEYS,
+    "ips_screening.py": SCORECARD_KEYS + PROPOSED_KEYS,
+}
+
+
+#───Helpers──────────────────────────────────────────────────────────────────
+
+def _plain(value):
+    # DataFrames compare as their records so a mismatch can be shown row by row
+    return value.to_dict("records") if hasattr(value, "to_dict") else value
+
+
+def run_page(page_file, report_path):
+    """Run one page on one report; returns ({key: value} for its keys, error or None)."""
+    with open(report_path, "rb") as fh:
+        uploaded = io.BytesIO(fh.read())
+    uploaded.name = os.path.basename(report_path)
+
+    for key in list(st.session_state.keys()):
+        del st.session_state[key]
+    saved = st.file_uploader, st.download_button
+    # the report goes to the PDF uploader; optional ones (e.g. an IPS policy) stay empty
+    st.file_uploader = lambda label, type=None, *a, **k: uploaded if type in (None, "pdf") or "pdf" in type else None
+    st.download_button = lambda *a, **k: False
+    error = None
+    try:
+        load_page(os.path.join(PAGES_DIR, page_file)).run()
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        st.file_uploader, st.download_button = saved
+    return {k: _plain(st.session_state[k]) for k in PAGES[page_file] if k in st.session_state}, error
+
+
+def compare_pages(results):
+    """{page: [(key, reason)]} for every shared key that differs from the first page's."""
+    (ref_page, ref), *others = results.items()
+    out = {}
+    for page, values in others:
+        bad = []
+        for key in PAGES[page]:
+            if key not in ref or key not in values:
+                if (key in ref) != (key in values):
+                    bad.append((key, f"missing on {page if key in ref else ref_page}"))
+                continue
+            if ref[key] != values[key]:
+                bad.append((key, "values differ"))
+        if bad:
+            out[page] = bad
+    return out
+
+
+def check_report(report_path, pages=None):
+    """Run every page on one report; returns (mismatches, {page: error})."""
+    results, errors = {}, {}
+    for page in pages or PAGES:
+        results[page], error = run_page(page, report_path)
+        if error:
+            errors[page] = error
+    return compare_pages(results), errors
+
+
+#───CLI──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check that every report page extracts the same MPI tables.")
+    parser.add_argument("reports", nargs="+", help="MPI PDF files")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES),
+                        help="pages to run; the first is the reference")
+    args = parser.parse_args(argv)
+
+    # bare-mode Streamlit warns on every widget call
+    logging.disable(logging.WARNING)
+    warnings.simplefilter("ignore", FutureWarning)
+    os.environ["FIDSYNC_OFFLINE"] = "1"
+
+    failed = 0
+    for path in args.reports:
+        mismatches, errors = check_report(path, args.pages)
+        status = "OK" if not mismatches and not errors else "MISMATCH"
+        print(f"{path}: {status} ({len(args.pages)} pages)")
+        for page, error in errors.items():
+            print(f"  {page}: {error}")
+        for page, bad in mismatches.items():
+            for key, reason in bad:
+                print(f"  {page}: {key} ({reason})")
+        failed += status != "OK"
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import re
+
+
+#───Section Index──────────────────────────────────────────────────────────────────
+# One pass over the page headers of an MPI report, classifying each page into the
+# section it belongs to. Keys match the TOC session keys set by process_toc().
+
+# Checked in order, so the more specific titles come first.
+SECTION_HEADERS = [
+    ("scorecard_proposed_page", re.compile(r"FUND\s*SCORECARD\s*:\s*PROPOSED\s*FUNDS", re.I)),
+    ("scorecard_page", re.compile(r"Fund Scorecard\b")),
+    ("calendar_year_page", re.compile(r"Fund Performance: Calendar Year")),
+    ("performance_page", re.compile(r"Fund Performance\b")),
+    ("r3yr_page", re.compile(r"Risk Analysis: MPT Statistics \(3Yr\)")),
+    ("r5yr_page", re.compile(r"Risk Analysis: MPT Statistics \(5Yr\)")),
+    ("factsheets_proposed_page", re.compile(r"Fund Factsheets:\s*Proposed Funds")),
+    ("factsheets_page", re.compile(r"Fund Factsheets\b")),
+]
+
+SECTION_TITLES = {
+    "scorecard_page": "Fund Scorecard",
+    "scorecard_proposed_page": "Fund Scorecard: Proposed Funds",
+    "performance_page": "Fund Performance",
+    "calendar_year_page": "Fund Performance: Calendar Year",
+    "r3yr_page": "Risk Analysis: MPT Statistics (3Yr)",
+    "r5yr_page": "Risk Analysis: MPT Statistics (5Yr)",
+    "factsheets_page": "Fund Factsheets",
+    "factsheets_proposed_page": "Fund Factsheets: Proposed Funds",
+}
+
+# Section titles sit in the first few lines of a page.
+HEADER_LINES = 3
+
+# TOC entries repeat the titles, followed by a page number.
+TOC_ENTRY = re.compile(r"\s\d{1,3}$")
+
+# Factsheet pages carry no section title; their header block names these fields
+# (the same test step6_process_factsheets applies to each page).
+FACTSHEET_FIELDS = ("Benchmark:", "Expense Ratio:")
+
+
+def classify_page(lines):
+    """Section key for a page from its leading lines, or None."""
+    header = [ln.strip() for ln in lines if ln.strip()][:HEADER_LINES]
+    if any("Table of Contents" in ln for ln in header):
+        return None
+    for ln in header:
+        if TOC_ENTRY.search(ln):
+            continue
+        for key, rx in SECTION_HEADERS:
+            if rx.match(ln):
+                return key
+    if all(field in " ".join(header[:2]) for field in FACTSHEET_FIELDS):
+        return "factsheets_page"
+    return None
+
+
+def build_section_index(doc):
+    """{section key: [page numbers]} for every classified page, in page order."""
+    index = {}
+    for pnum in doc.pages():
+        key = classify_page(doc.lines(pnum))
+        if key:
+            index.setdefault(key, []).append(pnum)
+    return index
+
+
+def first_page(index, key):
+    pages = index.get(key) or []
+    return pages[0] if pages else None
+
+
+def check_against_toc(index, toc_pages):
+    """
+    (key, toc page, indexed pages) for every section where the page headers
+    disagree with the TOC: the section starts somewhere other than the TOC page,
+    or the TOC does not list it. Sections without a recognisable header (e.g.
+    proposed factsheets) are left to the TOC.
+    """
+    mismatches = []
+    for key, _ in SECTION_HEADERS:
+        toc_page = toc_pages.get(key)
+        pages = index.get(key, [])
+        if pages and pages[0] != toc_page:
+            mismatches.append((key, toc_page, pages))
+    return mismatches
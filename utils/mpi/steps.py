@@ -0,0 +1,867 @@
+import re
+from calendar import month_name
+from dataclasses import dataclass, field
+
+import pandas as pd
+from rapidfuzz import fuzz
+
+from utils.mpi.fund_types import resolve_fund_types
+from utils.mpi.index import token_index
+from utils.mpi.ips import METRIC_ALIASES, SCORECARD_METRICS, ips_tables, status_matrix
+from utils.mpi.matching import assign_tickers
+
+
+#───Extraction Core──────────────────────────────────────────────────────────────────
+# The MPI pipeline steps as plain functions: each takes the parsed document plus
+# explicit inputs (section pages, fund names, ticker map, earlier step results) and
+# returns its result; nothing here reads or writes st.session_state. Results that
+# only depend on the document and those inputs are memoized on the document.
+# The Streamlit pages are adapters that pick the inputs out of session state, call
+# these, store the results and render them.
+
+# scorecard metric names as printed; 15-metric scorecards drop "Rank" from tracking error
+METRIC_LABELS = SCORECARD_METRICS + list(METRIC_ALIASES)
+
+RETURN_FIELDS = [
+    "QTD", "1Yr", "3Yr", "5Yr", "10Yr", "Net Expense Ratio",
+    "Bench QTD", "Bench 1Yr", "Bench 3Yr", "Bench 5Yr", "Bench 10Yr",
+]
+
+RATIO_METRICS = ["Sharpe Ratio", "Information Ratio", "Sortino Ratio"]
+
+FUND_FACT_LABELS = [
+    "Manager Tenure Yrs.",
+    "Expense Ratio",
+    "Expense Ratio Rank",
+    "Total Number of Holdings",
+    "Turnover Ratio",
+]
+
+
+@dataclass
+class ReportInfo:
+    report_date: str = None
+    total_options: int = None
+    prepared_for: str = None
+    prepared_by: str = ""
+
+
+@dataclass
+class Scorecard:
+    fund_blocks: list
+    tickers: dict
+
+    @property
+    def fund_names(self):
+        return [fund["Fund Name"] for fund in self.fund_blocks]
+
+
+@dataclass
+class StepTable:
+    """A step's rows plus the per-fund problems the page shows as warnings."""
+    rows: list
+    warnings: list = field(default_factory=list)
+
+
+@dataclass
+class CalendarYear:
+    years: list
+    funds: list
+    benchmarks: list
+    warnings: list = field(default_factory=list)
+
+
+#───Page 1 / TOC──────────────────────────────────────────────────────────────────
+
+def extract_report_date(text):
+    dates = re.findall(r'(\d{1,2})/(\d{1,2})/(20\d{2})', text or "")
+    for month, day, year in dates:
+        m, d = int(month), int(day)
+        quarter_map = {(3,31): "1st", (6,30): "2nd", (9,30): "3rd", (12,31): "4th"}
+        if (m, d) in quarter_map:
+            return f"{quarter_map[(m, d)]} QTR, {year}"
+        return f"As of {month_name[m]} {d}, {year}"
+    return None
+
+
+def parse_page1(text):
+    info = ReportInfo(report_date=extract_report_date(text) or None)
+    m = re.search(r"Total Options:\s*(\d+)", text or "")
+    info.total_options = int(m.group(1)) if m else None
+    m = re.search(r"Prepared For:\s*\n(.*)", text or "")
+    info.prepared_for = m.group(1).strip() if m else None
+    m = re.search(r"Prepared By:\s*(.*)", text or "")
+    pb = m.group(1).strip() if m else ""
+    if not pb or "mpi stylus" in pb.lower():
+        pb = "Procyon Partners, LLC"
+    info.prepared_by = pb
+    return info
+
+
+TOC_PATTERNS = {
+    "performance_page": r"Fund Performance[^\d]*(\d{1,3})",
+    "calendar_year_page": r"Fund Performance: Calendar Year\s+(\d{1,3})",
+    "r3yr_page": r"Risk Analysis: MPT Statistics \(3Yr\)\s+(\d{1,3})",
+    "r5yr_page": r"Risk Analysis: MPT Statistics \(5Yr\)\s+(\d{1,3})",
+    "scorecard_page": r"Fund Scorecard\s+(\d{1,3})",
+    "scorecard_proposed_page": r"Fund Scorecard:\s*Proposed Funds\s+(\d{1,3})",
+    "factsheets_page": r"Fund Factsheets\s+(\d{1,3})",
+    "factsheets_proposed_page": r"Fund Factsheets:\s*Proposed Funds\s+(\d{1,3})",
+}
+
+
+def parse_toc(text):
+    """{section key: page number or None} from the table of contents text."""
+    pages = {}
+    for key, pattern in TOC_PATTERNS.items():
+        m = re.search(pattern, text or "")
+        pages[key] = int(m.group(1)) if m else None
+    return pages
+
+
+#───Scorecard / Tickers / IPS──────────────────────────────────────────────────────────────────
+
+def extract_scorecard_blocks(doc, scorecard_page):
+    fund_blocks, fund_name, metrics = [], None, []
+    lines = doc.section_lines(scorecard_page, clean=False)
+    for line in lines:
+        if not any(metric in line for metric in METRIC_LABELS) and line.strip():
+            if fund_name and metrics:
+                fund_blocks.append({"Fund Name": fund_name, "Metrics": metrics})
+            fund_name = re.sub(
+                r"Fund\s+(?:Meets Watchlist Criteria|has been placed on watchlist for not meeting .*? out of \d+ criteria)\.?",
+                "",
+                line.strip(),
+                flags=re.IGNORECASE
+            ).strip()
+            metrics = []
+        for metric in METRIC_LABELS:
+            if metric in line:
+                m = re.match(r"^(.*?)\s+(Pass|Review|Fail)\s*(.*)", line.strip())
+                if m:
+                    metric_name, status, info = m.groups()
+                    metrics.append({"Metric": metric_name, "Status": status, "Info": info.strip()})
+    if fund_name and metrics:
+        fund_blocks.append({"Fund Name": fund_name, "Metrics": metrics})
+    return fund_blocks
+
+
+def normalize_fund_name(name):
+    cleaned = re.sub(
+        r"has been placed on watchlist for not meeting .*? criteria",
+        "",
+        name,
+        flags=re.IGNORECASE
+    )
+    cleaned = re.sub(r"[^A-Za-z0-9 ]+", "", cleaned)
+    return cleaned.strip().lower()
+
+
+def extract_fund_tickers(doc, performance_page, fund_names, factsheets_page=None):
+    all_lines = doc.section_lines(performance_page, factsheets_page or None)
+
+    candidate_pairs = []
+    ticker_rx = re.compile(r"\b([A-Z]{2,5})\b")
+    for ln in all_lines:
+        matches = ticker_rx.findall(ln)
+        if not matches:
+            continue
+        for ticker in set(matches):
+            parts = ln.rsplit(ticker, 1)
+            if len(parts) >= 1:
+                raw_name = parts[0].strip()
+                if not raw_name:
+                    continue
+                norm_raw = normalize_fund_name(raw_name)
+                if not norm_raw:
+                    continue
+                candidate_pairs.append((norm_raw, ticker, raw_name))
+
+    norm_expected_list = [(name, normalize_fund_name(name)) for name in fund_names]
+    assigned, used_tickers = assign_tickers(norm_expected_list, candidate_pairs, threshold=70)
+
+    for name in fund_names:
+        if assigned.get(name):
+            continue
+        norm_expected = normalize_fund_name(name)
+        for norm_raw, ticker, raw_name in candidate_pairs:
+            if ticker in used_tickers:
+                continue
+            if norm_expected in norm_raw or norm_raw in norm_expected:
+                assigned[name] = ticker
+                used_tickers.add(ticker)
+                break
+        if not assigned.get(name):
+            for ln in all_lines:
+                if name.lower() in ln.lower():
+                    m = re.search(r"\b([A-Z]{2,5})\b", ln)
+                    if m:
+                        assigned[name] = m.group(1)
+                        break
+
+    return {k: (v if v else "") for k, v in assigned.items()}
+
+
+def read_scorecard(doc, scorecard_page, performance_page, factsheets_page=None):
+    """Fund blocks from the scorecard section and the ticker of each fund."""
+    fund_blocks = doc.memo(
+        ("scorecard_blocks", scorecard_page),
+        lambda: extract_scorecard_blocks(doc, scorecard_page),
+    )
+    fund_names = [fund["Fund Name"] for fund in fund_blocks]
+    tickers = {}
+    if fund_blocks:
+        tickers = doc.memo(
+            ("fund_tickers", performance_page, factsheets_page, tuple(fund_names)),
+            lambda: extract_fund_tickers(doc, performance_page, fund_names, factsheets_page),
+        )
+    return Scorecard(fund_blocks, tickers)
+
+
+def guess_fund_types(fund_names, tickers, lookup, workers=None, timeout=None, known=None, keep=None):
+    """
+    Active/Passive per fund: `lookup(ticker)` first, then "index" in the name.
+    Lookups run concurrently (see resolve_fund_types); a ticker that times out or
+    fails falls back to the name. `known` ({ticker: answer}) holds earlier
+    answers: only tickers without one are looked up, and new non-empty answers
+    (those keep(ticker) accepts, if given) are added to it, so a timed-out or
+    stale ticker is tried again on the next call.
+    """
+    known = {} if known is None else known
+    todo = [tickers.get(name) for name in fund_names if not known.get(tickers.get(name))]
+    found = resolve_fund_types(todo, lookup, workers, timeout) if todo else {}
+    known.update({t: guess for t, guess in found.items() if guess and (keep is None or keep(t))})
+    guesses = []
+    for name in fund_names:
+        ticker = tickers.get(name)
+        guess = known.get(ticker) or found.get(ticker) or ""
+        guesses.append("Passive" if guess.lower() == "passive" else ("Passive" if "index" in name.lower() else "Active"))
+    return guesses
+
+
+def scorecard_to_ips(fund_blocks, fund_types, tickers, policy=None, matrix=None):
+    """
+    IPS icon and raw status tables; works for 14- and 15-metric scorecards alike.
+    policy: a compiled IPS policy (default: the built-in one). matrix: the
+    fund blocks' status_matrix when the caller already has it.
+    """
+    fund_names = [fund["Fund Name"] for fund in fund_blocks]
+    types = [fund_types.get(name, "Passive" if "index" in name.lower() else "Active") for name in fund_names]
+    if matrix is None:
+        matrix = status_matrix(fund_blocks)
+    return ips_tables(matrix, fund_names, types, [tickers.get(name, "") for name in fund_names], policy)
+
+
+#───Performance──────────────────────────────────────────────────────────────────
+
+def extract_performance_table(doc, performance_page, fund_names, end_page=None):
+    lines = doc.section_lines(performance_page, end_page)
+    num_rx = re.compile(r"\(?-?\d+\.\d+%?\)?")
+    perf_data = []
+    for name in fund_names:
+        item = {"Fund Scorecard Name": name}
+        idx = next((i for i, ln in enumerate(lines) if name in ln), None)
+        if idx is None:
+            scores = [(i, fuzz.token_sort_ratio(name.lower(), ln.lower())) for i, ln in enumerate(lines)]
+            best_i, best_score = max(scores, key=lambda x: x[1])
+            if best_score > 60:
+                idx = best_i
+            else:
+                continue
+        raw = num_rx.findall(lines[idx - 1]) if idx >= 1 else []
+        if len(raw) < 8 and idx >= 2:
+            raw = num_rx.findall(lines[idx - 2]) + raw
+        clean = [n.strip("()%").rstrip("%") for n in raw]
+        clean += [None] * (8 - len(clean))
+        item["QTD"] = clean[0]
+        item["1Yr"] = clean[2]
+        item["3Yr"] = clean[3]
+        item["5Yr"] = clean[4]
+        item["10Yr"] = clean[5]
+        item["Net Expense Ratio"] = clean[-2]
+        bench_raw = []
+        if idx + 1 < len(lines):
+            bench_raw = num_rx.findall(lines[idx + 1])
+        if len(bench_raw) < 1 and idx + 2 < len(lines):
+            bench_raw = num_rx.findall(lines[idx + 2])
+        bench_clean = [n.strip("()%").rstrip("%") for n in bench_raw]
+        item["Bench QTD"] = bench_clean[0] if bench_clean else None
+        item["Bench 3Yr"] = bench_clean[3] if len(bench_clean) > 3 else None
+        item["Bench 5Yr"] = bench_clean[4] if len(bench_clean) > 4 else None
+        perf_data.append(item)
+    return perf_data
+
+
+def performance_rows(doc, performance_page, factsheets_page, fund_names, tickers):
+    """Performance rows for the scorecard funds, each tagged with its ticker (fresh copies)."""
+    perf_rows = doc.memo(
+        ("performance_table", performance_page, factsheets_page, tuple(fund_names)),
+        lambda: extract_performance_table(doc, performance_page, fund_names, factsheets_page),
+    )
+    perf_data = [dict(itm) for itm in perf_rows]
+    for itm in perf_data:
+        itm["Ticker"] = tickers.get(itm["Fund Scorecard Name"], "")
+    return perf_data
+
+
+def extract_returns(doc, perf_page, end_page, perf_data):
+    """
+    Step 7: fund and benchmark trailing returns plus net expense ratio for each
+    performance row, matched by ticker, else by fuzzy name. Returns copies of the
+    rows with RETURN_FIELDS filled; unmatched funds are left as they were.
+    """
+    rows = []
+    for itm in perf_data:
+        itm = dict(itm)
+        for f in RETURN_FIELDS:
+            itm.setdefault(f, None)
+        rows.append(itm)
+
+    index = token_index(doc, perf_page, end_page)
+    lines = index.lines
+    num_rx = re.compile(r"\(?-?\d+\.\d+%?\)?")
+
+    warnings = []
+    for item in rows:
+        name = item["Fund Scorecard Name"]
+        tk   = item["Ticker"].upper().strip()
+
+        # a) Exact-ticker match
+        idx = index.find(tk)
+        # b) Fuzzy-name fallback
+        if idx is None:
+            scores = [(i, fuzz.token_sort_ratio(name.lower(), ln.lower()))
+                      for i, ln in enumerate(lines)]
+            best_i, best_score = max(scores, key=lambda x: x[1])
+            if best_score > 60:
+                idx = best_i
+            else:
+                warnings.append(f"⚠️ {name} ({tk}): no match found.")
+                continue
+
+        # c) Pull fund numbers from line above (and two above if needed)
+        raw = num_rx.findall(lines[idx - 1]) if idx >= 1 else []
+        if len(raw) < 8 and idx >= 2:
+            raw = num_rx.findall(lines[idx - 2]) + raw
+        clean = [n.strip("()%").rstrip("%") for n in raw]
+        if len(clean) < 8:
+            clean += [None] * (8 - len(clean))
+
+        # d) Map fund returns & net expense
+        item["QTD"]               = clean[0]
+        item["1Yr"]               = clean[2]
+        item["3Yr"]               = clean[3]
+        item["5Yr"]               = clean[4]
+        item["10Yr"]              = clean[5]
+        item["Net Expense Ratio"] = clean[-2]
+
+        # e) Pull benchmark QTD, 1Yr, 3Yr, 5Yr, and 10Yr from the very next line(s)
+        bench_raw = []
+        if idx + 1 < len(lines):
+            bench_raw = num_rx.findall(lines[idx + 1])
+        if len(bench_raw) < 5 and idx + 2 < len(lines):
+            bench_raw = num_rx.findall(lines[idx + 2])
+        bench_clean = [n.strip("()%").rstrip("%") for n in bench_raw]
+
+        item["Bench QTD"]  = bench_clean[0] if len(bench_clean) > 0 else None
+        item["Bench 1Yr"] = bench_clean[1] if len(bench_clean) > 1 else None
+        item["Bench 3Yr"] = bench_clean[3] if len(bench_clean) > 3 else None
+        item["Bench 5Yr"] = bench_clean[4] if len(bench_clean) > 4 else None
+        item["Bench 10Yr"] = bench_clean[5] if len(bench_clean) > 5 else None
+
+    return StepTable(rows, warnings)
+
+
+def calendar_year_returns(doc, cy_page, end_page, tickers, factsheets):
+    """
+    Step 8: calendar-year returns for every fund (by ticker) and for each
+    factsheet benchmark (by name). years is None when the header row is missing.
+    """
+    index = token_index(doc, cy_page, end_page, clean=False)
+    all_lines = index.lines
+
+    header = next((ln for ln in all_lines if "Ticker" in ln and re.search(r"\b20\d{2}\b", ln)), None)
+    if not header:
+        return CalendarYear(None, [], [])
+    years = re.findall(r"\b20\d{2}\b", header)
+    num_rx = re.compile(r"-?\d+\.\d+%?")
+    warnings = []
+
+    fund_records = []
+    for name, tk in tickers.items():
+        ticker = (tk or "").upper()
+        idx = index.find(ticker)
+        # numbers typically appear on the line above the ticker row
+        raw = num_rx.findall(all_lines[idx - 1]) if idx not in (None, 0) else []
+        vals = raw[:len(years)] + [None] * (len(years) - len(raw))
+
+        if idx is None:
+            warnings.append(f"⚠️ Calendar-year table: no ticker row found for {name} ({ticker}).")
+
+        rec = {"Name": name, "Ticker": ticker}
+        rec.update({years[i]: vals[i] for i in range(len(years))})
+        fund_records.append(rec)
+
+    bench_records = []
+    for f in factsheets:
+        bench_name = (f.get("Benchmark") or "").strip()
+        fund_tkr   = (f.get("Matched Ticker") or "").upper()
+        if not bench_name:
+            continue
+
+        # exact contains
+        idx = next((i for i, ln in enumerate(all_lines) if bench_name in ln), None)
+        if idx is None:
+            # fuzzy fallback (loose threshold)
+            best = max(
+                ((i, fuzz.token_set_ratio(bench_name.lower(), ln.lower()))
+                 for i, ln in enumerate(all_lines)),
+                key=lambda x: x[1],
+                default=(None, 0)
+            )
+            idx = best[0] if best[1] >= 70 else None
+
+        if idx is None:
+            warnings.append(f"⚠️ Calendar-year benchmark row not found for: {bench_name} ({fund_tkr}).")
+            continue
+
+        raw = num_rx.findall(all_lines[idx])
+        vals = raw[:len(years)] + [None] * (len(years) - len(raw))
+        rec = {"Name": bench_name, "Ticker": fund_tkr}
+        rec.update({years[i]: vals[i] for i in range(len(years))})
+        bench_records.append(rec)
+
+    return CalendarYear(years, fund_records, bench_records, warnings)
+
+
+#───MPT Statistics──────────────────────────────────────────────────────────────────
+
+def mpt_3yr(doc, start_page, tickers):
+    """Step 9: 3-year alpha, beta and capture ratios from each fund's ticker line."""
+    def locate():
+        # first whitespace-separated ticker hit per fund, in page/line order
+        index = token_index(doc, start_page, clean=False)
+        hits = [(index.find(tk.upper(), split=True), fname) for fname, tk in tickers.items()]
+        hits = sorted((h for h in hits if h[0] is not None), key=lambda h: h[0])
+        return {fname: dict(zip(("page", "line"), index.where[i])) for i, fname in hits}
+
+    locs = doc.memo(("mpt_3yr_locs", start_page, tuple(tickers.items())), locate)
+
+    num_rx = re.compile(r"-?\d+\.\d+")
+    results = []
+    for name, info in locs.items():
+        line = doc.lines(info["page"])[info["line"]]
+        nums = num_rx.findall(line)
+        nums += [None] * (4 - len(nums))
+        alpha, beta, up, down = nums[:4]
+        results.append({
+            "Fund Name":               name,
+            "Ticker":                  tickers[name].upper(),
+            "3 Year Alpha":            alpha,
+            "3 Year Beta":             beta,
+            "3 Year Upside Capture":   up,
+            "3 Year Downside Capture": down
+        })
+    return results
+
+
+def mpt_5yr(doc, section_page, tickers):
+    """Step 10: 5-year stats; the values may wrap onto the two lines after the ticker."""
+    def locate():
+        index = token_index(doc, section_page, clean=False)
+        locs = {}
+        for name, tk in tickers.items():
+            pos = index.locate(tk.upper(), split=True)
+            if pos:
+                locs[name] = {"page": pos[0], "line": pos[1]}
+        return locs
+
+    locs = doc.memo(("mpt_5yr_locs", section_page, tuple(tickers.items())), locate)
+
+    num_rx = re.compile(r"-?\d+\.\d+")
+    results, warnings = [], []
+    for name, tk in tickers.items():
+        info = locs.get(name)
+        vals = [None] * 4
+        if info:
+            text_lines = doc.lines(info["page"])
+            idx = info["line"]
+            nums = []
+            for j in range(idx, min(idx + 3, len(text_lines))):
+                nums += num_rx.findall(text_lines[j])
+                if len(nums) >= 4:
+                    break
+            nums += [None] * (4 - len(nums))
+            vals = nums[:4]
+        else:
+            warnings.append(f"⚠️ {name} ({tk.upper()}): not found after page {section_page}.")
+
+        alpha5, beta5, up5, down5 = vals
+        results.append({
+            "Fund Name":               name,
+            "Ticker":                  tk.upper(),
+            "5 Year Alpha":            alpha5,
+            "5 Year Beta":             beta5,
+            "5 Year Upside Capture":   up5,
+            "5 Year Downside Capture": down5,
+        })
+    return StepTable(results, warnings)
+
+
+def mpt_summary(mpt3, mpt5):
+    """Step 11: 3- and 5-year stats side by side, one row per Investment Manager."""
+    df = pd.merge(
+        pd.DataFrame(mpt3),
+        pd.DataFrame(mpt5),
+        on=["Fund Name", "Ticker"],
+        how="outer",
+        suffixes=("_3yr", "_5yr")
+    )
+    df.insert(0, "Investment Manager", df["Fund Name"] + " (" + df["Ticker"] + ")")
+    return df[[
+        "Investment Manager",
+        "3 Year Alpha",
+        "5 Year Alpha",
+        "3 Year Beta",
+        "5 Year Beta",
+        "3 Year Upside Capture",
+        "3 Year Downside Capture",
+        "5 Year Upside Capture",
+        "5 Year Downside Capture"
+    ]]
+
+
+#───Factsheets──────────────────────────────────────────────────────────────────
+
+def _extract_field(label, text, stop=None):
+    try:
+        start = text.index(label) + len(label)
+        rest = text[start:]
+        if stop and stop in rest:
+            return rest[:rest.index(stop)].strip()
+        return rest.split()[0]
+    except Exception:
+        return ""
+
+
+def match_factsheets(doc, factsheet_start, performance_data):
+    """
+    Step 6: one record per factsheet page from its header line (name, ticker,
+    benchmark, category, assets, manager, cap, expense), matched to the closest
+    (fund, ticker) in performance_data.
+    """
+    def match():
+        matched_factsheets = []
+        for i in range(factsheet_start - 1, doc.page_count):
+            words = doc.words(i + 1)
+            header_words = [w['text'] for w in words if w['top'] < 100]
+            first_line = " ".join(header_words).strip()
+
+            if not first_line or "Benchmark:" not in first_line or "Expense Ratio:" not in first_line:
+                continue
+
+            ticker_match = re.search(r"\b([A-Z]{5})\b", first_line)
+            ticker = ticker_match.group(1) if ticker_match else ""
+            fund_name_raw = first_line.split(ticker)[0].strip() if ticker else first_line
+
+            best_score = 0
+            matched_name = matched_ticker = ""
+            for item in performance_data:
+                ref = f"{item['Fund Scorecard Name']} {item['Ticker']}".strip()
+                score = fuzz.token_sort_ratio(f"{fund_name_raw} {ticker}".lower(), ref.lower())
+                if score > best_score:
+                    best_score, matched_name, matched_ticker = score, item['Fund Scorecard Name'], item['Ticker']
+
+            matched_factsheets.append({
+                "Page #": i + 1,
+                "Parsed Fund Name": fund_name_raw,
+                "Parsed Ticker": ticker,
+                "Matched Fund Name": matched_name,
+                "Matched Ticker": matched_ticker,
+                "Benchmark": _extract_field("Benchmark:", first_line, "Category:"),
+                "Category": _extract_field("Category:", first_line, "Net Assets:"),
+                "Net Assets": _extract_field("Net Assets:", first_line, "Manager Name:"),
+                "Manager Name": _extract_field("Manager Name:", first_line, "Avg. Market Cap:"),
+                "Avg. Market Cap": _extract_field("Avg. Market Cap:", first_line, "Expense Ratio:"),
+                "Expense Ratio": _extract_field("Expense Ratio:", first_line),
+                "Match Score": best_score,
+                "Matched": "✅" if best_score > 20 else "❌"
+            })
+        return matched_factsheets
+
+    matched = doc.memo(
+        ("factsheets", factsheet_start, tuple((d["Fund Scorecard Name"], d["Ticker"]) for d in performance_data)),
+        match,
+    )
+    return [dict(r) for r in matched]
+
+
+def _factsheet_pages(factsheets):
+    return {f["Page #"]: (f["Matched Fund Name"], f["Matched Ticker"]) for f in factsheets}
+
+
+def fund_facts(doc, fs_start, factsheets):
+    """Step 12: the FUND FACTS block (tenure, expense, holdings, turnover) per factsheet."""
+    page_map = _factsheet_pages(factsheets)
+    records = []
+    for pnum in doc.pages(fs_start):
+        if pnum not in page_map:
+            continue
+        fund_name, ticker = page_map[pnum]
+        lines = doc.lines(pnum)
+
+        for idx, line in enumerate(lines):
+            if line.lstrip().upper().startswith("FUND FACTS"):
+                # the next 8 lines hold the labels
+                snippet = lines[idx+1 : idx+1+8]
+                rec = {"Fund Name": fund_name, "Ticker": ticker}
+                for lab in FUND_FACT_LABELS:
+                    val = None
+                    for ln in snippet:
+                        norm = " ".join(ln.strip().split())
+                        if norm.startswith(lab):
+                            rest = norm[len(lab):].strip(" :\t")
+                            m = re.match(r"(-?\d+\.\d+)", rest)
+                            val = m.group(1) if m else (rest.split()[0] if rest else None)
+                            break
+                    rec[lab] = val
+                records.append(rec)
+                break
+    return records
+
+
+def risk_adjusted_returns(doc, fs_start, factsheets):
+    """Step 13: Sharpe / Information / Sortino ratios (1, 3, 5, 10 yr) per factsheet."""
+    page_map = _factsheet_pages(factsheets)
+    num_rx  = re.compile(r"-?\d+\.\d+")
+    records = []
+    for pnum in doc.pages(fs_start):
+        if pnum not in page_map:
+            continue
+        fund_name, ticker = page_map[pnum]
+        lines = doc.lines(pnum)
+
+        for idx, line in enumerate(lines):
+            norm = " ".join(line.strip().split()).upper()
+            if norm.startswith("RISK-ADJUSTED RETURNS"):
+                snippet = lines[idx+1 : idx+1+6]
+                rec = {"Fund Name": fund_name, "Ticker": ticker}
+                for metric in RATIO_METRICS:
+                    text_line = next(
+                        ( " ".join(ln.strip().split())
+                          for ln in snippet
+                          if ln.strip().upper().startswith(metric.upper()) ),
+                        None
+                    ) or ""
+                    nums = num_rx.findall(text_line)
+                    nums += [None] * (4 - len(nums))
+                    rec[f"{metric} 1Yr"]  = nums[0]
+                    rec[f"{metric} 3Yr"]  = nums[1]
+                    rec[f"{metric} 5Yr"]  = nums[2]
+                    rec[f"{metric} 10Yr"] = nums[3]
+                records.append(rec)
+                break
+    return records
+
+
+def peer_ranks(doc, factsheets):
+    """Step 14: peer rank of each risk-adjusted ratio, from the second "1 Yr" header."""
+    records, warnings = [], []
+    for pnum, (fund, ticker) in _factsheet_pages(factsheets).items():
+        lines = doc.clean_lines(pnum)
+
+        risk_idx = next((i for i, ln in enumerate(lines) if "RISK-ADJUSTED RETURNS" in ln.upper()), None)
+        if risk_idx is None:
+            warnings.append(f"⚠️ {fund} ({ticker}): Risk-Adjusted header not found.")
+            continue
+
+        header_idxs = [i for i, ln in enumerate(lines) if re.match(r"1\s*Yr", ln)]
+        peer_header_idxs = [i for i in header_idxs if i > risk_idx]
+        if not peer_header_idxs:
+            warnings.append(f"⚠️ {fund} ({ticker}): peer header not found.")
+            continue
+
+        # take the *second* header occurrence (first is Risk-Adjusted, next is Peer)
+        peer_hdr = peer_header_idxs[0] if len(peer_header_idxs)==1 else peer_header_idxs[1]
+
+        rec = {"Fund Name": fund, "Ticker": ticker}
+        for offset, metric in enumerate(RATIO_METRICS, start=1):
+            if peer_hdr + offset < len(lines):
+                parts = lines[peer_hdr + offset].split()
+                # parts[0:2] = metric name words, parts[2:6] = the four integer ranks
+                vals = parts[2:6] if len(parts) >= 6 else []
+            else:
+                vals = []
+            for idx, period in enumerate(["1Yr","3Yr","5Yr","10Yr"]):
+                rec[f"{metric} {period}"] = vals[idx] if idx < len(vals) else None
+            if len(vals) < 4:
+                warnings.append(f"⚠️ {fund} ({ticker}): only {len(vals)} peer values found for '{metric}'.")
+        records.append(rec)
+    return StepTable(records, warnings)
+
+
+#───Proposed Funds──────────────────────────────────────────────────────────────────
+
+PROPOSED_ANCHOR_KEYS = (
+    "factsheets_proposed_page", "factsheets_page", "calendar_year_page",
+    "r3yr_page", "r5yr_page", "performance_page", "scorecard_page",
+)
+
+
+def _tokens(s):
+    # alphanumeric tokens length >=3
+    return {t for t in re.findall(r"[A-Za-z0-9]+", (s or "")) if len(t) >= 3}
+
+
+def proposed_funds(doc, section_pages, toc_pages, perf_data, *, fuzzy_threshold=78, min_token_overlap=2,
+                   max_pages_per_section=4):
+    """
+    Funds from perf_data named in the "Fund Scorecard: Proposed Funds" section(s).
+    section_pages is the section index, toc_pages the TOC page map (it bounds each
+    section and supplies its start if the header was missed). Empty DataFrame when
+    there is no such section.
+    """
+    anchors = sorted(
+        p for k in PROPOSED_ANCHOR_KEYS
+        for p in [toc_pages.get(k)]
+        if isinstance(p, int)
+    )
+
+    # all Proposed header pages, plus the TOC start if the header was missed
+    header_pages = section_pages.get("scorecard_proposed_page", [])
+    starts = list(header_pages)
+    toc_start = toc_pages.get("scorecard_proposed_page")
+    if isinstance(toc_start, int) and toc_start not in starts:
+        starts.append(toc_start)
+    starts = sorted(set(starts))
+    if not starts:
+        return pd.DataFrame()
+
+    # collect only lines from pages that still show the header
+    sections = []
+    for s in starts:
+        next_anchor = next((a for a in anchors if a > s), doc.page_count + 1)
+        next_header = next((h for h in starts if h > s), doc.page_count + 1)
+        hard_end = min(next_anchor, next_header, doc.page_count + 1)
+
+        lines, pages_used = [], 0
+        for p in range(s, hard_end):
+            if p not in header_pages:
+                break
+            lines.extend(doc.clean_lines(p))
+            pages_used += 1
+            if max_pages_per_section and pages_used >= max_pages_per_section:
+                break
+        if lines:
+            sections.append({"start": s, "lines": lines})
+
+    if not sections or not perf_data:
+        return pd.DataFrame()
+
+    name_to_ticker = { (it.get("Fund Scorecard Name") or "").strip(): (it.get("Ticker") or "").strip().upper()
+                       for it in perf_data }
+
+    # name-only matching within proposed sections
+    results = []
+    for it in perf_data:
+        fund_name = (it.get("Fund Scorecard Name") or "").strip()
+        if not fund_name:
+            continue
+
+        name_tok = _tokens(fund_name)
+        best_score, best_page, best_line = 0, None, ""
+        for sec in sections:
+            for ln in sec["lines"]:
+                # quick token overlap guard to reduce false hits
+                if len(name_tok.intersection(_tokens(ln))) < min_token_overlap:
+                    continue
+                score = fuzz.token_set_ratio(fund_name.lower(), ln.lower())
+                if score > best_score:
+                    best_score, best_page, best_line = score, sec["start"], ln
+
+        if best_score >= fuzzy_threshold:
+            results.append({
+                "Fund Scorecard Name": fund_name,
+                "Ticker": name_to_ticker.get(fund_name, ""),
+                "Proposed Section Start Page": best_page,
+                "Match Score": best_score,
+                "Matched Line": best_line
+            })
+
+    return pd.DataFrame(results).drop_duplicates(subset=["Fund Scorecard Name"])
+
+
+#───Step Graph──────────────────────────────────────────────────────────────────
+# Once the scorecard, tickers and performance rows are known, the remaining steps
+# only depend on those and on the factsheet match. Each wrapper below applies the
+# same preconditions as its page step and returns None when they are not met.
+# Graph inputs: doc, toc (section key → TOC page), section_index, tickers, perf_data.
+
+def _factsheets_step(doc, toc, tickers):
+    if not toc.get("factsheets_page"):
+        return None
+    performance_data = [{"Fund Scorecard Name": name, "Ticker": ticker} for name, ticker in tickers.items()]
+    return match_factsheets(doc, toc["factsheets_page"], performance_data)
+
+
+def _returns_step(doc, toc, perf_data):
+    perf_page = toc.get("performance_page")
+    if perf_page is None or not perf_data:
+        return None
+    return extract_returns(doc, perf_page, toc.get("calendar_year_page") or (doc.page_count + 1), perf_data)
+
+
+def _calendar_year_step(doc, toc, tickers, factsheets):
+    cy_page = toc.get("calendar_year_page")
+    if cy_page is None:
+        return None
+    next_page = toc.get("r3yr_page")
+    end_page = next_page if isinstance(next_page, int) else (doc.page_count + 1)
+    end_page = min(max(end_page, cy_page + 1), doc.page_count + 1)
+    return calendar_year_returns(doc, cy_page, end_page, tickers or {}, factsheets or [])
+
+
+def _mpt_3yr_step(doc, toc, tickers):
+    if not tickers or not toc.get("r3yr_page"):
+        return None
+    return mpt_3yr(doc, toc["r3yr_page"], tickers)
+
+
+def _mpt_5yr_step(doc, section_index, tickers):
+    pages = section_index.get("r5yr_page") or []
+    if not tickers or not pages:
+        return None
+    return mpt_5yr(doc, pages[0], tickers)
+
+
+def _factsheet_table_step(fn):
+    def run(doc, toc, factsheets):
+        if not toc.get("factsheets_page") or not factsheets:
+            return None
+        return fn(doc, toc["factsheets_page"], factsheets)
+    return run
+
+
+def _peer_ranks_step(doc, factsheets):
+    return peer_ranks(doc, factsheets) if factsheets else None
+
+
+def _proposed_step(doc, section_index, toc, perf_data):
+    return proposed_funds(doc, section_index, toc, perf_data or [])
+
+
+def report_step_graph(workers=4):
+    """StepGraph for steps 6–14 and the proposed-funds scan."""
+    from utils.mpi.scheduler import Step, StepGraph
+
+    return StepGraph([
+        Step("factsheets", _factsheets_step, ("doc", "toc", "tickers")),
+        Step("returns", _returns_step, ("doc", "toc", "perf_data")),
+        Step("calendar_year", _calendar_year_step, ("doc", "toc", "tickers", "factsheets")),
+        Step("mpt_3yr", _mpt_3yr_step, ("doc", "toc", "tickers")),
+        Step("mpt_5yr", _mpt_5yr_step, ("doc", "section_index", "tickers")),
+        Step("fund_facts", _factsheet_table_step(fund_facts), ("doc", "toc", "factsheets")),
+        Step("risk_adjusted", _factsheet_table_step(risk_adjusted_returns), ("doc", "toc", "factsheets")),
+        Step("peer_ranks", _peer_ranks_step, ("doc", "factsheets")),
+        Step("proposed", _proposed_step, ("doc", "section_index", "toc", "perf_data")),
+    ], workers=workers)
@@ -0,0 +1,356 @@
+"""
+Synthetic MPI reports for benchmarks and scale testing. Nothing in here is
+client data: names, tickers and numbers come from a seeded RNG, and the ground
+truth (every fund record, the TOC pages used, page count) is written next to
+each PDF so parsers can be checked against it:
+
+    python -m utils.mpi.synthetic out_dir [--funds 25 100 400] [--seed 0]
+                                  [--lines-per-page 40] [--min-pages N]
+
+Each report has the cover page, TOC, Fund Scorecard blocks (watch line plus the
+14 metric lines), Fund Performance, Calendar Year and MPT (3Yr/5Yr) tables with
+tickers, and one factsheet page per fund with the Benchmark: / Expense Ratio:
+header, Fund Facts, Risk-Adjusted Returns and Peer Risk-Adjusted Return Rank.
+--lines-per-page sets how densely the tables are packed and --min-pages pads the
+report with disclosure pages, so page count can be varied apart from fund count.
+"""
+import argparse
+import json
+import random
+from io import BytesIO
+from pathlib import Path
+
+from reportlab.lib.pagesizes import LETTER, landscape
+from reportlab.pdfgen import canvas
+
+MIN_FUNDS, MAX_FUNDS = 10, 500
+
+
+#───Synthetic Funds──────────────────────────────────────────────────────────────────
+
+METRIC_LABELS = [
+    "Manager Tenure", "Excess Performance (3Yr)", "Excess Performance (5Yr)",
+    "Peer Return Rank (3Yr)", "Peer Return Rank (5Yr)", "Expense Ratio Rank",
+    "Sharpe Ratio Rank (3Yr)", "Sharpe Ratio Rank (5Yr)", "R-Squared (3Yr)",
+    "R-Squared (5Yr)", "Sortino Ratio Rank (3Yr)", "Sortino Ratio Rank (5Yr)",
+    "Tracking Error Rank (3Yr)", "Tracking Error Rank (5Yr)",
+]
+
+_FAMILIES = [
+    "Northwind", "Harbor Point", "Bluewater", "Granite Peak", "Summit Ridge", "Lakeshore",
+    "Cedar Hill", "Ironbridge", "Silver Maple", "Redwood", "Oakmont", "Beacon Street",
+    "Copper Canyon", "Eastgate", "Westfield", "Pinecrest", "Stonehaven", "Riverbend",
+]
+_STYLES = [
+    "Large Cap Growth", "Large Cap Value", "Mid Cap Growth", "Mid Cap Value", "Small Cap Core",
+    "International Equity", "Emerging Markets", "Core Bond", "High Yield Bond", "Short Term Bond",
+    "Real Estate", "Balanced Allocation", "Global Equity", "Dividend Income", "Inflation Protected",
+]
+_SHARE_CLASSES = ["Instl", "Admiral", "R6", "Investor", "Select"]
+_CATEGORIES = {
+    "Large Cap Growth": ("Large Growth", "Russell 1000 Growth"),
+    "Large Cap Value": ("Large Value", "Russell 1000 Value"),
+    "Mid Cap Growth": ("Mid-Cap Growth", "Russell Mid Cap Growth"),
+    "Mid Cap Value": ("Mid-Cap Value", "Russell Mid Cap Value"),
+    "Small Cap Core": ("Small Blend", "Russell 2000"),
+    "International Equity": ("Foreign Large Blend", "MSCI EAFE"),
+    "Emerging Markets": ("Diversified Emerging Mkts", "MSCI Emerging Markets"),
+    "Core Bond": ("Intermediate Core Bond", "Bloomberg US Aggregate Bond"),
+    "High Yield Bond": ("High Yield Bond", "Bloomberg US Corporate High Yield"),
+    "Short Term Bond": ("Short-Term Bond", "Bloomberg Govt Credit 1-3 Yr"),
+    "Real Estate": ("Real Estate", "Dow Jones US Select REIT"),
+    "Balanced Allocation": ("Moderate Allocation", "Morningstar Moderate Target Risk"),
+    "Global Equity": ("Global Large-Stock Blend", "MSCI ACWI"),
+    "Dividend Income": ("Large Value", "Dow Jones US Select Dividend"),
+    "Inflation Protected": ("Inflation-Protected Bond", "Bloomberg US Treasury TIPS"),
+}
+_WORDS = [
+    "seeks", "long-term", "capital", "appreciation", "by", "investing", "primarily", "in",
+    "companies", "with", "strong", "growth", "prospects", "and", "sustainable", "earnings",
+    "the", "portfolio", "managers", "emphasize", "quality", "valuation", "discipline",
+]
+
+
+def _letters(rng, n):
+    return "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(n))
+
+
+def _pct(rng, lo, hi):
+    return f"{rng.uniform(lo, hi):.2f}"
+
+
+def make_funds(n_funds, seed=0, n_proposed=2):
+    """Ground-truth fund records for an n-fund plan (proposed funds appended at the end)."""
+    rng = random.Random(seed)
+    funds, names, tickers = [], set(), set()
+    total = n_funds + n_proposed
+    while len(funds) < total:
+        style = rng.choice(_STYLES)
+        passive = rng.random() < 0.25
+        family = rng.choice(_FAMILIES)
+        name = f"{family} {style}{' Index' if passive else ''} {rng.choice(_SHARE_CLASSES)}"
+        if name in names:
+            name = f"{name} {len(funds) + 1}"
+        ticker = _letters(rng, 4) + "X"
+        if ticker in tickers:
+            continue
+        names.add(name)
+        tickers.add(ticker)
+        category, benchmark = _CATEGORIES[style]
+        statuses = [rng.choices(["Pass", "Review", "Fail"], weights=[7, 2, 1])[0] for _ in METRIC_LABELS]
+        funds.append({
+            "Fund Name": name,
+            "Ticker": ticker,
+            "Fund Type": "Passive" if passive else "Active",
+            "Proposed": len(funds) >= n_funds,
+            "Statuses": dict(zip(METRIC_LABELS, statuses)),
+            "Manager Tenure": f"{rng.uniform(1, 25):.1f}",
+            "Category": category,
+            "Benchmark": f"{benchmark} Index",
+            "Net Assets": f"${rng.randint(50, 90000):,}M",
+            "Manager Name": f"{rng.choice(['Jane', 'John', 'Maria', 'Wei', 'Omar', 'Priya'])} "
+                            f"{rng.choice(['Smith', 'Chen', 'Garcia', 'Patel', 'Kim', 'Okafor'])}",
+            "Avg. Market Cap": f"${rng.randint(1, 400)}B",
+            "Expense Ratio": _pct(rng, 0.02, 1.2),
+            "Returns": [_pct(rng, -5, 15) for _ in range(6)],          # QTD YTD 1 3 5 10
+            "Bench Returns": [_pct(rng, -5, 15) for _ in range(6)],
+            "Calendar": [_pct(rng, -20, 30) for _ in range(10)],
+            "Bench Calendar": [_pct(rng, -20, 30) for _ in range(10)],
+            "MPT 3Yr": [_pct(rng, -3, 3), _pct(rng, 0.7, 1.3), _pct(rng, 80, 120), _pct(rng, 80, 120)],
+            "MPT 5Yr": [_pct(rng, -3, 3), _pct(rng, 0.7, 1.3), _pct(rng, 80, 120), _pct(rng, 80, 120)],
+            "Risk Adjusted": {m: [_pct(rng, -1, 2) for _ in range(4)]
+                              for m in ("Sharpe Ratio", "Information Ratio", "Sortino Ratio")},
+            "Peer Rank": {m: [str(rng.randint(1, 100)) for _ in range(4)]
+                          for m in ("Sharpe Ratio", "Information Ratio", "Sortino Ratio")},
+            "Holdings": str(rng.randint(30, 3000)),
+            "Turnover": _pct(rng, 2, 120),
+            "Overview": " ".join(
+                (" ".join(rng.choice(_WORDS) for _ in range(rng.randint(8, 16)))).capitalize() + "."
+                for _ in range(4)
+            ),
+        })
+    return funds
+
+
+#───Report Layout──────────────────────────────────────────────────────────────────
+
+def _watch_line(fund):
+    fails = sum(1 for s in fund["Statuses"].values() if s != "Pass")
+    if fails == 0:
+        return f"{fund['Fund Name']} Fund Meets Watchlist Criteria."
+    return (f"{fund['Fund Name']} Fund has been placed on watchlist for not meeting "
+            f"{fails} out of 14 criteria")
+
+
+def _metric_line(label, status, fund):
+    if label == "Manager Tenure":
+        return f"{label} {status} Manager tenure of {fund['Manager Tenure']} years."
+    return f"{label} {status} Ranked in the {'top' if status == 'Pass' else 'bottom'} half of peers."
+
+
+def _paginate(header, rows, per_page, group=1, column_header=None):
+    """Split rows into pages of <= per_page lines, never splitting a group of `group` lines."""
+    if column_header:
+        header = [header, column_header]
+    else:
+        header = [header]
+    pages, current = [], []
+    step = max(group, 1)
+    for i in range(0, len(rows), step):
+        chunk = rows[i:i + step]
+        if current and len(current) + len(chunk) > per_page:
+            pages.append(header + current)
+            current = []
+        current.extend(chunk)
+    if current or not pages:
+        pages.append(header + current)
+    return pages
+
+
+def build_report(n_funds=25, seed=0, n_proposed=2, lines_per_page=40, min_pages=0,
+                 client="Sample Client 401(k) Plan"):
+    """
+    Build a synthetic MPI report. Returns (pdf_bytes, truth) where truth holds the fund
+    records plus the TOC page numbers actually used. Reports shorter than `min_pages`
+    are padded with disclosure pages after the factsheets.
+    """
+    funds = make_funds(n_funds, seed=seed, n_proposed=n_proposed)
+    current = [f for f in funds if not f["Proposed"]]
+    proposed = [f for f in funds if f["Proposed"]]
+    years = [str(2024 - i) for i in range(10)]
+
+    sections = []
+
+    # Scorecard: each block is a watch line followed by the 14 metric lines
+    block_rows = []
+    for f in funds:
+        block_rows.append(_watch_line(f))
+        block_rows.extend(_metric_line(lbl, f["Statuses"][lbl], f) for lbl in METRIC_LABELS)
+    sections.append(("Fund Scorecard", _paginate("Fund Scorecard", block_rows, lines_per_page, group=15)))
+
+    prop_rows = []
+    for f in proposed:
+        prop_rows.append(_watch_line(f))
+        prop_rows.extend(_metric_line(lbl, f["Statuses"][lbl], f) for lbl in METRIC_LABELS)
+    sections.append(("Fund Scorecard: Proposed Funds",
+                     _paginate("Fund Scorecard: Proposed Funds", prop_rows, lines_per_page, group=15)))
+
+    # Performance: numbers line, name/ticker line, benchmark line
+    perf_rows = []
+    for f in funds:
+        r = f["Returns"]
+        perf_rows.append(" ".join(r + [_pct(random.Random(f["Ticker"]), 0, 10), f["Expense Ratio"], f["Expense Ratio"]]))
+        perf_rows.append(f"{f['Fund Name']} {f['Ticker']}")
+        perf_rows.append(f"{f['Benchmark']} " + " ".join(f["Bench Returns"]))
+    sections.append(("Fund Performance: Current vs. Proposed Comparison",
+                     _paginate("Fund Performance: Current vs. Proposed Comparison", perf_rows, lines_per_page, group=3)))
+
+    cy_header = "Investment Manager Ticker " + " ".join(years)
+    cy_rows = []
+    for f in funds:
+        cy_rows.append(" ".join(f["Calendar"]))
+        cy_rows.append(f"{f['Fund Name']} {f['Ticker']}")
+        cy_rows.append(f"{f['Benchmark']} " + " ".join(f["Bench Calendar"]))
+    sections.append(("Fund Performance: Calendar Year",
+                     _paginate("Fund Performance: Calendar Year", cy_rows, lines_per_page, group=3,
+                               column_header=cy_header)))
+
+    for label, key in (("Risk Analysis: MPT Statistics (3Yr)", "MPT 3Yr"), ("Risk Analysis: MPT Statistics (5Yr)", "MPT 5Yr")):
+        rows = [f"{f['Fund Name']} {f['Ticker']} " + " ".join(f[key]) for f in funds]
+        sections.append((label, _paginate(label, rows, lines_per_page,
+                                          column_header="Investment Manager Ticker Alpha Beta Upside Downside")))
+
+    def factsheet(f):
+        lines = ["FUND FACTS",
+                 f"Manager Tenure Yrs. {f['Manager Tenure']}",
+                 f"Expense Ratio {f['Expense Ratio']}",
+                 f"Expense Ratio Rank {f['Peer Rank']['Sharpe Ratio'][0]}",
+                 f"Total Number of Holdings {f['Holdings']}",
+                 f"Turnover Ratio {f['Turnover']}",
+                 "RISK-ADJUSTED RETURNS",
+                 "1 Yr 3 Yrs 5 Yrs 10 Yrs"]
+        lines += [f"{m} " + " ".join(v) for m, v in f["Risk Adjusted"].items()]
+        lines += ["PEER RISK-ADJUSTED RETURN RANK", "1 Yr 3 Yrs 5 Yrs 10 Yrs"]
+        lines += [f"{m} " + " ".join(v) for m, v in f["Peer Rank"].items()]
+        lines += ["", "INVESTMENT OVERVIEW"]
+        overview = f["Overview"].split()
+        for i in range(0, len(overview), 14):
+            lines.append(" ".join(overview[i:i + 14]))
+        header = [
+            f"{f['Fund Name']} {f['Ticker']} Benchmark: {f['Benchmark']} Category: {f['Category']}",
+            f"Net Assets: {f['Net Assets']} Manager Name: {f['Manager Name']} "
+            f"Avg. Market Cap: {f['Avg. Market Cap']} Expense Ratio: {f['Expense Ratio']}%",
+        ]
+        return {"header": header, "lines": lines}
+
+    sections.append(("Fund Factsheets", [factsheet(f) for f in current]))
+    sections.append(("Fund Factsheets: Proposed Funds", [factsheet(f) for f in proposed]))
+
+    # Page numbers: cover (1) + TOC (2), sections follow in order
+    toc, page_no = {}, 3
+    for name, pages in sections:
+        toc[name] = page_no
+        page_no += len(pages)
+    padding = max(0, min_pages - (page_no - 1))
+    if padding:
+        rng = random.Random(seed)
+        disclosures = [" ".join(rng.choice(_WORDS) for _ in range(18)) for _ in range(lines_per_page)]
+        sections.append(("Disclosures", [["Disclosures"] + disclosures for _ in range(padding)]))
+        toc["Disclosures"] = page_no
+        page_no += padding
+    total_pages = page_no - 1
+
+    buf = BytesIO()
+    width, height = landscape(LETTER)
+    c = canvas.Canvas(buf, pagesize=(width, height))
+
+    def draw_lines(lines, top=60, size=8, lead=12):
+        c.setFont("Helvetica", size)
+        y = height - top
+        for ln in lines:
+            if ln:
+                c.drawString(36, y, ln)
+            y -= lead
+
+    draw_lines([
+        "Fiduciary Investment Review",
+        "Prepared For:",
+        client,
+        "Prepared By: MPI Stylus",
+        "Period Ending: 12/31/2024",
+        f"Total Options: {n_funds}",
+    ], top=120, size=14, lead=22)
+    c.showPage()
+
+    toc_lines = ["Table of Contents"] + [f"{name} {page}" for name, page in toc.items()]
+    draw_lines(toc_lines, top=80, size=12, lead=20)
+    c.showPage()
+
+    for name, pages in sections:
+        for pg in pages:
+            if isinstance(pg, dict):
+                c.setFont("Helvetica-Bold", 9)
+                c.drawString(36, height - 30, pg["header"][0])
+                c.setFont("Helvetica", 9)
+                c.drawString(36, height - 44, pg["header"][1])
+                draw_lines(pg["lines"], top=120)
+                c.setFont("Helvetica", 7)
+                c.drawString(36, 20, name)
+            else:
+                c.setFont("Helvetica-Bold", 12)
+                c.drawString(36, height - 36, pg[0])
+                draw_lines(pg[1:], top=70)
+            c.showPage()
+    c.save()
+
+    truth = {
+        "funds": funds,
+        "toc": toc,
+        "page_count": total_pages,
+        "total_options": n_funds,
+        "client": client,
+        "years": years,
+    }
+    return buf.getvalue(), truth
+
+
+#───Corpus──────────────────────────────────────────────────────────────────
+
+def write_corpus(out_dir, sizes=(25, 100, 400), seed=0, lines_per_page=40, min_pages=0):
+    """Write report_<n>.pdf and report_<n>.json for each fund count; returns the PDF paths."""
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for n in sizes:
+        pdf_bytes, truth = build_report(n_funds=n, seed=seed + n, lines_per_page=lines_per_page, min_pages=min_pages)
+        pdf_path = out / f"report_{n}.pdf"
+        pdf_path.write_bytes(pdf_bytes)
+        (out / f"report_{n}.json").write_text(json.dumps(truth, indent=2))
+        paths.append(pdf_path)
+    return paths
+
+
+#───CLI──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic MPI reports with ground truth.")
+    parser.add_argument("out_dir")
+    parser.add_argument("--funds", type=int, nargs="+", default=[25, 100, 400],
+                        help=f"fund counts to generate ({MIN_FUNDS} to {MAX_FUNDS})")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--lines-per-page", type=int, default=40, help="table lines per page")
+    parser.add_argument("--min-pages", type=int, default=0, help="pad each report to at least this many pages")
+    args = parser.parse_args(argv)
+    for n in args.funds:
+        if not MIN_FUNDS <= n <= MAX_FUNDS:
+            parser.error(f"fund count {n} outside {MIN_FUNDS}..{MAX_FUNDS}")
+    if args.lines_per_page < 15:
+        parser.error("--lines-per-page must fit one scorecard block (15 lines)")
+    paths = write_corpus(args.out_dir, sizes=args.funds, seed=args.seed,
+                         lines_per_page=args.lines_per_page, min_pages=args.min_pages)
+    for path in paths:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
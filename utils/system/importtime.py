@@ -0,0 +1,122 @@
+"""
+Import-time report for the app pages, in the style of `python -X importtime`:
+
+    python -m utils.system.importtime [writeup_&_rec.py ...] [--top 10]
+
+Each page is loaded in a fresh interpreter that has already imported streamlit
+(the router pays for that before any page runs). For every page it prints the
+cold load time, the time of a second load through utils.system.pages (a rerun),
+and the slowest top-level imports the page pulled in. Run it from the
+repository root.
+
+It also checks the page registry: the second load must not execute the page
+again, and a load after the file's mtime changes must. A page failing either
+check is reported and the command exits non-zero.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".."))
+PAGES_DIR = os.path.join(ROOT, "app_pages")
+MARKER = "--page-load--"
+
+_PROBE = """
+import json, os, shutil, sys, tempfile, time
+sys.path.insert(0, {root!r})
+import streamlit
+from utils.system.pages import PageRegistry, load_page, registry
+sys.stderr.write({marker!r} + "\\n")
+sys.stderr.flush()
+t = time.perf_counter()
+load_page({path!r})
+cold = time.perf_counter() - t
+t = time.perf_counter()
+load_page({path!r})
+warm = time.perf_counter() - t
+executions = registry.executions[os.path.basename({path!r})]
+
+# an edited page (newer mtime) has to be executed again
+with tempfile.TemporaryDirectory() as tmp:
+    copy = shutil.copy({path!r}, tmp)
+    edits = PageRegistry()
+    edits.load(copy)
+    st_ = os.stat(copy)
+    os.utime(copy, ns=(st_.st_atime_ns, st_.st_mtime_ns + 1_000_000_000))
+    edits.load(copy)
+    reloads = edits.executions[os.path.basename(copy)]
+print(json.dumps({{"cold_ms": cold * 1000, "warm_ms": warm * 1000,
+                  "executions": executions, "reloads": reloads}}))
+"""
+
+
+#───Helpers──────────────────────────────────────────────────────────────────
+
+def parse_importtime(lines):
+    """[(module, self µs, cumulative µs, depth)] from `-X importtime` stderr lines."""
+    out = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # the column header
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        out.append((name.strip(), int(parts[0]), int(parts[1]), depth))
+    return out
+
+
+def profile_page(page_file):
+    """{"cold_ms", "warm_ms", "imports": [(module, cumulative µs)]} for one page."""
+    path = os.path.join(PAGES_DIR, page_file)
+    code = _PROBE.format(root=ROOT, marker=MARKER, path=path)
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "page failed to load")
+    err = proc.stderr.splitlines()
+    after = err[err.index(MARKER) + 1:] if MARKER in err else err
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    top = [(name, cum) for name, _, cum, depth in parse_importtime(after) if depth == 0]
+    result["imports"] = sorted(top, key=lambda x: -x[1])
+    return result
+
+
+#───CLI──────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time report for the app pages.")
+    parser.add_argument("pages", nargs="*", help="page files in app_pages (default: all)")
+    parser.add_argument("--top", type=int, default=8, help="imports to list per page")
+    args = parser.parse_args(argv)
+
+    pages = args.pages or sorted(
+        f for f in os.listdir(PAGES_DIR) if f.endswith(".py") and not f.startswith("__")
+    )
+    failed = 0
+    for page in pages:
+        try:
+            res = profile_page(page)
+        except Exception as e:
+            print(f"{page}: failed ({e})")
+            failed += 1
+            continue
+        total = sum(cum for _, cum in res["imports"]) / 1000
+        print(f"{page}: cold {res['cold_ms']:.1f} ms (imports {total:.1f} ms), rerun {res['warm_ms']:.3f} ms")
+        if res["executions"] != 1 or res["reloads"] != 2:
+            print(f"    registry check failed: executed {res['executions']}x for two loads, "
+                  f"{res['reloads']}x for a load before and after an edit (expected 1 and 2)")
+            failed += 1
+        for name, cum in res["imports"][:args.top]:
+            print(f"    {cum / 1000:8.1f} ms  {name}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
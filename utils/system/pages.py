@@ -0,0 +1,78 @@
+import importlib.util
+import os
+import re
+import sys
+import threading
+
+
+# ===== Page Modules =====
+# app.py used to exec the chosen page file into a fresh module on every rerun.
+# Pages are now compiled and executed once and kept resident, keyed by file name
+# and modification time: a rerun only calls run(), and an edited page is loaded
+# again on its next render. The module is also registered in sys.modules under
+# app_pages.<name>; Streamlit's file watcher dropping it from there forces a
+# reload too.
+
+PAGES_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "app_pages"))
+# the page the headless MPI tools (batch, bench, decks, regression) drive
+WRITEUP_REC_PAGE = os.path.join(PAGES_DIR, "writeup_&_rec.py")
+
+
+def page_module_name(page_path):
+    stem = os.path.splitext(os.path.basename(page_path))[0]
+    return "app_pages." + re.sub(r"\W", "_", stem)
+
+
+class PageRegistry:
+    """Loaded page modules by file name; `executions` counts module executions per page."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.executions = {}
+
+    def load(self, page_path):
+        """Page module for app_pages/<file>, executed again only when the file changed."""
+        key = os.path.basename(page_path)
+        name = page_module_name(page_path)
+        mtime = os.stat(page_path).st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == mtime and sys.modules.get(name) is entry[1]:
+                return entry[1]
+            module = self._execute(name, page_path)
+            self._entries[key] = (mtime, module)
+            self.executions[key] = self.executions.get(key, 0) + 1
+            return module
+
+    @staticmethod
+    def _execute(name, page_path):
+        spec = importlib.util.spec_from_file_location(name, page_path)
+        module = importlib.util.module_from_spec(spec)
+        previous = sys.modules.get(name)
+        sys.modules[name] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            # leave the last good version registered; the next render tries the file again
+            if previous is not None:
+                sys.modules[name] = previous
+            else:
+                sys.modules.pop(name, None)
+            raise
+        return module
+
+    def clear(self):
+        with self._lock:
+            for key, (_, module) in self._entries.items():
+                if sys.modules.get(module.__name__) is module:
+                    del sys.modules[module.__name__]
+            self._entries.clear()
+
+
+registry = PageRegistry()
+
+
+def load_page(page_path):
+    """Page module for app_pages/<file>, executed on first use and after each edit."""
+    return registry.load(page_path)
@@ -2,7 +2,6 @@ import time
 import streamlit as st
 from rapidfuzz import process
 import logging
-import pdfplumber
 
 # ===== Logger Setup =====
 logger = logging.getLogger("FidSync")
@@ -25,6 +24,8 @@ def get_fuzzy_matches(fund_list, options_list):
 
 # ===== PDF Safety Extraction =====
 def extract_text_safe(pdf_file):
+    import pdfplumber
+
     texts = []
     with pdfplumber.open(pdf_file) as pdf:
         for i, page in enumerate(pdf.pages):
@@ -80,19 +81,16 @@ def log_processing_summary(fund_count, failed_pages, time_taken):
     logger.info(f"Processed {fund_count} funds in {time_taken:.2f}s with {failed_pages} page failures.")
 
 
-
-
-## To Paste Into .Pys
-  #from utils.stability_enhancer import (
-      get_api_key,
-      get_fuzzy_matches,
-      extract_text_safe,
-      retry_api_call,
-      normalize_fund_names,
-      is_valid_pdf,
-      extract_watchlist_status,
-      parse_clipboard_options,
-      checkbox_with_help,
-      log_processing_summary
-  )
-
+# ===== Usage =====
+# from utils.system.stability_enhancer import (
+#     get_api_key,
+#     get_fuzzy_matches,
+#     extract_text_safe,
+#     retry_api_call,
+#     normalize_fund_names,
+#     is_valid_pdf,
+#     extract_watchlist_status,
+#     parse_clipboard_options,
+#     checkbox_with_help,
+#     log_processing_summary
+# )